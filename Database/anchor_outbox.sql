@@ -0,0 +1,33 @@
+-- Durable anchoring outbox
+-- Rows are written in the same transaction as the secure_db insert and drained
+-- by Others/anchor_worker.py (SELECT ... FOR UPDATE SKIP LOCKED).
+
+CREATE TABLE IF NOT EXISTS anchor_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    employee_id INTEGER NOT NULL,
+    record_hash TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'submitted', 'confirmed', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    tx_hash TEXT,
+    -- Every hash sent for the row's current attempt (fee-bumped replacements included)
+    tx_hashes TEXT[] NOT NULL DEFAULT '{}',
+    block_number BIGINT,
+    last_error TEXT,
+    claimed_by TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    submitted_at TIMESTAMP,
+    confirmed_at TIMESTAMP
+);
+
+-- Outboxes created before replacement hashes were tracked
+ALTER TABLE anchor_outbox ADD COLUMN IF NOT EXISTS tx_hashes TEXT[] NOT NULL DEFAULT '{}';
+
+-- Workers only ever scan the unfinished part of the table
+CREATE INDEX IF NOT EXISTS idx_anchor_outbox_pending
+    ON anchor_outbox(next_attempt_at, id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_anchor_outbox_submitted
+    ON anchor_outbox(submitted_at) WHERE status = 'submitted';
+CREATE INDEX IF NOT EXISTS idx_anchor_outbox_confirmed
+    ON anchor_outbox(confirmed_at) WHERE status = 'confirmed';
@@ -0,0 +1,29 @@
+-- Local mirror of HashAdded events emitted by the audit contract
+-- Maintained by Others/event_indexer.py; verification reads it instead of calling the RPC node.
+
+CREATE TABLE IF NOT EXISTS chain_anchor (
+    employee_id INTEGER NOT NULL,
+    record_hash TEXT NOT NULL,
+    block_number BIGINT NOT NULL,
+    block_hash TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    anchored_at TIMESTAMP,
+    PRIMARY KEY (block_number, log_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_chain_anchor_employee ON chain_anchor(employee_id, block_number DESC, log_index DESC);
+
+-- Latest anchored hash per employee (addHash overwrites, so the last event wins)
+CREATE OR REPLACE VIEW chain_anchor_latest AS
+SELECT DISTINCT ON (employee_id) employee_id, record_hash, block_number, tx_hash
+FROM chain_anchor
+ORDER BY employee_id, block_number DESC, log_index DESC;
+
+-- Indexer progress (one row per indexed contract)
+CREATE TABLE IF NOT EXISTS indexer_state (
+    name TEXT PRIMARY KEY,
+    last_block BIGINT NOT NULL,
+    last_block_hash TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,62 @@
+-- Change journal for secure_db
+-- Every UPDATE/DELETE on secure_db (API or direct SQL) appends a row here and
+-- notifies 'secure_db_changes'; Others/change_verifier.py re-verifies just
+-- those rows. Inserts are not journaled: a new row is not anchored yet.
+-- Needs the hash_version column (Database/hash_version.sql).
+
+CREATE TABLE IF NOT EXISTS secure_db_change (
+    seq BIGSERIAL PRIMARY KEY,
+    employee_id INTEGER NOT NULL,
+    op CHAR(1) NOT NULL CHECK (op IN ('U', 'D')),
+    -- Writing transaction; the verifier only reads transactions older than every
+    -- in-flight one, so a late commit with a lower seq is never skipped
+    txid BIGINT NOT NULL DEFAULT txid_current(),
+    changed_at TIMESTAMP NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE INDEX IF NOT EXISTS idx_secure_db_change_txid ON secure_db_change(txid, seq);
+
+CREATE OR REPLACE FUNCTION secure_db_journal_row() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO secure_db_change (employee_id, op) VALUES (OLD.id, 'D');
+    -- Only hashed columns count; derived ones (salary_amount) are backfilled without journaling
+    ELSIF (NEW.id, NEW.name, NEW.role, NEW.salary, NEW.record_hash, NEW.created_at, NEW.hash_version)
+          IS DISTINCT FROM
+          (OLD.id, OLD.name, OLD.role, OLD.salary, OLD.record_hash, OLD.created_at, OLD.hash_version) THEN
+        INSERT INTO secure_db_change (employee_id, op) VALUES (NEW.id, 'U');
+        IF NEW.id <> OLD.id THEN
+            INSERT INTO secure_db_change (employee_id, op) VALUES (OLD.id, 'D');
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One notification per statement, not per row (bulk updates stay cheap)
+CREATE OR REPLACE FUNCTION secure_db_journal_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('secure_db_changes', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS secure_db_journal_row ON secure_db;
+CREATE TRIGGER secure_db_journal_row
+    AFTER UPDATE OR DELETE ON secure_db
+    FOR EACH ROW
+    EXECUTE FUNCTION secure_db_journal_row();
+
+DROP TRIGGER IF EXISTS secure_db_journal_notify ON secure_db;
+CREATE TRIGGER secure_db_journal_notify
+    AFTER UPDATE OR DELETE ON secure_db
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION secure_db_journal_notify();
+
+-- Verifier progress: the (txid, seq) of the last journal entry processed
+CREATE TABLE IF NOT EXISTS verifier_state (
+    name TEXT PRIMARY KEY,
+    last_txid BIGINT NOT NULL,
+    last_seq BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,70 @@
+-- Paginated listing support for GET /employees
+-- Composite indexes back every sort key the endpoint offers, so a keyset page
+-- ((sort_key, id) > cursor ORDER BY sort_key, id LIMIT n) reads n index entries
+-- wherever it starts. secure_db_summary.row_count is kept exact by triggers so
+-- the listing total is a single-row read instead of COUNT(*).
+
+CREATE INDEX IF NOT EXISTS idx_secure_db_name_id ON secure_db(name, id);
+CREATE INDEX IF NOT EXISTS idx_secure_db_created_at_id ON secure_db(created_at, id);
+
+-- Single row (id = 1)
+CREATE TABLE IF NOT EXISTS secure_db_summary (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    row_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO secure_db_summary (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+-- Statement-level with transition tables: one counter update per statement, not per row
+CREATE OR REPLACE FUNCTION secure_db_summary_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE secure_db_summary
+        SET row_count = row_count + (SELECT COUNT(*) FROM new_rows), updated_at = CURRENT_TIMESTAMP
+        WHERE id = 1;
+    ELSE
+        UPDATE secure_db_summary
+        SET row_count = row_count - (SELECT COUNT(*) FROM old_rows), updated_at = CURRENT_TIMESTAMP
+        WHERE id = 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION secure_db_summary_reset() RETURNS trigger AS $$
+BEGIN
+    UPDATE secure_db_summary SET row_count = 0, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Installed and seeded in one transaction; the lock keeps writes out until the
+-- triggers exist, so no row is counted twice or missed
+BEGIN;
+LOCK TABLE secure_db IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS secure_db_summary_insert ON secure_db;
+CREATE TRIGGER secure_db_summary_insert
+    AFTER INSERT ON secure_db
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION secure_db_summary_apply();
+
+DROP TRIGGER IF EXISTS secure_db_summary_delete ON secure_db;
+CREATE TRIGGER secure_db_summary_delete
+    AFTER DELETE ON secure_db
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION secure_db_summary_apply();
+
+DROP TRIGGER IF EXISTS secure_db_summary_reset ON secure_db;
+CREATE TRIGGER secure_db_summary_reset
+    AFTER TRUNCATE ON secure_db
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION secure_db_summary_reset();
+
+UPDATE secure_db_summary
+SET row_count = (SELECT COUNT(*) FROM secure_db), updated_at = CURRENT_TIMESTAMP
+WHERE id = 1;
+COMMIT;
@@ -0,0 +1,5 @@
+-- Per-row record hash version (Others/record_hash.py)
+-- Existing rows keep the legacy f-string hash (1); the API writes
+-- RECORD_HASH_VERSION (2 = length-prefixed sha256 by default) for new rows.
+
+ALTER TABLE secure_db ADD COLUMN IF NOT EXISTS hash_version SMALLINT NOT NULL DEFAULT 1;
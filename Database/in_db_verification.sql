@@ -0,0 +1,46 @@
+-- In-database record hashing for set-based verification (Others/db_verification.py)
+-- secure_db_record_hash() must stay byte-identical to Others/record_hash.py:
+--   version 1: sha256(f"{name}{role}{salary}{created_at.isoformat()}".encode('utf-8'))
+--   version 2: sha256 over the length-prefixed binary encoding
+-- (version 3 is BLAKE2b, which pgcrypto lacks; those rows are verified in Python)
+-- Others/test_hash_parity.py checks this against the live database.
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+-- Python's str(None) is 'None'; isoformat() omits the fraction when microseconds are 0
+CREATE OR REPLACE FUNCTION secure_db_canonical(name TEXT, role TEXT, salary TEXT, created_at TIMESTAMP)
+RETURNS TEXT AS $$
+    SELECT COALESCE(name, 'None') || COALESCE(role, 'None') || COALESCE(salary, 'None')
+        || to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS')
+        || CASE WHEN extract(microseconds FROM created_at)::bigint % 1000000 = 0 THEN ''
+                ELSE to_char(created_at, '.US') END;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION secure_db_record_hash(name TEXT, role TEXT, salary TEXT, created_at TIMESTAMP)
+RETURNS TEXT AS $$
+    SELECT encode(digest(convert_to(secure_db_canonical(name, role, salary, created_at), 'UTF8'), 'sha256'), 'hex');
+$$ LANGUAGE sql STABLE;
+
+-- int32 length + UTF-8 bytes, or length -1 for NULL
+CREATE OR REPLACE FUNCTION secure_db_field(value TEXT) RETURNS BYTEA AS $$
+    SELECT CASE WHEN value IS NULL THEN int4send(-1)
+                ELSE int4send(octet_length(convert_to(value, 'UTF8'))) || convert_to(value, 'UTF8') END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Microseconds since 1970-01-01 from integer parts (extract(epoch) is a double before PG 14)
+CREATE OR REPLACE FUNCTION secure_db_micros(created_at TIMESTAMP) RETURNS BIGINT AS $$
+    SELECT (created_at::date - DATE '1970-01-01')::bigint * 86400000000
+        + (extract(hour FROM created_at)::bigint * 3600 + extract(minute FROM created_at)::bigint * 60) * 1000000
+        + extract(microseconds FROM created_at)::bigint;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION secure_db_record_hash(name TEXT, role TEXT, salary TEXT, created_at TIMESTAMP, version INTEGER)
+RETURNS TEXT AS $$
+    SELECT CASE version
+        WHEN 1 THEN secure_db_record_hash(name, role, salary, created_at)
+        WHEN 2 THEN encode(digest(
+            '\x02'::bytea || secure_db_field(name) || secure_db_field(role) || secure_db_field(salary)
+            || int8send(secure_db_micros(created_at)),
+            'sha256'), 'hex')
+    END;
+$$ LANGUAGE sql STABLE;
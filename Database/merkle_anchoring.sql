@@ -0,0 +1,25 @@
+-- Merkle-batched anchoring tables
+-- Each batch anchors one Merkle root on-chain (AuditLogV3.anchorRoot);
+-- each record keeps the inclusion proof linking its hash to that root.
+
+CREATE TABLE IF NOT EXISTS anchor_batch (
+    id SERIAL PRIMARY KEY,
+    merkle_root TEXT NOT NULL UNIQUE,
+    leaf_count INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',   -- pending / confirmed / failed
+    tx_hash TEXT,
+    block_number BIGINT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    anchored_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS anchor_proof (
+    employee_id INTEGER PRIMARY KEY,
+    batch_id INTEGER NOT NULL REFERENCES anchor_batch(id) ON DELETE CASCADE,
+    leaf_index INTEGER NOT NULL,
+    record_hash TEXT NOT NULL,
+    proof JSONB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_anchor_proof_batch ON anchor_proof(batch_id);
+CREATE INDEX IF NOT EXISTS idx_anchor_batch_status ON anchor_batch(status);
@@ -0,0 +1,143 @@
+-- Rolling hash chain over secure_db (Others/epoch_anchor.py)
+-- Every insert, first hash assignment, delete and truncate appends a link:
+--   chain_n = sha256(0x02 || chain_(n-1) || int8(seq) || op || int8(employee_id)
+--                    || int4(len(record_hash)) || record_hash utf-8)
+-- starting from 32 zero bytes. Epoch heads are anchored on-chain, so one root
+-- comparison attests every row added - and every row removed - up to the epoch.
+-- Requires pgcrypto (Database/in_db_verification.sql creates it). Verification
+-- recomputes each row's hash under its hash_version (Database/hash_version.sql).
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE TABLE IF NOT EXISTS record_chain (
+    seq BIGINT PRIMARY KEY,
+    -- I = insert, H = record_hash first set, D = delete, T = truncate (employee_id 0)
+    op CHAR(1) NOT NULL CHECK (op IN ('I', 'H', 'D', 'T')),
+    employee_id INTEGER NOT NULL,
+    record_hash TEXT,
+    chain_hash TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE INDEX IF NOT EXISTS idx_record_chain_employee ON record_chain(employee_id, seq);
+
+-- Current head; its row lock serializes appends so seq is gapless and ordered
+CREATE TABLE IF NOT EXISTS record_chain_head (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    seq BIGINT NOT NULL,
+    chain_hash TEXT NOT NULL
+);
+
+INSERT INTO record_chain_head (id, seq, chain_hash) VALUES (1, 0, repeat('0', 64))
+ON CONFLICT (id) DO NOTHING;
+
+-- Anchored epoch heads
+CREATE TABLE IF NOT EXISTS chain_epoch (
+    id SERIAL PRIMARY KEY,
+    last_seq BIGINT NOT NULL UNIQUE,
+    chain_hash TEXT NOT NULL,
+    entry_count BIGINT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'confirmed', 'failed')),
+    tx_hash TEXT,
+    block_number BIGINT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    anchored_at TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION record_chain_append(p_op CHAR, p_employee_id INTEGER, p_record_hash TEXT)
+RETURNS VOID AS $$
+DECLARE
+    v_seq BIGINT;
+    v_hash TEXT;
+    v_record BYTEA := convert_to(COALESCE(p_record_hash, ''), 'UTF8');
+BEGIN
+    UPDATE record_chain_head SET
+        seq = seq + 1,
+        chain_hash = encode(digest(
+            '\x02'::bytea || decode(chain_hash, 'hex') || int8send(seq + 1)
+            || convert_to(p_op, 'UTF8') || int8send(p_employee_id::bigint)
+            || int4send(length(v_record)) || v_record,
+            'sha256'), 'hex')
+    WHERE id = 1
+    RETURNING seq, chain_hash INTO v_seq, v_hash;
+
+    INSERT INTO record_chain (seq, op, employee_id, record_hash, chain_hash)
+    VALUES (v_seq, p_op, p_employee_id, p_record_hash, v_hash);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level with transition tables, so bulk inserts take the head lock once
+CREATE OR REPLACE FUNCTION record_chain_journal() RETURNS trigger AS $$
+DECLARE
+    r RECORD;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        FOR r IN SELECT id, record_hash FROM new_rows ORDER BY id LOOP
+            PERFORM record_chain_append('I', r.id, r.record_hash);
+        END LOOP;
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- Only the first assignment of a hash is legitimate; any other
+        -- record_hash change is left for epoch verification to flag
+        FOR r IN
+            SELECT n.id, n.record_hash FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE o.record_hash IS NULL AND n.record_hash IS NOT NULL
+            ORDER BY n.id
+        LOOP
+            PERFORM record_chain_append('H', r.id, r.record_hash);
+        END LOOP;
+    ELSIF TG_OP = 'DELETE' THEN
+        FOR r IN SELECT id, record_hash FROM old_rows ORDER BY id LOOP
+            PERFORM record_chain_append('D', r.id, r.record_hash);
+        END LOOP;
+    ELSIF TG_OP = 'TRUNCATE' THEN
+        PERFORM record_chain_append('T', 0, NULL);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Installed and seeded in one transaction; the lock keeps writes out until the
+-- triggers exist, so no insert can land (and make record_chain non-empty)
+-- before the existing rows are seeded
+BEGIN;
+LOCK TABLE secure_db IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS record_chain_insert ON secure_db;
+CREATE TRIGGER record_chain_insert
+    AFTER INSERT ON secure_db
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION record_chain_journal();
+
+DROP TRIGGER IF EXISTS record_chain_update ON secure_db;
+CREATE TRIGGER record_chain_update
+    AFTER UPDATE ON secure_db
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION record_chain_journal();
+
+DROP TRIGGER IF EXISTS record_chain_delete ON secure_db;
+CREATE TRIGGER record_chain_delete
+    AFTER DELETE ON secure_db
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION record_chain_journal();
+
+DROP TRIGGER IF EXISTS record_chain_truncate ON secure_db;
+CREATE TRIGGER record_chain_truncate
+    AFTER TRUNCATE ON secure_db
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION record_chain_journal();
+
+-- Rows that existed before the chain was installed become its first links
+DO $$
+DECLARE
+    r RECORD;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM record_chain) THEN
+        FOR r IN SELECT id, record_hash FROM secure_db ORDER BY id LOOP
+            PERFORM record_chain_append('I', r.id, r.record_hash);
+        END LOOP;
+    END IF;
+END $$;
+COMMIT;
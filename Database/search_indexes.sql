@@ -0,0 +1,40 @@
+-- Index-backed employee search (POST /employees/search, Others/async_db.py)
+-- Substring filters become lower(name|role) LIKE '%x%', which pg_trgm GIN
+-- indexes answer without a scan. Salary filters use salary_amount, a NUMERIC
+-- copy of the TEXT salary kept in step by a trigger. salary stays the source
+-- of truth and the only column the record hash covers.
+--
+-- Run with psql (CREATE INDEX CONCURRENTLY cannot run in a transaction block),
+-- then backfill existing rows and build the salary index online:
+--     python -m Others.search_migration backfill
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Nullable, no default: adding it does not rewrite the table
+ALTER TABLE secure_db ADD COLUMN IF NOT EXISTS salary_amount NUMERIC;
+
+-- '75000', '75,000.50', '$ 75000' -> numeric; anything else -> NULL (never an error)
+CREATE OR REPLACE FUNCTION secure_db_parse_salary(salary TEXT) RETURNS NUMERIC AS $$
+    SELECT CASE WHEN cleaned ~ '^-?[0-9]+(\.[0-9]+)?$' THEN cleaned::NUMERIC END
+    FROM (SELECT regexp_replace(salary, '[\s$,]', '', 'g') AS cleaned) s;
+$$ LANGUAGE sql IMMUTABLE STRICT;
+
+CREATE OR REPLACE FUNCTION secure_db_salary_amount() RETURNS trigger AS $$
+BEGIN
+    NEW.salary_amount := secure_db_parse_salary(NEW.salary);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS secure_db_salary_amount ON secure_db;
+CREATE TRIGGER secure_db_salary_amount
+    BEFORE INSERT OR UPDATE OF salary ON secure_db
+    FOR EACH ROW
+    EXECUTE FUNCTION secure_db_salary_amount();
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_secure_db_name_trgm
+    ON secure_db USING gin (lower(name) gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_secure_db_role_trgm
+    ON secure_db USING gin (lower(role) gin_trgm_ops);
+
+-- idx_secure_db_salary_amount is built after the backfill by Others/search_migration.py
@@ -0,0 +1,111 @@
+-- Persisted verification outcomes and dashboard aggregates
+-- Every verification path (single, /verify-all, stream, engine, change verifier)
+-- upserts the latest outcome per record; triggers keep verification_summary in
+-- step so /dashboard-stats is a single-row read.
+
+CREATE TABLE IF NOT EXISTS verification_result (
+    employee_id INTEGER PRIMARY KEY REFERENCES secure_db(id) ON DELETE CASCADE,
+    status TEXT NOT NULL CHECK (status IN ('verified', 'tampered', 'not_anchored')),
+    stored_hash TEXT,
+    computed_hash TEXT,
+    blockchain_hash TEXT,
+    -- Block of the anchor the chain hash came from (NULL when read live over RPC)
+    block_number BIGINT,
+    source TEXT,
+    verified_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_verification_result_tampered
+    ON verification_result(verified_at DESC) WHERE status = 'tampered';
+
+-- Single row (id = 1)
+CREATE TABLE IF NOT EXISTS verification_summary (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    verified BIGINT NOT NULL DEFAULT 0,
+    tampered BIGINT NOT NULL DEFAULT 0,
+    not_anchored BIGINT NOT NULL DEFAULT 0,
+    last_verified_at TIMESTAMP,
+    last_full_pass_at TIMESTAMP,
+    last_full_pass_seconds DOUBLE PRECISION,
+    last_full_pass_records BIGINT
+);
+
+INSERT INTO verification_summary (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+-- Start from the current table contents when (re)installed
+UPDATE verification_summary SET
+    verified = (SELECT COUNT(*) FROM verification_result WHERE status = 'verified'),
+    tampered = (SELECT COUNT(*) FROM verification_result WHERE status = 'tampered'),
+    not_anchored = (SELECT COUNT(*) FROM verification_result WHERE status = 'not_anchored')
+WHERE id = 1;
+
+-- Statement-level with transition tables: one summary update per batch upsert, not per row
+CREATE OR REPLACE FUNCTION verification_summary_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE verification_summary s SET
+            verified = s.verified - o.verified,
+            tampered = s.tampered - o.tampered,
+            not_anchored = s.not_anchored - o.not_anchored
+        FROM (
+            SELECT COUNT(*) FILTER (WHERE status = 'verified') AS verified,
+                   COUNT(*) FILTER (WHERE status = 'tampered') AS tampered,
+                   COUNT(*) FILTER (WHERE status = 'not_anchored') AS not_anchored
+            FROM old_rows
+        ) o
+        WHERE s.id = 1;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE verification_summary s SET
+            verified = s.verified + n.verified,
+            tampered = s.tampered + n.tampered,
+            not_anchored = s.not_anchored + n.not_anchored,
+            last_verified_at = GREATEST(s.last_verified_at, n.last_verified_at)
+        FROM (
+            SELECT COUNT(*) FILTER (WHERE status = 'verified') AS verified,
+                   COUNT(*) FILTER (WHERE status = 'tampered') AS tampered,
+                   COUNT(*) FILTER (WHERE status = 'not_anchored') AS not_anchored,
+                   MAX(verified_at) AS last_verified_at
+            FROM new_rows
+        ) n
+        WHERE s.id = 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A trigger with transition tables covers one event, hence three
+DROP TRIGGER IF EXISTS verification_summary_insert ON verification_result;
+CREATE TRIGGER verification_summary_insert
+    AFTER INSERT ON verification_result
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION verification_summary_apply();
+
+DROP TRIGGER IF EXISTS verification_summary_update ON verification_result;
+CREATE TRIGGER verification_summary_update
+    AFTER UPDATE ON verification_result
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION verification_summary_apply();
+
+DROP TRIGGER IF EXISTS verification_summary_delete ON verification_result;
+CREATE TRIGGER verification_summary_delete
+    AFTER DELETE ON verification_result
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION verification_summary_apply();
+
+-- TRUNCATE (e.g. TRUNCATE secure_db ... CASCADE) skips row triggers
+CREATE OR REPLACE FUNCTION verification_summary_reset() RETURNS trigger AS $$
+BEGIN
+    UPDATE verification_summary SET verified = 0, tampered = 0, not_anchored = 0 WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS verification_summary_reset ON verification_result;
+CREATE TRIGGER verification_summary_reset
+    AFTER TRUNCATE ON verification_result
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION verification_summary_reset();
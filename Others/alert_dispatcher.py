@@ -0,0 +1,350 @@
+"""Tamper-alert dispatcher: bounded queue -> dedup/cooldown -> digest -> sinks
+
+Verification paths call `submit(result)`, which never blocks. A single
+worker thread collects alerts for up to ALERT_DIGEST_WINDOW seconds (or
+ALERT_DIGEST_MAX alerts) and hands each digest to every sink, so a pass that
+finds 500 tampered rows sends a handful of emails over one SMTP connection
+instead of 500 sessions. A row is not re-alerted within ALERT_COOLDOWN
+seconds unless its hashes change.
+
+Sinks (ALERT_SINKS, comma separated):
+    smtp     digest email over a persistent connection (Others/email_notifier.py settings)
+    webhook  JSON POST to ALERT_WEBHOOK_URL
+    log      one JSON line per alert in ALERT_LOG_FILE
+"""
+import json
+import os
+import queue
+import smtplib
+import threading
+import urllib.request
+from collections import OrderedDict
+from datetime import datetime
+from time import time
+from dotenv import load_dotenv
+
+from Others import email_notifier
+
+load_dotenv()
+
+ALERT_SINKS = os.getenv("ALERT_SINKS", "smtp")
+ALERT_QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", 10000))
+# Seconds before the same row (with the same hashes) can alert again
+ALERT_COOLDOWN = float(os.getenv("ALERT_COOLDOWN", 3600))
+# Alerts arriving within this many seconds of the first one share a digest
+ALERT_DIGEST_WINDOW = float(os.getenv("ALERT_DIGEST_WINDOW", 30))
+ALERT_DIGEST_MAX = int(os.getenv("ALERT_DIGEST_MAX", 200))
+ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL")
+ALERT_LOG_FILE = os.getenv("ALERT_LOG_FILE", "tamper_alerts.log")
+# Pooled SMTP connections are dropped after this long unused (servers time out idle sessions)
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", 120))
+
+# Rows remembered for deduplication; the oldest are forgotten first
+DEDUP_CAPACITY = 100000
+
+
+class AlertSink:
+    """Delivery target; `send` gets a non-empty list of alert dicts and raises on failure"""
+
+    name = "sink"
+
+    def send(self, alerts):
+        raise NotImplementedError
+
+    def idle(self):
+        """Called when the dispatcher has nothing to do"""
+
+    def close(self):
+        pass
+
+
+class SMTPSink(AlertSink):
+    """Email sink that keeps one SMTP session open across digests"""
+
+    name = "smtp"
+
+    def __init__(self, host=email_notifier.SMTP_SERVER, port=email_notifier.SMTP_PORT,
+                 sender=email_notifier.EMAIL_SENDER, password=email_notifier.EMAIL_PASSWORD,
+                 recipient=email_notifier.EMAIL_RECIPIENT, starttls=email_notifier.SMTP_STARTTLS,
+                 idle_timeout=SMTP_IDLE_TIMEOUT, timeout=30):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.password = password
+        self.recipient = recipient
+        self.starttls = starttls
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._smtp = None
+        self._last_used = 0.0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.sender and self.recipient)
+
+    def _connection(self):
+        if self._smtp is not None and time() - self._last_used > self.idle_timeout:
+            self.close()
+        if self._smtp is None:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.starttls:
+                    smtp.starttls()
+                if self.password:
+                    smtp.login(self.sender, self.password)
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+            self.connections_opened += 1
+        return self._smtp
+
+    def send(self, alerts):
+        if len(alerts) == 1:
+            alert = alerts[0]
+            msg = email_notifier.build_alert_message(
+                alert["name"], alert["employee_id"], alert["stored_hash"],
+                alert["computed_hash"], alert["blockchain_hash"], self.sender, self.recipient,
+            )
+        else:
+            msg = email_notifier.build_digest_message(alerts, self.sender, self.recipient)
+
+        # A pooled session may have been dropped by the server; reconnect once
+        for attempt in (1, 2):
+            try:
+                self._connection().send_message(msg)
+                self._last_used = time()
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def idle(self):
+        if self._smtp is not None and time() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+
+class WebhookSink(AlertSink):
+    """POSTs {"type": "tampering", "count", "alerts"} as JSON"""
+
+    name = "webhook"
+
+    def __init__(self, url=ALERT_WEBHOOK_URL, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alerts):
+        body = json.dumps({"type": "tampering", "count": len(alerts), "alerts": alerts}, default=str)
+        request = urllib.request.Request(
+            self.url, data=body.encode('utf-8'), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        # Non-2xx raises HTTPError
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class LogFileSink(AlertSink):
+    """Appends one JSON line per alert"""
+
+    name = "log"
+
+    def __init__(self, path=ALERT_LOG_FILE):
+        self.path = path
+
+    def send(self, alerts):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert, default=str) + "\n")
+
+
+def build_sinks(names=ALERT_SINKS) -> list:
+    """Sinks for a comma separated list of names; unconfigured ones are skipped"""
+    sinks = []
+    for name in (n.strip().lower() for n in names.split(",") if n.strip()):
+        if name == "smtp":
+            sink = SMTPSink()
+            if not sink.configured:
+                print("⚠️ Email not configured. SMTP alert sink disabled")
+                continue
+        elif name == "webhook":
+            if not ALERT_WEBHOOK_URL:
+                print("⚠️ ALERT_WEBHOOK_URL not set. Webhook alert sink disabled")
+                continue
+            sink = WebhookSink()
+        elif name == "log":
+            sink = LogFileSink()
+        else:
+            raise ValueError(f"Unknown alert sink: {name}")
+        sinks.append(sink)
+    return sinks
+
+
+class AlertDispatcher:
+    """Queues tamper alerts and delivers them as digests from one worker thread
+
+    `sinks` defaults to build_sinks(). Alerts submitted before `start()` (or
+    after it stopped) stay queued until `flush()` / `stop()`.
+    """
+
+    def __init__(self, sinks=None, queue_size=ALERT_QUEUE_SIZE, cooldown=ALERT_COOLDOWN,
+                 digest_window=ALERT_DIGEST_WINDOW, digest_max=ALERT_DIGEST_MAX):
+        self.sinks = build_sinks() if sinks is None else sinks
+        self.cooldown = cooldown
+        self.digest_window = digest_window
+        self.digest_max = max(1, digest_max)
+        self._queue = queue.Queue(maxsize=queue_size)
+        # employee_id -> (hash fingerprint, alerted_at), oldest first
+        self._alerted = OrderedDict()
+        self._lock = threading.Lock()
+        self._deliver_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._counts = {"submitted": 0, "queued": 0, "deduplicated": 0, "dropped": 0,
+                        "digests": 0, "alerts_sent": 0, "undelivered": 0}
+        self._sink_errors = {sink.name: 0 for sink in self.sinks}
+        self._last_error = None
+
+    def submit(self, result, source=None) -> bool:
+        """Queue an alert for a verification result; False if deduplicated or the queue is full"""
+        employee_id = result["id"]
+        fingerprint = (result["stored_hash"], result["computed_hash"], result["blockchain_hash"])
+        now = time()
+        with self._lock:
+            self._counts["submitted"] += 1
+            previous = self._alerted.get(employee_id)
+            if previous and previous[0] == fingerprint and now - previous[1] < self.cooldown:
+                self._counts["deduplicated"] += 1
+                return False
+            self._alerted[employee_id] = (fingerprint, now)
+            self._alerted.move_to_end(employee_id)
+            if len(self._alerted) > DEDUP_CAPACITY:
+                self._alerted.popitem(last=False)
+
+        alert = {
+            "employee_id": employee_id,
+            "name": result["name"],
+            "stored_hash": result["stored_hash"],
+            "computed_hash": result["computed_hash"],
+            "blockchain_hash": result["blockchain_hash"],
+            "source": source,
+            "detected_at": datetime.now().isoformat(),
+        }
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            with self._lock:
+                self._counts["dropped"] += 1
+                # Not delivered, so the next detection may alert again
+                if self._alerted.get(employee_id) == (fingerprint, now):
+                    del self._alerted[employee_id]
+            return False
+        with self._lock:
+            self._counts["queued"] += 1
+        return True
+
+    def _deliver(self, alerts):
+        with self._deliver_lock:
+            delivered = 0
+            for sink in self.sinks:
+                try:
+                    sink.send(alerts)
+                    delivered += 1
+                except Exception as e:
+                    with self._lock:
+                        self._sink_errors[sink.name] = self._sink_errors.get(sink.name, 0) + 1
+                        self._last_error = f"{sink.name}: {e}"
+                    print(f"❌ Alert sink '{sink.name}' failed for {len(alerts)} alert(s): {e}")
+            with self._lock:
+                if delivered:
+                    self._counts["digests"] += 1
+                    self._counts["alerts_sent"] += len(alerts)
+                else:
+                    self._counts["undelivered"] += len(alerts)
+                    # No sink took the digest: lift the cooldown so the next detection alerts again
+                    for alert in alerts:
+                        fingerprint = (alert["stored_hash"], alert["computed_hash"], alert["blockchain_hash"])
+                        previous = self._alerted.get(alert["employee_id"])
+                        if previous and previous[0] == fingerprint:
+                            del self._alerted[alert["employee_id"]]
+        if delivered:
+            print(f"📧 Dispatched {len(alerts)} tamper alert(s) to {delivered}/{len(self.sinks)} sink(s)")
+        else:
+            print(f"❌ {len(alerts)} tamper alert(s) not delivered: every alert sink failed")
+
+    def _next_digest(self, wait):
+        """Alerts for one digest: the first within `wait` seconds, then the rest of its window"""
+        try:
+            first = self._queue.get(timeout=wait) if wait else self._queue.get_nowait()
+        except queue.Empty:
+            return []
+        digest = [first]
+        deadline = time() + self.digest_window
+        while len(digest) < self.digest_max:
+            remaining = deadline - time()
+            try:
+                # Stopping or flushing: take what is queued, do not wait out the window
+                if remaining <= 0 or self._stop.is_set() or not wait:
+                    digest.append(self._queue.get_nowait())
+                else:
+                    digest.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return digest
+
+    def _run(self):
+        while not self._stop.is_set():
+            digest = self._next_digest(wait=1.0)
+            if digest:
+                self._deliver(digest)
+            else:
+                for sink in self.sinks:
+                    sink.idle()
+
+    def flush(self):
+        """Deliver everything queued now, in the caller's thread"""
+        while True:
+            digest = self._next_digest(wait=0)
+            if not digest:
+                return
+            self._deliver(digest)
+
+    def start(self):
+        """Deliver alerts from a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker, deliver what is still queued and close the sinks"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.digest_window + 5)
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counts,
+                "pending": self._queue.qsize(),
+                "sinks": [sink.name for sink in self.sinks],
+                "sink_errors": dict(self._sink_errors),
+                "last_error": self._last_error,
+                "cooldown_seconds": self.cooldown,
+                "digest_window_seconds": self.digest_window,
+                "tracked_rows": len(self._alerted),
+            }
@@ -0,0 +1,383 @@
+import os
+import socket
+import threading
+from time import time, sleep
+from dotenv import load_dotenv
+from web3.exceptions import TransactionNotFound
+
+from Others.blockchain_client import submit_hash, submit_hashes, SUPPORTS_PACKED_ANCHORS, w3
+
+load_dotenv()
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 2))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+# Records per addHashes transaction when the contract supports packing (event-only contract)
+OUTBOX_PACK_SIZE = int(os.getenv("OUTBOX_PACK_SIZE", 20))
+# Retry delay = min(base * 2^attempts, max) seconds
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", 5))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", 600))
+# Rows left 'submitted' this long by any worker are assumed orphaned
+OUTBOX_SUBMITTED_TIMEOUT = float(os.getenv("OUTBOX_SUBMITTED_TIMEOUT", 900))
+# Identity recorded in claimed_by. It must be unique per running worker -
+# recover() treats rows claimed under its own ID as left over from a previous
+# run - so the default includes the PID. Set it explicitly (unique per
+# worker, e.g. per container) to reclaim in-flight rows right after a restart
+# instead of after OUTBOX_SUBMITTED_TIMEOUT.
+OUTBOX_WORKER_ID = os.getenv("OUTBOX_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+# How often a running worker resolves rows orphaned by dead workers
+OUTBOX_RECOVER_INTERVAL = float(os.getenv("OUTBOX_RECOVER_INTERVAL", 60))
+
+
+def enqueue_anchor(cursor, employee_id: int, record_hash: str):
+    """Queue a record for anchoring - call inside the transaction that inserts the record"""
+    cursor.execute(
+        "INSERT INTO anchor_outbox (employee_id, record_hash) VALUES (%s, %s);",
+        (employee_id, record_hash)
+    )
+
+
+def outbox_stats(cursor) -> dict:
+    """Backlog and throughput counters for the outbox"""
+    cursor.execute("SELECT status, COUNT(*) FROM anchor_outbox GROUP BY status;")
+    counts = {"pending": 0, "submitted": 0, "confirmed": 0, "failed": 0}
+    counts.update(dict(cursor.fetchall()))
+
+    cursor.execute("""
+        SELECT
+            EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - MIN(created_at)))
+                FILTER (WHERE status IN ('pending', 'submitted')),
+            COUNT(*) FILTER (WHERE status = 'confirmed' AND confirmed_at > CURRENT_TIMESTAMP - INTERVAL '1 minute'),
+            COUNT(*) FILTER (WHERE status = 'confirmed' AND confirmed_at > CURRENT_TIMESTAMP - INTERVAL '1 hour'),
+            AVG(EXTRACT(EPOCH FROM (confirmed_at - created_at)))
+                FILTER (WHERE status = 'confirmed' AND confirmed_at > CURRENT_TIMESTAMP - INTERVAL '1 hour')
+        FROM anchor_outbox
+        WHERE status <> 'confirmed' OR confirmed_at > CURRENT_TIMESTAMP - INTERVAL '1 hour';
+    """)
+    oldest_age, last_minute, last_hour, avg_latency = cursor.fetchone()
+
+    return {
+        "counts": counts,
+        "backlog": counts["pending"] + counts["submitted"],
+        "oldest_unconfirmed_seconds": float(oldest_age) if oldest_age is not None else None,
+        "confirmed_last_minute": last_minute,
+        "confirmed_last_hour": last_hour,
+        "avg_insert_to_confirmed_seconds": float(avg_latency) if avg_latency is not None else None,
+    }
+
+
+def recent_outbox_transactions(cursor, limit: int = 20):
+    """Most recent confirmed anchors (durable replacement for the in-memory history)"""
+    cursor.execute("""
+        SELECT o.tx_hash, s.name, o.employee_id, o.record_hash, o.confirmed_at
+        FROM anchor_outbox o
+        LEFT JOIN secure_db s ON s.id = o.employee_id
+        WHERE o.status = 'confirmed'
+        ORDER BY o.confirmed_at DESC
+        LIMIT %s;
+    """, (limit,))
+    return [
+        {
+            "tx_hash": tx_hash,
+            "employee_name": name,
+            "employee_id": employee_id,
+            "record_hash": record_hash,
+            "timestamp": confirmed_at.isoformat() if confirmed_at else None,
+            "etherscan_link": f"https://sepolia.etherscan.io/tx/{tx_hash}"
+        }
+        for tx_hash, name, employee_id, record_hash, confirmed_at in cursor.fetchall()
+    ]
+
+
+class AnchorWorker:
+    """Drains anchor_outbox onto the chain
+
+    Claims pending rows with FOR UPDATE SKIP LOCKED, so several workers can
+    share one outbox. Each worker process signs with its own account (the
+    PRIVATE_KEY / ACCOUNT_ADDRESS in its environment), since nonces are
+    managed per process.
+    """
+
+    def __init__(self, get_connection, submit=submit_hash, submit_many=None, pack_size=OUTBOX_PACK_SIZE,
+                 worker_id=OUTBOX_WORKER_ID,
+                 batch_size=OUTBOX_BATCH_SIZE, poll_interval=OUTBOX_POLL_INTERVAL,
+                 max_attempts=OUTBOX_MAX_ATTEMPTS, backoff_base=OUTBOX_BACKOFF_BASE,
+                 backoff_max=OUTBOX_BACKOFF_MAX, submitted_timeout=OUTBOX_SUBMITTED_TIMEOUT):
+        self.get_connection = get_connection
+        self.submit = submit
+        # Optional callable taking [(employee_id, record_hash), ...] -> Future (one tx per pack)
+        self.submit_many = submit_many
+        self.pack_size = pack_size if submit_many else 1
+        self.worker_id = worker_id
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.submitted_timeout = submitted_timeout
+        self._running = False
+        self._stats_lock = threading.Lock()
+        self.started_at = time()
+        self.stats = {"claimed": 0, "submitted": 0, "confirmed": 0, "retried": 0, "failed": 0}
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _execute(self, query, params=None, conn=None):
+        """Run one statement and commit; on `conn` if given, else a connection from get_connection"""
+        if conn is not None:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                rows = cursor.fetchall() if cursor.description else None
+                conn.commit()
+                return rows
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        conn = self.get_connection()
+        try:
+            return self._execute(query, params, conn)
+        finally:
+            conn.close()
+
+    # ---- claiming ----
+
+    def claim(self, conn):
+        """Lock a batch of due rows, mark them submitted and release the locks"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                UPDATE anchor_outbox
+                SET status = 'submitted', submitted_at = CURRENT_TIMESTAMP,
+                    attempts = attempts + 1, claimed_by = %s, tx_hash = NULL, tx_hashes = '{}'
+                WHERE id IN (
+                    SELECT id FROM anchor_outbox
+                    WHERE status = 'pending' AND next_attempt_at <= CURRENT_TIMESTAMP
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, employee_id, record_hash, attempts;
+            """, (self.worker_id, self.batch_size))
+            rows = cursor.fetchall()
+            conn.commit()
+            return sorted(rows)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def run_once(self) -> int:
+        """Claim and submit one batch on one connection; returns how many rows were claimed"""
+        conn = self.get_connection()
+        try:
+            return self._run_batch(conn)
+        finally:
+            conn.close()
+
+    def _run_batch(self, conn) -> int:
+        rows = self.claim(conn)
+        self._count("claimed", len(rows))
+        for start in range(0, len(rows), self.pack_size):
+            group = rows[start:start + self.pack_size]
+            try:
+                if self.pack_size > 1:
+                    future = self.submit_many([(employee_id, record_hash) for _, employee_id, record_hash, _ in group])
+                else:
+                    _, employee_id, record_hash, _ = group[0]
+                    future = self.submit(employee_id, record_hash)
+                if future.done() and future.exception() is not None:
+                    raise future.exception()
+            except Exception as e:
+                self._retry([outbox_id for outbox_id, _, _, _ in group], e, conn)
+                continue
+
+            outbox_ids = [outbox_id for outbox_id, _, _, _ in group]
+            tx_hash = getattr(future, "tx_hash", None)
+            if tx_hash:
+                self._execute("UPDATE anchor_outbox SET tx_hash = %s, tx_hashes = ARRAY[%s] WHERE id = ANY(%s);",
+                              (tx_hash, tx_hash, outbox_ids), conn)
+                # A fee-bumped replacement has a new hash: recover() must know all of them
+                future.on_replaced = lambda tx_hashes, outbox_ids=outbox_ids: self._record_hashes(outbox_ids, tx_hashes)
+            self._count("submitted", len(group))
+            # One outcome update per pack, not per row
+            future.add_done_callback(lambda f, outbox_ids=outbox_ids: self._on_result(outbox_ids, f))
+        return len(rows)
+
+    # ---- results ----
+
+    def _record_hashes(self, outbox_ids, tx_hashes):
+        self._execute("UPDATE anchor_outbox SET tx_hashes = %s WHERE id = ANY(%s) AND status = 'submitted';",
+                      (list(tx_hashes), list(outbox_ids)))
+
+    def _on_result(self, outbox_ids, future):
+        try:
+            error = future.exception()
+            if error is None and future.result()['status'] != 1:
+                error = RuntimeError("Transaction reverted")
+            if error is not None:
+                self._retry(outbox_ids, error)
+                return
+            receipt = future.result()
+            self._confirm(outbox_ids, receipt['transactionHash'].hex(), receipt['blockNumber'])
+        except Exception as e:
+            print(f"❌ Failed to record outcome for outbox rows {outbox_ids}: {e}")
+
+    def _confirm(self, outbox_ids, tx_hash, block_number, conn=None):
+        self._execute("""
+            UPDATE anchor_outbox
+            SET status = 'confirmed', tx_hash = %s, block_number = %s,
+                confirmed_at = CURRENT_TIMESTAMP, last_error = NULL
+            WHERE id = ANY(%s);
+        """, (tx_hash, block_number, list(outbox_ids)), conn)
+        self._count("confirmed", len(outbox_ids))
+
+    def _retry(self, outbox_ids, error, conn=None):
+        """Back rows off by their own attempt count, or fail those out of attempts - one statement"""
+        rows = self._execute("""
+            UPDATE anchor_outbox
+            SET status = CASE WHEN attempts >= %(max_attempts)s THEN 'failed' ELSE 'pending' END,
+                last_error = %(error)s,
+                next_attempt_at = CURRENT_TIMESTAMP
+                    + LEAST(%(base)s * 2 ^ GREATEST(attempts - 1, 0), %(max)s) * INTERVAL '1 second'
+            WHERE id = ANY(%(ids)s)
+            RETURNING id, status, attempts;
+        """, {"max_attempts": self.max_attempts, "error": str(error)[:1000], "base": self.backoff_base,
+              "max": self.backoff_max, "ids": list(outbox_ids)}, conn)
+        for outbox_id, status, attempts in rows:
+            if status == 'failed':
+                self._count("failed")
+                print(f"❌ Outbox row {outbox_id} failed after {attempts} attempts: {error}")
+            else:
+                self._count("retried")
+
+    # ---- crash recovery ----
+
+    def recover(self, own=True):
+        """Resolve rows left 'submitted' by this worker's ID before a restart (`own`) or by dead workers
+
+        Every hash sent for a row (the original and its fee-bumped
+        replacements) is checked. A row whose transaction was mined is
+        confirmed; one whose transaction is still known to the node (pending
+        in the mempool) is left alone, so it is never sent twice; anything
+        else was never sent or was dropped and goes back to pending.
+        """
+        # Without `own`, this worker's rows are skipped even when old: a slow,
+        # fee-bumped transaction still has a live submitter callback
+        mine = "claimed_by = %s OR" if own else "claimed_by IS DISTINCT FROM %s AND"
+        conn = self.get_connection()
+        try:
+            rows = self._execute(f"""
+                SELECT id, tx_hash, tx_hashes FROM anchor_outbox
+                WHERE status = 'submitted'
+                  AND ({mine} submitted_at < CURRENT_TIMESTAMP - %s * INTERVAL '1 second');
+            """, (self.worker_id, self.submitted_timeout), conn)
+            by_tx = {}
+            for outbox_id, tx_hash, tx_hashes in rows:
+                sent = tuple(tx_hashes) or ((tx_hash,) if tx_hash else ())
+                by_tx.setdefault(sent, []).append(outbox_id)
+
+            resent, in_flight = [], 0
+            for tx_hashes, outbox_ids in by_tx.items():
+                tx_hash, status = self._resolve(tx_hashes)
+                if isinstance(status, dict):
+                    if status['status'] == 1:
+                        self._confirm(outbox_ids, tx_hash, status['blockNumber'], conn)
+                        continue
+                elif status == "pending":
+                    in_flight += len(outbox_ids)
+                    continue
+                # Never sent, dropped or reverted - send again
+                resent.extend(outbox_ids)
+            if resent:
+                self._execute("""
+                    UPDATE anchor_outbox SET status = 'pending', next_attempt_at = CURRENT_TIMESTAMP
+                    WHERE id = ANY(%s) AND status = 'submitted';
+                """, (resent,), conn)
+        finally:
+            conn.close()
+        if rows:
+            print(f"🔄 Recovered {len(rows)} in-flight outbox rows "
+                  f"({len(resent)} requeued, {in_flight} still pending on-chain)")
+
+    @classmethod
+    def _resolve(cls, tx_hashes):
+        """(hash, status) for the attempt: a mined hash wins, then one still pending, else "unknown"
+
+        All hashes share one nonce, so at most one of them can be mined.
+        """
+        pending = None
+        for tx_hash in tx_hashes:
+            status = cls._tx_status(tx_hash)
+            if isinstance(status, dict):
+                return tx_hash, status
+            if status == "pending" and pending is None:
+                pending = tx_hash
+        if pending is not None:
+            return pending, "pending"
+        return None, "unknown"
+
+    @staticmethod
+    def _tx_status(tx_hash):
+        """The receipt if mined, "pending" if the node still has the transaction, else "unknown" """
+        try:
+            return w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            pass
+        try:
+            w3.eth.get_transaction(tx_hash)
+            return "pending"
+        except TransactionNotFound:
+            return "unknown"
+
+    # ---- loop ----
+
+    def throughput(self) -> float:
+        """Confirmed anchors per second since this worker started"""
+        return self.stats["confirmed"] / max(time() - self.started_at, 1e-9)
+
+    def run_forever(self, report_every=60):
+        self._running = True
+        self.recover()
+        last_report = last_recover = time()
+        while self._running:
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                print(f"❌ Worker error: {e}")
+                claimed = 0
+            if time() - last_recover >= OUTBOX_RECOVER_INTERVAL:
+                try:
+                    # Others' orphans only: this worker's own rows have live callbacks
+                    self.recover(own=False)
+                except Exception as e:
+                    print(f"❌ Outbox recovery error: {e}")
+                last_recover = time()
+            if time() - last_report >= report_every:
+                print(f"📊 Outbox worker {self.worker_id}: {self.stats} ({self.throughput():.2f} anchors/s)")
+                last_report = time()
+            # Keep draining while there is a backlog
+            if claimed < self.batch_size:
+                sleep(self.poll_interval)
+
+    def stop(self):
+        self._running = False
+
+
+if __name__ == "__main__":
+    from Others.db_connection import connect
+    from Others.db_pool import ConnectionPool
+
+    print(f"⛓️ Starting anchoring outbox worker ({OUTBOX_WORKER_ID})...")
+    # Claims, tx_hash updates and receipt callbacks share a few pooled connections
+    pool = ConnectionPool(connect)
+    pool.open()
+    try:
+        AnchorWorker(pool.acquire, submit_many=submit_hashes if SUPPORTS_PACKED_ANCHORS else None).run_forever()
+    finally:
+        pool.close()
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import aiohttp
+from dotenv import load_dotenv
+from web3 import AsyncWeb3
+from web3.providers import AsyncHTTPProvider
+
+from Others.blockchain_client import (
+    INFURA_URL, CONTRACT_ADDRESS, CONTRACT_ABI, SUPPORTS_MULTI_GET, MULTI_GET_CHUNK, RPC_BATCH_SIZE,
+    submit_hash, _hash_to_hex,
+)
+
+load_dotenv()
+
+# Max RPC requests (single calls or JSON-RPC batches) in flight from this process,
+# and keep-alive connections to the node
+ASYNC_RPC_CONCURRENCY = int(os.getenv("ASYNC_RPC_CONCURRENCY", 64))
+ASYNC_RPC_POOL_SIZE = int(os.getenv("ASYNC_RPC_POOL_SIZE", 32))
+ASYNC_RPC_TIMEOUT = float(os.getenv("ASYNC_RPC_TIMEOUT", 30))
+
+# Created lazily inside the running event loop (aiohttp sessions are loop-bound)
+_session = None
+_w3 = None
+_contract = None
+_semaphore = None
+_init_lock = asyncio.Lock()
+
+
+async def get_async_contract():
+    """Shared AsyncWeb3 contract backed by one keep-alive aiohttp session"""
+    global _session, _w3, _contract, _semaphore
+    if _contract is not None:
+        return _contract
+    async with _init_lock:
+        if _contract is None:
+            _session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=ASYNC_RPC_POOL_SIZE, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=ASYNC_RPC_TIMEOUT),
+            )
+            provider = AsyncHTTPProvider(INFURA_URL)
+            await provider.cache_async_session(_session)
+            _w3 = AsyncWeb3(provider)
+            _semaphore = asyncio.Semaphore(ASYNC_RPC_CONCURRENCY)
+            _contract = _w3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
+    return _contract
+
+
+async def close_async_client():
+    """Close the shared HTTP session (call on application shutdown)"""
+    global _session, _w3, _contract
+    if _session is not None:
+        await _session.close()
+    _session = _w3 = _contract = None
+
+
+async def _call(contract_function):
+    async with _semaphore:
+        return await contract_function.call()
+
+
+async def fetch_hash_async(employee_id: int) -> str:
+    """Async getHash; returns "0" * 64 when not anchored or on error"""
+    contract = await get_async_contract()
+    try:
+        return _hash_to_hex(await _call(contract.functions.getHash(employee_id)))
+    except Exception as e:
+        print(f"❌ Error fetching hash for ID {employee_id}: {e}")
+        return "0" * 64
+
+
+async def _batched_calls_async(calls) -> list:
+    """Run contract view calls as JSON-RPC batches of RPC_BATCH_SIZE requests
+
+    Batches go out concurrently, at most ASYNC_RPC_CONCURRENCY at a time.
+    Returns one result per call (None where a call failed).
+    """
+    groups = [calls[i:i + RPC_BATCH_SIZE] for i in range(0, len(calls), RPC_BATCH_SIZE)]
+
+    async def run_group(group):
+        async with _semaphore:
+            try:
+                async with _w3.batch_requests() as batch:
+                    for call in group:
+                        batch.add(call)
+                    return await batch.async_execute()
+            except Exception as e:
+                # Some providers reject batches - fall back to one call each for this group
+                print(f"⚠️ JSON-RPC batch failed ({e}), falling back to single calls")
+        results = await asyncio.gather(*(_call(call) for call in group), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"❌ Error in contract call: {result}")
+        return [None if isinstance(result, Exception) else result for result in results]
+
+    results = []
+    for group_results in await asyncio.gather(*(run_group(group) for group in groups)):
+        results.extend(group_results)
+    return results
+
+
+async def fetch_hashes_async(employee_ids) -> dict:
+    """Fetch many hashes in JSON-RPC batches; returns {employee_id: hash_hex}
+
+    V3 deployments batch getHashes chunks of MULTI_GET_CHUNK IDs, V2 batches
+    getHash calls, RPC_BATCH_SIZE per HTTP request - the same round trips
+    as the sync fetch_hashes, but with the batches in flight concurrently.
+    IDs whose lookup failed are left out, so callers can tell an RPC error
+    apart from "not anchored" ("0" * 64).
+    """
+    ids = list(dict.fromkeys(int(employee_id) for employee_id in employee_ids))
+    if not ids:
+        return {}
+    contract = await get_async_contract()
+
+    hashes = {}
+    if SUPPORTS_MULTI_GET:
+        chunks = [ids[i:i + MULTI_GET_CHUNK] for i in range(0, len(ids), MULTI_GET_CHUNK)]
+        results = await _batched_calls_async([contract.functions.getHashes(chunk) for chunk in chunks])
+        for chunk, chunk_hashes in zip(chunks, results):
+            if chunk_hashes is None:
+                continue
+            for employee_id, hash_bytes in zip(chunk, chunk_hashes):
+                hashes[employee_id] = _hash_to_hex(hash_bytes)
+    else:
+        results = await _batched_calls_async([contract.functions.getHash(employee_id) for employee_id in ids])
+        for employee_id, hash_bytes in zip(ids, results):
+            if hash_bytes is not None:
+                hashes[employee_id] = _hash_to_hex(hash_bytes)
+    return hashes
+
+
+async def push_hash_async(employee_id: int, record_hash: str):
+    """Anchor a hash without blocking the event loop; returns the receipt or None
+
+    Writes still go through the shared TransactionSubmitter so sync and async
+    callers draw nonces from the same local counter.
+    """
+    try:
+        future = await asyncio.to_thread(submit_hash, employee_id, record_hash)
+        receipt = await asyncio.wrap_future(future)
+        print(f"✅ Hash pushed to blockchain for Employee ID {employee_id}. Tx: {receipt['transactionHash'].hex()}")
+        return receipt
+    except Exception as e:
+        print(f"❌ Error pushing hash: {e}")
+        return None
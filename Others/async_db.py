@@ -0,0 +1,373 @@
+"""Async data access for the API: an asyncpg pool plus secure_db repository functions
+
+Endpoints await these instead of running blocking psycopg2 calls in the
+threadpool, so one worker process serves as many concurrent requests as the
+pool has connections for, with the rest waiting on the pool rather than
+on threads. Worker threads (Merkle batcher, engine, change verifier, ...)
+keep the psycopg2 pool in Others/db_pool.py.
+
+Every repository function takes an optional `conn`; pass the one from
+`transaction()` to group statements, otherwise a pooled connection is
+borrowed for the single statement.
+"""
+import asyncio
+import os
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from decimal import Decimal
+from time import monotonic
+import asyncpg
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ASYNC_DB_POOL_MIN = int(os.getenv("ASYNC_DB_POOL_MIN", 2))
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", 20))
+ASYNC_DB_ACQUIRE_TIMEOUT = float(os.getenv("ASYNC_DB_ACQUIRE_TIMEOUT", 10))
+ASYNC_DB_COMMAND_TIMEOUT = float(os.getenv("ASYNC_DB_COMMAND_TIMEOUT", 30))
+# Idle connections above the minimum are closed after this many seconds
+ASYNC_DB_IDLE_TIMEOUT = float(os.getenv("ASYNC_DB_IDLE_TIMEOUT", 300))
+# A CSV export runs as one COPY under a single timeout, so it gets its own
+ASYNC_DB_EXPORT_TIMEOUT = float(os.getenv("ASYNC_DB_EXPORT_TIMEOUT", 3600))
+# Export bytes handed to the client per chunk, and chunks buffered ahead of it
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", 64 * 1024))
+EXPORT_QUEUE_CHUNKS = int(os.getenv("EXPORT_QUEUE_CHUNKS", 4))
+
+EMPLOYEE_COLUMNS = "id, name, role, salary, record_hash, created_at"
+VERIFY_COLUMNS = "id, name, role, salary, record_hash, created_at, hash_version"
+# CSV export columns, aliased to the header row it has always had
+EXPORT_COLUMNS = ('id AS "ID", name AS "Name", role AS "Role", salary AS "Salary", '
+                  'record_hash AS "Record Hash", created_at AS "Created At"')
+
+# Columns GET /employees may project
+LISTING_FIELDS = ("id", "name", "role", "salary", "record_hash", "created_at", "hash_version")
+# Listing sort key -> (column, descending); each is backed by an (column, id) index
+LISTING_SORTS = {
+    "id": ("id", False), "-id": ("id", True),
+    "name": ("name", False), "-name": ("name", True),
+    "created_at": ("created_at", False), "-created_at": ("created_at", True),
+}
+
+# Created lazily inside the running event loop (asyncpg pools are loop-bound)
+_pool = None
+_init_lock = asyncio.Lock()
+_acquire_latencies = deque(maxlen=1000)
+_counts = {"acquired": 0, "timeouts": 0}
+# Set once secure_db_summary turns out not to be installed
+_summary_missing = False
+
+
+def _connect_kwargs() -> dict:
+    db_host = os.getenv("DB_HOST", "localhost")
+    is_neon = "neon.tech" in db_host
+    kwargs = dict(
+        database=os.getenv("DB_NAME", "neondb" if is_neon else "audit_logs"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD"),
+        host=db_host,
+        port=int(os.getenv("DB_PORT", 5432)),
+        timeout=10 if is_neon else 5,
+    )
+    if is_neon:
+        kwargs["ssl"] = "require"
+    if "-pooler" in db_host:
+        # PgBouncer in transaction mode cannot keep prepared statements per session
+        kwargs["statement_cache_size"] = 0
+    return kwargs
+
+
+async def get_pool():
+    """The shared asyncpg pool, created on first use"""
+    global _pool
+    if _pool is not None:
+        return _pool
+    async with _init_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                min_size=ASYNC_DB_POOL_MIN,
+                max_size=ASYNC_DB_POOL_MAX,
+                max_inactive_connection_lifetime=ASYNC_DB_IDLE_TIMEOUT,
+                command_timeout=ASYNC_DB_COMMAND_TIMEOUT,
+                **_connect_kwargs(),
+            )
+    return _pool
+
+
+async def connect():
+    """A standalone asyncpg connection outside the pool (CLI scripts)"""
+    return await asyncpg.connect(**_connect_kwargs())
+
+
+async def close_pool():
+    """Close the shared pool (call on application shutdown)"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+    _pool = None
+
+
+@asynccontextmanager
+async def connection():
+    """Borrow a pooled connection"""
+    pool = await get_pool()
+    started = monotonic()
+    try:
+        conn = await pool.acquire(timeout=ASYNC_DB_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _counts["timeouts"] += 1
+        raise
+    _counts["acquired"] += 1
+    _acquire_latencies.append(monotonic() - started)
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+@asynccontextmanager
+async def transaction():
+    """Borrow a connection inside a transaction (committed on success, rolled back on error)"""
+    async with connection() as conn:
+        async with conn.transaction():
+            yield conn
+
+
+def pool_stats() -> dict:
+    latencies = sorted(_acquire_latencies)
+    stats = {
+        "open": _pool is not None,
+        **_counts,
+        "acquire_ms": {
+            "avg": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+            "p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 3) if latencies else None,
+            "max": round(latencies[-1] * 1000, 3) if latencies else None,
+            "samples": len(latencies),
+        },
+    }
+    if _pool is not None:
+        size, idle = _pool.get_size(), _pool.get_idle_size()
+        stats.update({"size": size, "idle": idle, "in_use": size - idle,
+                      "min_size": _pool.get_min_size(), "max_size": _pool.get_max_size()})
+    return stats
+
+
+async def _fetch(conn, query, *args):
+    if conn is not None:
+        return await conn.fetch(query, *args)
+    async with connection() as conn:
+        return await conn.fetch(query, *args)
+
+
+async def _fetchrow(conn, query, *args):
+    if conn is not None:
+        return await conn.fetchrow(query, *args)
+    async with connection() as conn:
+        return await conn.fetchrow(query, *args)
+
+
+async def _fetchval(conn, query, *args):
+    if conn is not None:
+        return await conn.fetchval(query, *args)
+    async with connection() as conn:
+        return await conn.fetchval(query, *args)
+
+
+# ---- secure_db reads ----
+
+async def employee_exists(employee_id, conn=None) -> bool:
+    return await _fetchval(conn, "SELECT EXISTS (SELECT 1 FROM secure_db WHERE id = $1);", employee_id)
+
+
+async def find_by_name(name, conn=None) -> list:
+    """(id, name, role) of employees whose name matches case-insensitively"""
+    return await _fetch(conn, "SELECT id, name, role FROM secure_db WHERE LOWER(name) = LOWER($1);", name)
+
+
+def search_conditions(name=None, role=None, min_salary=None, max_salary=None, first_param=1):
+    """WHERE clause and params for the search filters (substring name/role, salary range)
+
+    Matches Database/search_indexes.sql: lower(name|role) LIKE hits the
+    trigram indexes and the salary range the salary_amount btree. Salaries
+    that are not numbers never match a range. Placeholders start at
+    $first_param.
+    """
+    conditions, params = [], []
+    if name:
+        params.append(f"%{name.lower()}%")
+        conditions.append(f"lower(name) LIKE ${first_param + len(params) - 1}")
+    if role:
+        params.append(f"%{role.lower()}%")
+        conditions.append(f"lower(role) LIKE ${first_param + len(params) - 1}")
+    if min_salary:
+        params.append(Decimal(str(min_salary)))
+        conditions.append(f"salary_amount >= ${first_param + len(params) - 1}")
+    if max_salary:
+        params.append(Decimal(str(max_salary)))
+        conditions.append(f"salary_amount <= ${first_param + len(params) - 1}")
+    return " AND ".join(conditions) or "TRUE", params
+
+
+async def search_employees(name=None, role=None, min_salary=None, max_salary=None, conn=None) -> list:
+    """Employees matching the search filters, by id"""
+    where, params = search_conditions(name, role, min_salary, max_salary)
+    return await _fetch(conn, f"SELECT {EMPLOYEE_COLUMNS} FROM secure_db WHERE {where} ORDER BY id;", *params)
+
+
+async def count_employees(after_id=None, conn=None) -> int:
+    """Rows with id > after_id; the whole-table count comes from the maintained counter"""
+    if after_id is None:
+        return await total_employees(conn)
+    return await _fetchval(conn, "SELECT COUNT(*) FROM secure_db WHERE id > $1;", after_id)
+
+
+async def total_employees(conn=None) -> int:
+    """secure_db row count from secure_db_summary (Database/employee_listing.sql), else COUNT(*)"""
+    global _summary_missing
+    if not _summary_missing:
+        try:
+            count = await _fetchval(conn, "SELECT row_count FROM secure_db_summary WHERE id = 1;")
+            if count is not None:
+                return count
+        except asyncpg.UndefinedTableError:
+            _summary_missing = True
+            print("⚠️ secure_db_summary not installed (Database/employee_listing.sql); counting with COUNT(*)")
+    return await _fetchval(conn, "SELECT COUNT(*) FROM secure_db;")
+
+
+async def list_page(sort="id", after=None, limit=100, fields=LISTING_FIELDS, conn=None) -> list:
+    """One keyset page of secure_db in `sort` order (a LISTING_SORTS key)
+
+    `after` is the (sort value, id) of the previous page's last row, or None
+    for the first page. Rows always carry id and the sort column besides
+    `fields`. Under the created_at sorts, rows without a created_at are not listed.
+    """
+    column, descending = LISTING_SORTS[sort]
+    columns = ", ".join(dict.fromkeys(("id", column, *fields)))
+    direction, op = ("DESC", "<") if descending else ("ASC", ">")
+    query = f"SELECT {columns} FROM secure_db"
+    params = []
+    if column == "id":
+        if after is not None:
+            params.append(after[1])
+            query += f" WHERE id {op} $1"
+        query += f" ORDER BY id {direction}"
+    else:
+        if after is not None:
+            params.extend(after)
+            query += f" WHERE ({column}, id) {op} ($1, $2)"
+        elif column == "created_at":
+            query += " WHERE created_at IS NOT NULL"
+        query += f" ORDER BY {column} {direction}, id {direction}"
+    params.append(limit)
+    return await _fetch(conn, f"{query} LIMIT ${len(params)};", *params)
+
+
+async def recent_employees(limit=20, conn=None) -> list:
+    """(id, name, role, salary, created_at), newest first"""
+    return await _fetch(
+        conn, "SELECT id, name, role, salary, created_at FROM secure_db ORDER BY created_at DESC LIMIT $1;", limit
+    )
+
+
+async def get_for_verification(employee_id, conn=None):
+    """(id, name, role, salary, record_hash, created_at, hash_version) or None"""
+    return await _fetchrow(conn, f"SELECT {VERIFY_COLUMNS} FROM secure_db WHERE id = $1;", employee_id)
+
+
+async def verification_page(after_id=0, limit=500, conn=None) -> list:
+    """Keyset page of rows to verify, ordered by id"""
+    return await _fetch(
+        conn, f"SELECT {VERIFY_COLUMNS} FROM secure_db WHERE id > $1 ORDER BY id LIMIT $2;", after_id, limit
+    )
+
+
+async def report_rows(limit=50, conn=None) -> list:
+    """(id, name, role, salary) for the PDF report"""
+    return await _fetch(conn, "SELECT id, name, role, salary FROM secure_db ORDER BY id LIMIT $1;", limit)
+
+
+async def export_csv(name=None, role=None, min_salary=None, max_salary=None, chunk_size=EXPORT_CHUNK_BYTES):
+    """CSV (with header) of the employees matching the search filters, in id order, as bytes chunks
+
+    Streamed from COPY ... TO STDOUT through a queue of EXPORT_QUEUE_CHUNKS
+    chunks: when the consumer falls behind, the COPY sink waits, asyncpg
+    stops reading the socket and the server pauses, so memory stays at a
+    few chunks whatever the table size. Closing the generator early cancels
+    the COPY.
+    """
+    where, params = search_conditions(name, role, min_salary, max_salary)
+    query = f"SELECT {EXPORT_COLUMNS} FROM secure_db WHERE {where} ORDER BY id"
+    queue = asyncio.Queue(maxsize=EXPORT_QUEUE_CHUNKS)
+    buffer = bytearray()
+
+    async def sink(data):
+        buffer.extend(data)
+        if len(buffer) >= chunk_size:
+            await queue.put(bytes(buffer))
+            buffer.clear()
+
+    async def copy():
+        try:
+            async with connection() as conn:
+                await conn.copy_from_query(query, *params, output=sink, format="csv", header=True,
+                                           timeout=ASYNC_DB_EXPORT_TIMEOUT)
+            if buffer:
+                await queue.put(bytes(buffer))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    task = asyncio.create_task(copy())
+    try:
+        while (chunk := await queue.get()) is not None:
+            yield chunk
+        await task  # re-raises a failed COPY
+    finally:
+        if not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+
+# ---- secure_db writes ----
+
+async def insert_employee(employee_id, name, role, salary, record_hash, created_at, hash_version, conn=None):
+    """Insert a record; returns (id, name, role, salary, record_hash, created_at)"""
+    return await _fetchrow(conn, f"""
+        INSERT INTO secure_db (id, name, role, salary, record_hash, created_at, hash_version)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        RETURNING {EMPLOYEE_COLUMNS};
+    """, employee_id, name, role, salary, record_hash, created_at, hash_version)
+
+
+async def enqueue_anchor(employee_id, record_hash, conn=None):
+    """Outbox row for Others/anchor_worker.py - pass the inserting transaction's `conn`"""
+    await _fetchval(
+        conn, "INSERT INTO anchor_outbox (employee_id, record_hash) VALUES ($1, $2);", employee_id, record_hash
+    )
+
+
+async def update_field(employee_id, field, value, conn=None):
+    """Overwrite name, role or salary (tamper simulation); returns (id, name, role, salary) or None"""
+    if field not in ("name", "role", "salary"):
+        raise ValueError(f"Field cannot be updated: {field}")
+    return await _fetchrow(
+        conn, f'UPDATE secure_db SET "{field}" = $1 WHERE id = $2 RETURNING id, name, role, salary;',
+        value, employee_id,
+    )
+
+
+async def delete_employee(employee_id, conn=None):
+    """Delete a record; returns (id, name) or None"""
+    return await _fetchrow(conn, "DELETE FROM secure_db WHERE id = $1 RETURNING id, name;", employee_id)
+
+
+async def truncate_employees() -> int:
+    """Empty secure_db; returns how many rows it held"""
+    async with transaction() as conn:
+        count = await conn.fetchval("SELECT COUNT(*) FROM secure_db;")
+        await conn.execute("TRUNCATE TABLE secure_db RESTART IDENTITY CASCADE;")
+    return count
@@ -0,0 +1,385 @@
+"""Anchoring throughput / gas benchmark against a local chain
+
+Deploys the audit contract to an in-process eth-tester chain (default) or a
+local anvil node, injects RPC latency and block times, and anchors the same
+synthetic workload with every strategy the client supports. Prints JSON.
+
+    python -m Others.benchmark_anchoring --records 200 --latency-ms 50 --block-time 2
+    python -m Others.benchmark_anchoring --anvil http://127.0.0.1:8545 --output bench.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from time import time, sleep
+from web3 import Web3
+from solcx import compile_source, install_solc
+
+from Others.tx_submitter import TransactionSubmitter
+from Others.merkle import merkle_leaf, build_merkle_tree, merkle_root
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOLC_VERSION = '0.8.0'
+
+# anvil's first default dev account
+ANVIL_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+
+class InstrumentedProvider:
+    """Wraps a provider's make_request: adds latency, counts calls per method
+
+    eth-tester is not thread-safe, so requests are serialized with a lock;
+    the injected latency is slept outside it so round trips still overlap.
+    """
+
+    def __init__(self, provider, latency=0.0):
+        self.provider = provider
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = {}
+        self._make_request = provider.make_request
+        provider.make_request = self.make_request
+
+    def make_request(self, method, params):
+        if self.latency:
+            sleep(self.latency / 2)
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            response = self._make_request(method, params)
+        if self.latency:
+            sleep(self.latency / 2)
+        return response
+
+    def reset(self):
+        with self.lock:
+            self.calls = {}
+
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+class LocalChain:
+    """An eth-tester or anvil chain with a fixed block time"""
+
+    def __init__(self, latency=0.0, block_time=0.0, anvil_url=None):
+        self.block_time = block_time
+        self._miner = None
+        self._running = False
+
+        if anvil_url:
+            provider = Web3.HTTPProvider(anvil_url)
+            self.w3 = Web3(provider)
+            self.private_key = ANVIL_PRIVATE_KEY
+            if block_time:
+                self.w3.provider.make_request('evm_setAutomine', [False])
+                self.w3.provider.make_request('evm_setIntervalMining', [int(block_time)])
+            self.tester = None
+        else:
+            from eth_tester import EthereumTester
+            from web3.providers.eth_tester import EthereumTesterProvider
+            self.tester = EthereumTester(auto_mine_transactions=not block_time)
+            provider = EthereumTesterProvider(ethereum_tester=self.tester)
+            self.w3 = Web3(provider)
+            self.private_key = self.tester.backend.account_keys[0].to_hex()
+
+        self.instrument = InstrumentedProvider(provider, latency)
+        self.account = self.w3.eth.account.from_key(self.private_key).address
+        self.chain_id = self.w3.eth.chain_id
+
+    def start_mining(self):
+        if self.tester is None or not self.block_time:
+            return
+        self._running = True
+        self._miner = threading.Thread(target=self._mine, name="bench-miner", daemon=True)
+        self._miner.start()
+
+    def stop_mining(self):
+        self._running = False
+        if self._miner:
+            self._miner.join()
+
+    def _mine(self):
+        while self._running:
+            sleep(self.block_time)
+            with self.instrument.lock:
+                self.tester.mine_blocks(1)
+
+    def deploy(self, sol_file):
+        install_solc(SOLC_VERSION)
+        with open(os.path.join(SCRIPT_DIR, sol_file), 'r') as f:
+            compiled = compile_source(f.read(), output_values=['abi', 'bin'], solc_version=SOLC_VERSION)
+        _, interface = compiled.popitem()
+        factory = self.w3.eth.contract(abi=interface['abi'], bytecode=interface['bin'])
+        txn = factory.constructor().build_transaction({
+            'chainId': self.chain_id,
+            'from': self.account,
+            'nonce': self.w3.eth.get_transaction_count(self.account, 'pending'),
+            'gas': 3000000,
+            'gasPrice': self.w3.eth.gas_price,
+        })
+        signed = self.w3.eth.account.sign_transaction(txn, private_key=self.private_key)
+        tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
+        receipt = self._wait(tx_hash)
+        return self.w3.eth.contract(address=receipt.contractAddress, abi=interface['abi'])
+
+    def _wait(self, tx_hash, poll=0.05):
+        return self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=600, poll_latency=poll)
+
+
+def synthetic_records(count, start_id=1):
+    return [
+        (start_id + i, hashlib.sha256(f"bench-employee-{start_id + i}".encode('utf-8')).hexdigest())
+        for i in range(count)
+    ]
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _arrivals(records, rate, start):
+    """Yield (employee_id, record_hash, arrival_time), sleeping until each arrival"""
+    for i, (employee_id, record_hash) in enumerate(records):
+        arrival = start + (i / rate if rate else 0)
+        delay = arrival - time()
+        if delay > 0:
+            sleep(delay)
+        yield employee_id, record_hash, arrival
+
+
+# ---- strategies ----
+# Each returns (latencies, receipts) for the given records
+
+def run_serial(chain, contract, records, rate, **_):
+    """Baseline: the original push_hash - nonce lookup, send, block on the receipt"""
+    latencies, receipts = [], []
+    for employee_id, record_hash, arrival in _arrivals(records, rate, time()):
+        txn = contract.functions.addHash(employee_id, bytes.fromhex(record_hash)).build_transaction({
+            'chainId': chain.chain_id,
+            'gas': 200000,
+            'gasPrice': chain.w3.eth.gas_price,
+            'nonce': chain.w3.eth.get_transaction_count(chain.account),
+        })
+        signed = chain.w3.eth.account.sign_transaction(txn, private_key=chain.private_key)
+        receipt = chain._wait(chain.w3.eth.send_raw_transaction(signed.raw_transaction))
+        latencies.append(time() - arrival)
+        receipts.append(receipt)
+    return latencies, receipts
+
+
+def _make_submitter(chain, poll_interval):
+    return TransactionSubmitter(
+        chain.w3, chain.account, chain.private_key, chain.chain_id,
+        poll_interval=poll_interval, stuck_after=3600,
+    )
+
+
+def run_pipelined(chain, contract, records, rate, poll_interval, **_):
+    """TransactionSubmitter: local nonces, many txs in flight, one receipt poller"""
+    submitter = _make_submitter(chain, poll_interval)
+    latencies, receipts, futures = [], [], []
+    lock = threading.Lock()
+
+    def on_done(future, arrival):
+        with lock:
+            latencies.append(time() - arrival)
+            if future.exception() is None:
+                receipts.append(future.result())
+
+    for employee_id, record_hash, arrival in _arrivals(records, rate, time()):
+        future = submitter.submit(contract.functions.addHash(employee_id, bytes.fromhex(record_hash)))
+        future.add_done_callback(lambda f, arrival=arrival: on_done(f, arrival))
+        futures.append(future)
+    for future in futures:
+        try:
+            future.result(timeout=600)
+        except Exception as e:
+            print(f"⚠️ Transaction failed: {e}")
+    submitter.stop()
+    return latencies, receipts
+
+
+def run_merkle(chain, contract, records, rate, poll_interval, batch_size, **_):
+    """One anchorRoot tx per batch of `batch_size` records (needs AuditLogV3)"""
+    submitter = _make_submitter(chain, poll_interval)
+    latencies, receipts, futures = [], [], []
+    lock = threading.Lock()
+    batch = []
+
+    def on_done(future, arrivals):
+        now = time()
+        with lock:
+            latencies.extend(now - arrival for arrival in arrivals)
+            if future.exception() is None:
+                receipts.append(future.result())
+
+    def flush():
+        leaves = [merkle_leaf(employee_id, record_hash) for employee_id, record_hash, _ in batch]
+        root = merkle_root(build_merkle_tree(leaves))
+        future = submitter.submit(contract.functions.anchorRoot(bytes.fromhex(root), len(batch)))
+        arrivals = [arrival for _, _, arrival in batch]
+        future.add_done_callback(lambda f: on_done(f, arrivals))
+        futures.append(future)
+        batch.clear()
+
+    for record in _arrivals(records, rate, time()):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    for future in futures:
+        try:
+            future.result(timeout=600)
+        except Exception as e:
+            print(f"⚠️ Transaction failed: {e}")
+    submitter.stop()
+    return latencies, receipts
+
+
+def run_packed(chain, contract, records, rate, poll_interval, batch_size, **_):
+    """One addHashes tx per `batch_size` records - logs only (needs AuditLogEvents)"""
+    submitter = _make_submitter(chain, poll_interval)
+    latencies, receipts, futures = [], [], []
+    lock = threading.Lock()
+    batch = []
+
+    def on_done(future, arrivals):
+        now = time()
+        with lock:
+            latencies.extend(now - arrival for arrival in arrivals)
+            if future.exception() is None:
+                receipts.append(future.result())
+
+    def flush():
+        contract_function = contract.functions.addHashes(
+            [employee_id for employee_id, _, _ in batch],
+            [bytes.fromhex(record_hash) for _, record_hash, _ in batch],
+        )
+        gas = int(contract_function.estimate_gas({'from': chain.account}) * 1.2)
+        future = submitter.submit(contract_function, gas=gas)
+        arrivals = [arrival for _, _, arrival in batch]
+        future.add_done_callback(lambda f: on_done(f, arrivals))
+        futures.append(future)
+        batch.clear()
+
+    for record in _arrivals(records, rate, time()):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    for future in futures:
+        try:
+            future.result(timeout=600)
+        except Exception as e:
+            print(f"⚠️ Transaction failed: {e}")
+    submitter.stop()
+    return latencies, receipts
+
+
+# strategy name -> (runner, contract source it needs)
+STRATEGIES = {
+    "serial": (run_serial, 'smart_contract_v2.sol'),
+    "pipelined": (run_pipelined, 'smart_contract_v2.sol'),
+    "merkle": (run_merkle, 'smart_contract_v3.sol'),
+    # Event-only contract: same addHash call, but no SSTORE
+    "events": (run_pipelined, 'smart_contract_events.sol'),
+    "events-packed": (run_packed, 'smart_contract_events.sol'),
+}
+
+
+def run_benchmark(strategies=None, records=100, latency_ms=0.0, block_time=0.0, rate=0.0,
+                  batch_size=64, poll_interval=0.25, anvil_url=None) -> dict:
+    chain = LocalChain(latency=latency_ms / 1000, block_time=block_time, anvil_url=anvil_url)
+    chain.start_mining()
+    contracts = {}
+    results = []
+    next_id = 1
+    try:
+        for name in strategies or list(STRATEGIES):
+            runner, sol_file = STRATEGIES[name]
+            if sol_file not in contracts:
+                contracts[sol_file] = chain.deploy(sol_file)
+            workload = synthetic_records(records, start_id=next_id)
+            next_id += records  # fresh IDs so every strategy writes new storage slots
+
+            print(f"⏱️ Running {name} ({records} records)...")
+            chain.instrument.reset()
+            started = time()
+            latencies, receipts = runner(
+                chain, contracts[sol_file], workload, rate,
+                poll_interval=poll_interval, batch_size=batch_size,
+            )
+            elapsed = time() - started
+            rpc_calls = dict(chain.instrument.calls)
+            gas_used = sum(receipt['gasUsed'] for receipt in receipts)
+
+            results.append({
+                "strategy": name,
+                "records": records,
+                "transactions": len(receipts),
+                "elapsed_seconds": round(elapsed, 3),
+                "records_per_second": round(records / elapsed, 3) if elapsed else None,
+                "gas_per_record": round(gas_used / records, 1) if records else None,
+                "latency_seconds": {
+                    "p50": _percentile(latencies, 50),
+                    "p90": _percentile(latencies, 90),
+                    "p99": _percentile(latencies, 99),
+                    "max": max(latencies) if latencies else None,
+                },
+                "rpc_calls_per_record": round(sum(rpc_calls.values()) / records, 2) if records else None,
+                "rpc_calls": rpc_calls,
+            })
+    finally:
+        chain.stop_mining()
+
+    return {
+        "backend": "anvil" if anvil_url else "eth-tester",
+        "config": {
+            "records": records,
+            "latency_ms": latency_ms,
+            "block_time": block_time,
+            "arrival_rate": rate,
+            "merkle_batch_size": batch_size,
+        },
+        "generated_at": time(),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark anchoring strategies on a local chain")
+    parser.add_argument("--records", type=int, default=100)
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help=f"comma separated subset of: {', '.join(STRATEGIES)}")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="injected round-trip latency per RPC")
+    parser.add_argument("--block-time", type=float, default=0.0, help="seconds per block (0 = automine)")
+    parser.add_argument("--rate", type=float, default=0.0, help="record arrivals per second (0 = all at once)")
+    parser.add_argument("--batch-size", type=int, default=64, help="records per Merkle root / addHashes call")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="receipt poll interval")
+    parser.add_argument("--anvil", dest="anvil_url", help="use a local anvil node instead of eth-tester")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        strategies=[s.strip() for s in args.strategies.split(",") if s.strip()],
+        records=args.records, latency_ms=args.latency_ms, block_time=args.block_time,
+        rate=args.rate, batch_size=args.batch_size, poll_interval=args.poll_interval,
+        anvil_url=args.anvil_url,
+    )
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"✅ Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Record hashing microbenchmark: legacy f-string loop vs record_hash.hash_rows
+
+Hashes the same synthetic secure_db tuples with the per-row f-string path
+verification used before (Others/record_hash.py version 1) and with the batch
+hasher under every version, and prints rows/s as JSON. No database needed.
+
+    python -m Others.benchmark_hashing --rows 200000 --repeat 5
+"""
+import argparse
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from Others.record_hash import SUPPORTED_VERSIONS, hash_rows
+
+ROLES = ["Engineer", "Manager", "Analyst", "Designer", "Ingénieure", "Ops"]
+
+
+def synthetic_rows(count, seed=7):
+    """(id, name, role, salary, record_hash, created_at) tuples shaped like secure_db rows"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return [
+        (i, f"Employee {i}", rng.choice(ROLES), str(rng.randint(30000, 250000)), None,
+         start + timedelta(seconds=rng.randint(0, 60 * 86400), microseconds=rng.randint(0, 999999)))
+        for i in range(1, count + 1)
+    ]
+
+
+def legacy_loop(rows):
+    """The per-row path hash_rows replaced"""
+    out = []
+    for row in rows:
+        emp_id, name, role, salary, stored_hash, created_at = row
+        combined_data = f"{name}{role}{salary}{created_at.isoformat()}".encode('utf-8')
+        out.append((emp_id, hashlib.sha256(combined_data).hexdigest()))
+    return out
+
+
+def best_of(fn, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        fn(rows)
+        best = min(best, perf_counter() - started)
+    return best
+
+
+def run_benchmark(rows=100000, repeat=3) -> dict:
+    data = synthetic_rows(rows)
+    cases = {"legacy-fstring": legacy_loop}
+    for version in SUPPORTED_VERSIONS:
+        cases[f"hash_rows-v{version}"] = lambda batch, version=version: hash_rows(batch, version)
+
+    # Version 1 through hash_rows must stay byte-identical to the old path
+    assert hash_rows(data[:1000], 1) == legacy_loop(data[:1000])
+
+    baseline = None
+    results = {}
+    for name, fn in cases.items():
+        elapsed = best_of(fn, data, repeat)
+        baseline = baseline or elapsed
+        results[name] = {
+            "seconds": round(elapsed, 4),
+            "rows_per_second": round(rows / elapsed),
+            "relative_to_legacy": round(baseline / elapsed, 2),
+        }
+    return {"rows": rows, "repeat": repeat, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark record hashing versions")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs per case")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Employee search benchmark on a synthetic multi-million-row copy of secure_db
+
+Builds a scratch table shaped like secure_db, times the pre-index search
+queries (LOWER(name) LIKE LOWER(...), CAST(salary AS FLOAT)) against the
+btree indexes from neon_setup.sql, then applies the search_indexes.sql
+layout (trigram GIN indexes, backfilled salary_amount + btree) and times
+the queries the API now runs. Needs pg_trgm and secure_db_parse_salary,
+i.e. Database/search_indexes.sql applied. Prints a JSON report.
+
+    python -m Others.benchmark_search --rows 2000000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+from statistics import median
+from time import perf_counter
+
+from Others.async_db import EMPLOYEE_COLUMNS, connect, search_conditions
+from Others.search_migration import backfill_salary, check_plans, create_salary_index, print_plan_checks
+
+FIRST_NAMES = ["Alice", "Bob", "Carmen", "Deepak", "Elena", "Farid", "Grace", "Hiro", "Ines", "Joanna",
+               "Kwame", "Lena", "Mateo", "Nadia", "Oscar", "Priya", "Quinn", "Rosa", "Sven", "Yuki"]
+LAST_NAMES = ["Anders", "Brennan", "Castillo", "Dubois", "Eriksen", "Fischer", "Gupta", "Hansen", "Ivanova",
+              "Johnson", "Kowalski", "Larsen", "Moreau", "Nakamura", "Okafor", "Petrov", "Rossi", "Schmidt",
+              "Tanaka", "Zhang"]
+ROLES = ["Engineer", "Senior Engineer", "Manager", "Analyst", "Designer", "Accountant", "Recruiter",
+         "Support Specialist", "Data Scientist", "Ops Lead"]
+
+# (label, filters): selective and broad shapes of what the UI sends
+SEARCHES = [
+    ("name, selective", {"name": "zhang-1234"}),
+    ("name, broad", {"name": "joanna"}),
+    ("role", {"role": "ops lead"}),
+    ("salary range", {"min_salary": 100000, "max_salary": 100500}),
+    ("name + salary", {"name": "rossi", "min_salary": 240000}),
+]
+
+
+def legacy_query(table, name=None, role=None, min_salary=None, max_salary=None):
+    """The search SQL POST /employees/search ran before the trigram/salary_amount indexes"""
+    query = f"SELECT {EMPLOYEE_COLUMNS} FROM {table} WHERE 1=1"
+    params = []
+    if name:
+        params.append(f"%{name}%")
+        query += f" AND LOWER(name) LIKE LOWER(${len(params)})"
+    if role:
+        params.append(f"%{role}%")
+        query += f" AND LOWER(role) LIKE LOWER(${len(params)})"
+    if min_salary:
+        params.append(float(min_salary))
+        query += f" AND CAST(salary AS FLOAT) >= ${len(params)}"
+    if max_salary:
+        params.append(float(max_salary))
+        query += f" AND CAST(salary AS FLOAT) <= ${len(params)}"
+    return query + " ORDER BY id;", params
+
+
+def indexed_query(table, **filters):
+    where, params = search_conditions(**filters)
+    return f"SELECT {EMPLOYEE_COLUMNS} FROM {table} WHERE {where} ORDER BY id;", params
+
+
+async def populate(conn, table, rows, chunk=500000):
+    await conn.execute(f"DROP TABLE IF EXISTS {table};")
+    await conn.execute(f"""
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            role TEXT,
+            salary TEXT,
+            record_hash TEXT,
+            created_at TIMESTAMP,
+            hash_version SMALLINT NOT NULL DEFAULT 1,
+            salary_amount NUMERIC
+        );
+    """)
+    for start in range(1, rows + 1, chunk):
+        end = min(rows, start + chunk - 1)
+        await conn.execute(f"""
+            INSERT INTO {table} (id, name, role, salary, record_hash, created_at)
+            SELECT g,
+                   ($1::text[])[1 + (hashtext(g::text || 'f') & 65535) % cardinality($1::text[])] || ' ' ||
+                   ($2::text[])[1 + (hashtext(g::text || 'l') & 65535) % cardinality($2::text[])] || '-' || g,
+                   ($3::text[])[1 + (hashtext(g::text || 'r') & 65535) % cardinality($3::text[])],
+                   (30000 + (hashtext(g::text || 's') & 1048575) % 220001)::text,
+                   md5(g::text) || md5(g::text || 'x'),
+                   TIMESTAMP '2024-01-01' + (g % 31536000) * INTERVAL '1 second'
+            FROM generate_series($4::int, $5::int) g;
+        """, FIRST_NAMES, LAST_NAMES, ROLES, start, end)
+        print(f"   ... {end}/{rows} rows")
+    # The secure_db indexes from neon_setup.sql
+    await conn.execute(f"CREATE INDEX idx_{table}_name ON {table}(name);")
+    await conn.execute(f"CREATE INDEX idx_{table}_created_at ON {table}(created_at);")
+    await conn.execute(f"ANALYZE {table};")
+
+
+async def time_searches(conn, table, build, repeat) -> dict:
+    timings = {}
+    for label, filters in SEARCHES:
+        query, params = build(table, **filters)
+        samples, matched = [], 0
+        for _ in range(repeat):
+            started = perf_counter()
+            matched = len(await conn.fetch(query, *params))
+            samples.append(perf_counter() - started)
+        timings[label] = {"median_ms": round(median(samples) * 1000, 2), "rows": matched}
+    return timings
+
+
+async def timed(coroutine):
+    started = perf_counter()
+    result = await coroutine
+    return result, round(perf_counter() - started, 2)
+
+
+async def main(args):
+    table = args.table
+    conn = await connect()
+    try:
+        print(f"🏗️ Building {table} with {args.rows} rows")
+        _, build_seconds = await timed(populate(conn, table, args.rows))
+
+        print("⏱️ Timing legacy search queries")
+        legacy = await time_searches(conn, table, legacy_query, args.repeat)
+
+        print("🔨 Creating trigram indexes, backfilling salary_amount, creating the salary index")
+        _, trgm_seconds = await timed(conn.execute(f"""
+            CREATE INDEX idx_{table}_name_trgm ON {table} USING gin (lower(name) gin_trgm_ops);
+            CREATE INDEX idx_{table}_role_trgm ON {table} USING gin (lower(role) gin_trgm_ops);
+        """))
+        backfill = await backfill_salary(conn, table, args.batch)
+        _, salary_index_seconds = await timed(create_salary_index(conn, table))
+        await conn.execute(f"ANALYZE {table};")
+
+        print("⏱️ Timing indexed search queries")
+        indexed = await time_searches(conn, table, indexed_query, args.repeat)
+        plans = await check_plans(conn, table)
+        plans_ok = print_plan_checks(plans)
+
+        report = {
+            "rows": args.rows,
+            "repeat": args.repeat,
+            "setup_seconds": {"populate": build_seconds, "trigram_indexes": trgm_seconds,
+                              "salary_index": salary_index_seconds},
+            "backfill": backfill,
+            "searches": {
+                label: {
+                    "legacy_ms": legacy[label]["median_ms"],
+                    "indexed_ms": indexed[label]["median_ms"],
+                    "speedup": round(legacy[label]["median_ms"] / indexed[label]["median_ms"], 1)
+                    if indexed[label]["median_ms"] else None,
+                    "rows": indexed[label]["rows"],
+                    "same_rows": legacy[label]["rows"] == indexed[label]["rows"],
+                }
+                for label, _ in SEARCHES
+            },
+            "plans": plans,
+        }
+        print(json.dumps(report, indent=2))
+        if not plans_ok:
+            print("❌ Some searches cannot use their index")
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP TABLE IF EXISTS {table};")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark employee search before/after the search indexes")
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=50000, help="salary_amount backfill batch size")
+    parser.add_argument("--table", default="secure_db_search_bench")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic table afterwards")
+    asyncio.run(main(parser.parse_args()))
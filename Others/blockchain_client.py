@@ -1,7 +1,10 @@
 from web3 import Web3
 import json
 import os
+from concurrent.futures import Future
 from dotenv import load_dotenv
+from Others.tx_submitter import TransactionSubmitter
+from Others.gas_oracle import GasOracle
 
 load_dotenv()
 
@@ -10,21 +13,35 @@ INFURA_URL = os.getenv("INFURA_URL")
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 ACCOUNT_ADDRESS = os.getenv("ACCOUNT_ADDRESS")
 CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS")
+CONTRACT_V3_ADDRESS = os.getenv("CONTRACT_V3_ADDRESS")  # Optional - Merkle root anchoring
+# Set to 3 when CONTRACT_ADDRESS is an AuditLogV3, "events" for the event-only AuditLogEvents
+CONTRACT_VERSION = os.getenv("CONTRACT_VERSION", "2").lower()
+
+# Bulk reads: IDs per getHashes call, and JSON-RPC requests per HTTP round trip
+MULTI_GET_CHUNK = int(os.getenv("MULTI_GET_CHUNK", 500))
+RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", 100))
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Load ABI - try v2 first, fallback to v1
+def _load_abi(filename):
+    with open(os.path.join(SCRIPT_DIR, filename), 'r') as f:
+        return json.load(f)
+
+# Load ABI - v3 if configured, otherwise try v2 first, fallback to v1
 try:
-    abi_path_v2 = os.path.join(SCRIPT_DIR, 'contract_abi_v2.json')
-    with open(abi_path_v2, 'r') as f:
-        CONTRACT_ABI = json.load(f)
-    print("✅ Using V2 Contract ABI (Employee ID based)")
+    if CONTRACT_VERSION == "3":
+        CONTRACT_ABI = _load_abi('contract_abi_v3.json')
+        print("✅ Using V3 Contract ABI (Employee ID based, bulk reads)")
+    elif CONTRACT_VERSION == "events":
+        CONTRACT_ABI = _load_abi('contract_abi_events.json')
+        print("✅ Using event-only Contract ABI (reads served from the HashAdded index)")
+    else:
+        CONTRACT_ABI = _load_abi('contract_abi_v2.json')
+        print("✅ Using V2 Contract ABI (Employee ID based)")
 except FileNotFoundError:
     try:
-        abi_path_v1 = os.path.join(SCRIPT_DIR, 'contract_abi.json')
-        with open(abi_path_v1, 'r') as f:
-            CONTRACT_ABI = json.load(f)
+        CONTRACT_ABI = _load_abi('contract_abi.json')
         print("⚠️ Using V1 Contract ABI (Name based)")
     except FileNotFoundError:
         print("❌ ERROR: No contract ABI file found!")
@@ -32,36 +49,77 @@ except FileNotFoundError:
         print("Please ensure contract_abi_v2.json or contract_abi.json exists")
         raise
 
+# getHashes multi-get is only available on V3 deployments
+SUPPORTS_MULTI_GET = any(entry.get('name') == 'getHashes' for entry in CONTRACT_ABI)
+
+# Event-only contracts keep no storage: there is no getHash, anchors are read from logs
+EVENT_ONLY_CONTRACT = not any(entry.get('name') == 'getHash' for entry in CONTRACT_ABI)
+# addHashes packs many records into one transaction (event-only contract)
+SUPPORTS_PACKED_ANCHORS = any(entry.get('name') == 'addHashes' for entry in CONTRACT_ABI)
+
 # Connect to blockchain
 w3 = Web3(Web3.HTTPProvider(INFURA_URL))
 contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
 
+# V3 contract (Merkle roots) is deployed alongside V2 and only loaded when configured;
+# a V3 primary contract serves Merkle anchoring itself
+contract_v3 = contract if CONTRACT_VERSION == "3" else None
+if CONTRACT_V3_ADDRESS:
+    try:
+        contract_v3 = w3.eth.contract(address=CONTRACT_V3_ADDRESS, abi=_load_abi('contract_abi_v3.json'))
+        print("✅ V3 Contract loaded (Merkle root anchoring)")
+    except FileNotFoundError:
+        print("⚠️ CONTRACT_V3_ADDRESS set but contract_abi_v3.json not found - Merkle anchoring disabled")
+
 print(f"Connected to Sepolia: {w3.is_connected()}")
 
+def _to_bytes32(hex_hash: str) -> bytes:
+    """Convert a hex hash string (with or without 0x) to bytes32"""
+    if hex_hash.startswith('0x'):
+        return bytes.fromhex(hex_hash[2:])
+    return bytes.fromhex(hex_hash)
+
+# Worst-case calls for gas estimation: a never-used ID / a fresh root writes a new storage slot
+_PROBE_ID = 2**256 - 1
+gas_oracle = GasOracle(w3, ACCOUNT_ADDRESS, probes={
+    'addHash': lambda: contract.functions.addHash(_PROBE_ID, b'\x01' * 32),
+    'anchorRoot': lambda: contract_v3.functions.anchorRoot(os.urandom(32), 1),
+})
+
+# All transactions go through one submitter: local nonces, many in flight, one receipt poller
+submitter = TransactionSubmitter(w3, ACCOUNT_ADDRESS, PRIVATE_KEY, chain_id=11155111, gas_oracle=gas_oracle)
+
+def _send_contract_transaction(contract_function):
+    """Send a contract call through the submitter and wait for its receipt"""
+    receipt = submitter.submit(contract_function).result()
+    return receipt['transactionHash'], receipt
+
+def submit_hash(employee_id: int, record_hash: str) -> Future:
+    """Queue an addHash transaction without blocking; Future resolves to the receipt"""
+    return submitter.submit(contract.functions.addHash(employee_id, _to_bytes32(record_hash)))
+
+def submit_hashes(records) -> Future:
+    """Queue one addHashes transaction for [(employee_id, record_hash), ...]
+    
+    Gas depends on the batch size, so it is estimated per call rather than
+    taken from the per-method cache.
+    """
+    if not SUPPORTS_PACKED_ANCHORS:
+        raise RuntimeError("Contract has no addHashes - packed anchoring needs the event-only contract")
+    contract_function = contract.functions.addHashes(
+        [employee_id for employee_id, _ in records],
+        [_to_bytes32(record_hash) for _, record_hash in records],
+    )
+    gas = int(contract_function.estimate_gas({'from': ACCOUNT_ADDRESS}) * gas_oracle.estimate_margin)
+    return submitter.submit(contract_function, gas=gas)
+
 def push_hash(employee_id: int, record_hash: str):
     """Push hash to blockchain using employee ID as key"""
     try:
-        # Convert hash string to bytes32
-        if record_hash.startswith('0x'):
-            hash_bytes = bytes.fromhex(record_hash[2:])
-        else:
-            hash_bytes = bytes.fromhex(record_hash)
-        
-        # Build transaction
-        nonce = w3.eth.get_transaction_count(ACCOUNT_ADDRESS)
-        txn = contract.functions.addHash(employee_id, hash_bytes).build_transaction({
-            'chainId': 11155111,
-            'gas': 200000,
-            'gasPrice': w3.eth.gas_price,
-            'nonce': nonce,
-        })
-        
-        # Sign and send
-        signed_txn = w3.eth.account.sign_transaction(txn, private_key=PRIVATE_KEY)
-        tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+        hash_bytes = _to_bytes32(record_hash)
         
-        # Wait for confirmation
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        # Build, sign, send and wait for confirmation
+        tx_hash, receipt = _send_contract_transaction(contract.functions.addHash(employee_id, hash_bytes))
         print(f"✅ Hash pushed to blockchain for Employee ID {employee_id}. Tx: {tx_hash.hex()}")
         return receipt
     except Exception as e:
@@ -79,3 +137,81 @@ def fetch_hash(employee_id: int) -> str:
     except Exception as e:
         print(f"❌ Error fetching hash for ID {employee_id}: {e}")
         return "0" * 64  # Return empty hash on error
+
+def _hash_to_hex(hash_bytes) -> str:
+    if hash_bytes == b'\x00' * 32:
+        return "0" * 64  # Not found in blockchain
+    return hash_bytes.hex()
+
+def _batched_calls(calls):
+    """Run contract view calls as JSON-RPC batches of RPC_BATCH_SIZE requests
+
+    Returns one result per call (None where a call failed).
+    """
+    results = []
+    for start in range(0, len(calls), RPC_BATCH_SIZE):
+        group = calls[start:start + RPC_BATCH_SIZE]
+        try:
+            with w3.batch_requests() as batch:
+                for call in group:
+                    batch.add(call)
+                results.extend(batch.execute())
+        except Exception as e:
+            # Some providers reject batches - fall back to one call each for this group
+            print(f"⚠️ JSON-RPC batch failed ({e}), falling back to single calls")
+            for call in group:
+                try:
+                    results.append(call.call())
+                except Exception as call_error:
+                    print(f"❌ Error in contract call: {call_error}")
+                    results.append(None)
+    return results
+
+def fetch_hashes(employee_ids) -> dict:
+    """Fetch hashes for many employee IDs; returns {employee_id: hash_hex}
+
+    Uses getHashes (V3) in chunks of MULTI_GET_CHUNK IDs, or batched getHash
+    calls on V2, so N records cost about N / (chunk * batch) round trips.
+    """
+    ids = list(dict.fromkeys(int(employee_id) for employee_id in employee_ids))
+    if not ids:
+        return {}
+    
+    hashes = {}
+    if SUPPORTS_MULTI_GET:
+        chunks = [ids[i:i + MULTI_GET_CHUNK] for i in range(0, len(ids), MULTI_GET_CHUNK)]
+        results = _batched_calls([contract.functions.getHashes(chunk) for chunk in chunks])
+        for chunk, chunk_hashes in zip(chunks, results):
+            if chunk_hashes is None:
+                chunk_hashes = [b'\x00' * 32] * len(chunk)
+            for employee_id, hash_bytes in zip(chunk, chunk_hashes):
+                hashes[employee_id] = _hash_to_hex(hash_bytes)
+    else:
+        results = _batched_calls([contract.functions.getHash(employee_id) for employee_id in ids])
+        for employee_id, hash_bytes in zip(ids, results):
+            hashes[employee_id] = _hash_to_hex(hash_bytes) if hash_bytes is not None else "0" * 64
+    return hashes
+
+def push_root(merkle_root: str, leaf_count: int):
+    """Anchor a Merkle root covering `leaf_count` record hashes (V3 contract)"""
+    if contract_v3 is None:
+        print("❌ Cannot anchor Merkle root: CONTRACT_V3_ADDRESS not configured")
+        return None
+    try:
+        root_bytes = _to_bytes32(merkle_root)
+        tx_hash, receipt = _send_contract_transaction(contract_v3.functions.anchorRoot(root_bytes, leaf_count))
+        print(f"✅ Merkle root anchored for {leaf_count} records. Tx: {tx_hash.hex()}")
+        return receipt
+    except Exception as e:
+        print(f"❌ Error anchoring Merkle root: {e}")
+        return None
+
+def fetch_root_timestamp(merkle_root: str) -> int:
+    """Block timestamp a Merkle root was anchored at (0 if not anchored)"""
+    if contract_v3 is None:
+        return 0
+    try:
+        return contract_v3.functions.rootAnchoredAt(_to_bytes32(merkle_root)).call()
+    except Exception as e:
+        print(f"❌ Error fetching Merkle root {merkle_root[:16]}...: {e}")
+        return 0
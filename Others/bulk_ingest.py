@@ -0,0 +1,327 @@
+"""Bulk employee ingest: streamed CSV/NDJSON -> COPY staging -> one set-based insert
+
+POST /employees/bulk hands the request body to ingest(). Rows are parsed as
+the body arrives, hashed in chunks and COPYed into a temporary staging
+table, so the API never holds the whole upload. ID conflicts (with secure_db
+or earlier lines of the same upload) and case-insensitive name conflicts
+are then marked with one UPDATE over the staging table, every clean row is
+inserted with one INSERT ... SELECT, and in outbox mode the anchors are
+queued by one more statement - all in a single transaction. Bad rows are
+reported back by line number instead of aborting the upload.
+
+The CLI streams an employees_live.csv-style file (id,name,role,salary; any
+record_hash column is ignored - the server computes it) to a running API:
+
+    python -m Others.bulk_ingest Database/employees_live.csv --url http://127.0.0.1:8000
+"""
+import argparse
+import codecs
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from time import perf_counter
+from dotenv import load_dotenv
+
+from Others import async_db
+from Others.record_hash import hash_rows, RECORD_HASH_VERSION
+
+load_dotenv()
+
+# Uploads with more data rows than this are refused (413) - the staging
+# table, rejections and anchor batch all scale with it
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", 100000))
+# Rows hashed (and stamped with one created_at) per chunk while streaming into COPY
+BULK_HASH_BATCH = int(os.getenv("BULK_HASH_BATCH", 5000))
+
+REQUIRED_COLUMNS = ("id", "name", "role", "salary")
+FORMATS = ("csv", "ndjson")
+INT4_MIN, INT4_MAX = -(2 ** 31), 2 ** 31 - 1
+
+STAGING_COLUMNS = ["line", "id", "name", "role", "salary", "record_hash", "created_at"]
+
+
+class BulkFormatError(ValueError):
+    """The upload as a whole is unusable (bad CSV header, unknown format)"""
+
+
+class BulkTooLarge(BulkFormatError):
+    """The upload has more than BULK_MAX_ROWS data rows"""
+
+
+# ---- parsing ----
+
+async def _lines(chunks):
+    """(line number, text) for each physical line of a byte stream (UTF-8, optional BOM)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, number = "", 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split("\n")
+        for text in complete:
+            number += 1
+            yield number, text.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield number + 1, buffer.rstrip("\r")
+
+
+async def csv_records(chunks):
+    """(line, fields, error) per CSV data row; the first row is the header
+
+    A quoted field may span lines; the record is reported at the line it
+    starts on.
+    """
+    header, pending, start = None, None, 0
+    async for number, text in _lines(chunks):
+        if pending is None:
+            if not text.strip():
+                continue
+            pending, start = text, number
+        else:
+            pending += "\n" + text
+        if pending.count('"') % 2:
+            continue  # inside a quoted field
+        values, pending = next(csv.reader([pending])), None
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            missing = [column for column in REQUIRED_COLUMNS if column not in header]
+            if missing:
+                raise BulkFormatError(f"CSV header is missing column(s): {', '.join(missing)}")
+            continue
+        if len(values) != len(header):
+            yield start, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, dict(zip(header, values)), None
+    if pending is not None:
+        yield start, None, "unterminated quoted field"
+    if header is None:
+        raise BulkFormatError("CSV upload is empty (no header row)")
+
+
+async def ndjson_records(chunks):
+    """(line, fields, error) per non-blank NDJSON line"""
+    async for number, text in _lines(chunks):
+        if not text.strip():
+            continue
+        try:
+            fields = json.loads(text)
+        except ValueError as e:
+            yield number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(fields, dict):
+            yield number, None, "expected a JSON object"
+            continue
+        yield number, fields, None
+
+
+def validate(fields):
+    """(id, name, role, salary) or raise ValueError with the rejection reason"""
+    raw_id = fields.get("id")
+    if isinstance(raw_id, bool) or not isinstance(raw_id, (int, str)):
+        raise ValueError("id must be an integer")
+    try:
+        employee_id = int(raw_id.strip()) if isinstance(raw_id, str) else raw_id
+    except ValueError:
+        raise ValueError("id must be an integer")
+    if not INT4_MIN <= employee_id <= INT4_MAX:
+        raise ValueError("id out of range")
+
+    values = []
+    for column in ("name", "role", "salary"):
+        value = fields.get(column)
+        if value is None:
+            raise ValueError(f"missing {column}")
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f"{column} must be a string")
+        values.append(str(value))
+    name, role, salary = values
+    if not name.strip():
+        raise ValueError("name is empty")
+    return employee_id, name, role, salary
+
+
+def _rejection(line, employee_id, name, reason) -> dict:
+    return {"line": line, "id": employee_id, "name": name, "reason": reason}
+
+
+# ---- staging ----
+
+def _hash_chunk(chunk, hash_version):
+    """Staging tuples for [(line, id, name, role, salary)], hashed in one pass"""
+    created_at = datetime.now()
+    hashed = hash_rows([(row[1], row[2], row[3], row[4], None, created_at) for row in chunk], hash_version)
+    return [(*row, record_hash, created_at) for row, (_, record_hash) in zip(chunk, hashed)]
+
+
+async def _staged_rows(records, hash_version, report):
+    """Valid rows as staging tuples; invalid ones go to report["rejected"]"""
+    chunk = []
+    async for line, fields, error in records:
+        report["received"] += 1
+        if report["received"] > BULK_MAX_ROWS:
+            raise BulkTooLarge(f"Upload has more than {BULK_MAX_ROWS} rows; split it into several requests")
+        if error is None:
+            try:
+                chunk.append((line, *validate(fields)))
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            fields = fields or {}
+            report["rejected"].append(_rejection(line, fields.get("id"), fields.get("name"), error))
+            continue
+        if len(chunk) >= BULK_HASH_BATCH:
+            for row in _hash_chunk(chunk, hash_version):
+                yield row
+            chunk = []
+    if chunk:
+        for row in _hash_chunk(chunk, hash_version):
+            yield row
+
+
+# An ID that is taken (in secure_db or by an earlier line) always rejects the
+# row; names are only checked among rows that survive the ID check, so a
+# later line is not refused because of an earlier line that was itself rejected.
+_MARK_CONFLICTS = """
+    UPDATE bulk_staging s SET reason = c.reason
+    FROM (
+        SELECT line,
+               CASE
+                   WHEN id_reason IS NOT NULL THEN id_reason
+                   WHEN $1 THEN NULL
+                   WHEN name_taken THEN 'name_exists'
+                   WHEN row_number() OVER (PARTITION BY name_key, id_reason IS NULL ORDER BY line) > 1
+                       THEN 'duplicate_name_in_batch'
+               END AS reason
+        FROM (
+            SELECT b.line,
+                   lower(b.name) AS name_key,
+                   CASE
+                       WHEN d.id IS NOT NULL THEN 'id_exists'
+                       WHEN row_number() OVER (PARTITION BY b.id ORDER BY b.line) > 1 THEN 'duplicate_id_in_batch'
+                   END AS id_reason,
+                   n.name_key IS NOT NULL AS name_taken
+            FROM bulk_staging b
+            LEFT JOIN secure_db d ON d.id = b.id
+            LEFT JOIN (
+                SELECT DISTINCT lower(name) AS name_key FROM secure_db
+                WHERE lower(name) IN (SELECT lower(name) FROM bulk_staging)
+            ) n ON n.name_key = lower(b.name)
+        ) k
+    ) c
+    WHERE s.line = c.line AND c.reason IS NOT NULL
+    RETURNING s.line, s.id, s.name, c.reason;
+"""
+
+# Rows another writer inserted since the conflict check lose ON CONFLICT and
+# are reported as id_exists
+_INSERT_CLEAN = """
+    WITH inserted AS (
+        INSERT INTO secure_db (id, name, role, salary, record_hash, created_at, hash_version)
+        SELECT id, name, role, salary, record_hash, created_at, $1
+        FROM bulk_staging WHERE reason IS NULL
+        ORDER BY line
+        ON CONFLICT (id) DO NOTHING
+        RETURNING id
+    )
+    SELECT s.line, s.id, s.name, s.record_hash, i.id IS NOT NULL AS inserted
+    FROM bulk_staging s
+    LEFT JOIN inserted i ON i.id = s.id
+    WHERE s.reason IS NULL
+    ORDER BY s.line;
+"""
+
+
+async def ingest(chunks, fmt="csv", force_duplicate=False, outbox=False, hash_version=RECORD_HASH_VERSION) -> dict:
+    """Insert every valid row of a streamed upload in one transaction
+
+    `chunks` is an async iterable of bytes (e.g. Request.stream()). Returns
+    {received, inserted, rejected, records, seconds}: `rejected` lists
+    {line, id, name, reason} in line order and `records` the inserted
+    (id, name, record_hash) for anchoring. With `outbox` the anchor_outbox
+    rows are written in the same transaction.
+    """
+    if fmt not in FORMATS:
+        raise BulkFormatError(f"Unsupported format: {fmt}")
+    records = csv_records(chunks) if fmt == "csv" else ndjson_records(chunks)
+    report = {"received": 0, "inserted": 0, "rejected": [], "records": []}
+    started = perf_counter()
+
+    async with async_db.transaction() as conn:
+        await conn.execute("""
+            CREATE TEMP TABLE bulk_staging (
+                line INTEGER PRIMARY KEY,
+                id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                role TEXT,
+                salary TEXT,
+                record_hash TEXT NOT NULL,
+                created_at TIMESTAMP NOT NULL,
+                reason TEXT
+            ) ON COMMIT DROP;
+        """)
+        await conn.copy_records_to_table(
+            "bulk_staging", records=_staged_rows(records, hash_version, report), columns=STAGING_COLUMNS
+        )
+        # Temp tables have no statistics until analyzed; the conflict joins need them
+        await conn.execute("ANALYZE bulk_staging;")
+
+        for row in await conn.fetch(_MARK_CONFLICTS, force_duplicate):
+            report["rejected"].append(_rejection(row["line"], row["id"], row["name"], row["reason"]))
+
+        for row in await conn.fetch(_INSERT_CLEAN, hash_version):
+            if row["inserted"]:
+                report["records"].append((row["id"], row["name"], row["record_hash"]))
+            else:
+                report["rejected"].append(_rejection(row["line"], row["id"], row["name"], "id_exists"))
+
+        if outbox and report["records"]:
+            await conn.execute("""
+                INSERT INTO anchor_outbox (employee_id, record_hash)
+                SELECT * FROM unnest($1::int[], $2::text[]);
+            """, [r[0] for r in report["records"]], [r[2] for r in report["records"]])
+
+    report["inserted"] = len(report["records"])
+    report["rejected"].sort(key=lambda rejection: rejection["line"])
+    report["seconds"] = round(perf_counter() - started, 3)
+    return report
+
+
+# ---- CLI ----
+
+def main(args):
+    import requests
+
+    fmt = args.format or ("ndjson" if args.file.endswith((".ndjson", ".jsonl")) else "csv")
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    print(f"📤 Uploading {args.file} ({fmt}) to {args.url}/employees/bulk")
+    with open(args.file, "rb") as upload:
+        response = requests.post(
+            f"{args.url}/employees/bulk",
+            data=upload,
+            params={"force_duplicate": str(args.force_duplicate).lower()},
+            headers={"Content-Type": content_type},
+            timeout=args.timeout,
+        )
+    if response.status_code != 200:
+        print(f"❌ {response.status_code}: {response.text}")
+        sys.exit(1)
+
+    report = response.json()
+    print(f"✅ {report['inserted']}/{report['received']} rows inserted in {report['seconds']}s "
+          f"(anchoring: {report['anchoring']})")
+    for rejection in report["rejected"]:
+        print(f"   ⚠️ line {rejection['line']} (ID {rejection['id']}): {rejection['reason']}")
+    if report["rejected"]:
+        print(f"⚠️ {len(report['rejected'])} rows rejected")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load employees through POST /employees/bulk")
+    parser.add_argument("file", help="CSV with id,name,role,salary columns, or NDJSON (.ndjson/.jsonl)")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--force-duplicate", action="store_true", help="allow names that already exist")
+    parser.add_argument("--timeout", type=float, default=600)
+    main(parser.parse_args())
@@ -0,0 +1,303 @@
+"""Incremental tamper detection driven by the secure_db change journal
+
+Database/change_journal.sql journals every UPDATE/DELETE on secure_db and
+notifies 'secure_db_changes'. The verifier LISTENs on that channel and
+re-verifies only the journaled rows, so detection cost follows the number
+of modified rows rather than table size. Progress is a (txid, seq)
+watermark in verifier_state: after downtime (or a missed notification) the
+next pass simply resumes from it.
+
+    python -m Others.change_verifier          # listen and verify until stopped
+    python -m Others.change_verifier --once   # catch up to the watermark head and exit
+"""
+import argparse
+import os
+import select
+import threading
+from collections import deque
+from datetime import datetime
+from time import time
+from dotenv import load_dotenv
+
+from Others.verification_engine import hash_rows, build_result, classify, chain_lookup
+
+load_dotenv()
+
+CHANGE_VERIFIER_CHANNEL = "secure_db_changes"
+# Journal entries per pass (one row fetch + one chain lookup each)
+CHANGE_VERIFIER_BATCH = int(os.getenv("CHANGE_VERIFIER_BATCH", 500))
+# Catch-up poll when no notification arrives (or LISTEN is unavailable, e.g. a pgbouncer pooler)
+CHANGE_VERIFIER_POLL_INTERVAL = float(os.getenv("CHANGE_VERIFIER_POLL_INTERVAL", 60))
+# Verified journal entries older than this are deleted
+CHANGE_JOURNAL_RETENTION_DAYS = int(os.getenv("CHANGE_JOURNAL_RETENTION_DAYS", 7))
+
+
+class ChangeVerifier:
+    """Re-verifies rows touched since the last watermark
+
+    `get_connection` returns a psycopg2 connection; one extra connection,
+    from `listen_connection` (default `get_connection`), is held in
+    autocommit mode for LISTEN. `lookup(conn, ids)` returns chain
+    hashes like the verification engine's. Callbacks run on the verifier
+    thread; `on_batch` gets each pass's results before the watermark moves.
+    """
+
+    def __init__(self, get_connection, lookup=chain_lookup, name="secure_db",
+                 batch_size=CHANGE_VERIFIER_BATCH, poll_interval=CHANGE_VERIFIER_POLL_INTERVAL,
+                 retention_days=CHANGE_JOURNAL_RETENTION_DAYS, on_tampered=None, on_result=None,
+                 on_batch=None, listen_connection=None):
+        self.get_connection = get_connection
+        self.listen_connection = listen_connection or get_connection
+        self.lookup = lookup
+        self.name = name
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retention_days = retention_days
+        self.on_tampered = on_tampered
+        self.on_result = on_result
+        self.on_batch = on_batch
+        self._thread = None
+        self._running = False
+        self._listen_conn = None
+        self._blocked = False
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"passes": 0, "changes": 0, "verified": 0, "tampered": 0,
+                       "not_anchored": 0, "deleted": 0, "notifications": 0}
+        self._watermark = None
+        self._last_run = None
+        self._recent_tampered = deque(maxlen=100)
+
+    # ---- state ----
+
+    def _load_state(self, cursor):
+        cursor.execute("SELECT last_txid, last_seq FROM verifier_state WHERE name = %s;", (self.name,))
+        row = cursor.fetchone()
+        return (row[0], row[1]) if row else (0, 0)
+
+    def _save_state(self, cursor, last_txid, last_seq):
+        cursor.execute("""
+            INSERT INTO verifier_state (name, last_txid, last_seq, updated_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (name) DO UPDATE
+            SET last_txid = EXCLUDED.last_txid,
+                last_seq = EXCLUDED.last_seq,
+                updated_at = EXCLUDED.updated_at;
+        """, (self.name, last_txid, last_seq, datetime.now()))
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    # ---- verification ----
+
+    def run_once(self) -> int:
+        """Verify one batch of journal entries past the watermark; returns entries consumed"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            last_txid, last_seq = self._load_state(cursor)
+
+            # Only transactions older than every in-flight one: a slow writer can
+            # still commit a lower seq, but never a txid below the snapshot xmin
+            cursor.execute("""
+                SELECT seq, txid, employee_id, op FROM secure_db_change
+                WHERE txid < txid_snapshot_xmin(txid_current_snapshot())
+                  AND (txid, seq) > (%s, %s)
+                ORDER BY txid, seq
+                LIMIT %s;
+            """, (last_txid, last_seq, self.batch_size))
+            entries = cursor.fetchall()
+
+            if not entries:
+                cursor.execute("SELECT EXISTS (SELECT 1 FROM secure_db_change WHERE (txid, seq) > (%s, %s));",
+                               (last_txid, last_seq))
+                self._blocked = cursor.fetchone()[0]
+                conn.rollback()
+                cursor.close()
+                with self._lock:
+                    self._watermark = {"txid": last_txid, "seq": last_seq}
+                return 0
+
+            # A row touched many times in the batch is verified once, in its current state
+            employee_ids = list(dict.fromkeys(employee_id for _, _, employee_id, _ in entries))
+            cursor.execute("""
+                SELECT id, name, role, salary, record_hash, created_at, hash_version
+                FROM secure_db WHERE id = ANY(%s);
+            """, (employee_ids,))
+            rows = [row for row in cursor.fetchall() if row[4] and row[5]]
+            found_ids = {row[0] for row in rows}
+
+            computed = dict(hash_rows(rows))
+            chain_hashes = self.lookup(conn, [row[0] for row in rows]) if rows else {}
+
+            counts = {"verified": 0, "tampered": 0, "not_anchored": 0, "deleted": 0}
+            results = []
+            for row in rows:
+                result = build_result(row, computed[row[0]], chain_hashes.get(row[0], "0" * 64))
+                outcome = classify(result)
+                counts[outcome] += 1
+                if outcome == "tampered":
+                    with self._lock:
+                        self._recent_tampered.append({**result, "detected_at": datetime.now().isoformat()})
+                    if self.on_tampered:
+                        self.on_tampered(result)
+                if self.on_result:
+                    self.on_result(result)
+                results.append(result)
+            if self.on_batch and results:
+                self.on_batch(results)
+
+            deleted = [employee_id for _, _, employee_id, op in entries if op == 'D' and employee_id not in found_ids]
+            counts["deleted"] = len(set(deleted))
+
+            last_seq, last_txid = entries[-1][0], entries[-1][1]
+            self._save_state(cursor, last_txid, last_seq)
+            conn.commit()
+            cursor.close()
+
+            self._count(passes=1, changes=len(entries), **counts)
+            with self._lock:
+                self._watermark = {"txid": last_txid, "seq": last_seq}
+                self._last_run = datetime.now().isoformat()
+            if counts["tampered"]:
+                print(f"🚨 Change verifier: {counts['tampered']} tampered record(s) in {len(entries)} changes")
+            return len(entries)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def catch_up(self) -> int:
+        """Run passes until the journal is drained up to the watermark head"""
+        total = 0
+        while True:
+            consumed = self.run_once()
+            total += consumed
+            if consumed < self.batch_size:
+                return total
+
+    def prune(self):
+        """Delete journal entries every verifier has passed, once past the retention window"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM secure_db_change c
+                WHERE c.changed_at < NOW() - make_interval(days => %s)
+                  AND EXISTS (SELECT 1 FROM verifier_state)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM verifier_state v WHERE (c.txid, c.seq) > (v.last_txid, v.last_seq)
+                  );
+            """, (self.retention_days,))
+            pruned = cursor.rowcount
+            conn.commit()
+            cursor.close()
+            if pruned:
+                print(f"🧹 Pruned {pruned} verified change journal entries")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    # ---- notifications ----
+
+    def _listen(self):
+        conn = self.listen_connection()
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute(f"LISTEN {CHANGE_VERIFIER_CHANNEL};")
+        cursor.close()
+        return conn
+
+    def _close_listener(self):
+        if self._listen_conn is not None:
+            try:
+                self._listen_conn.close()
+            except Exception:
+                pass
+            self._listen_conn = None
+
+    def _wait(self):
+        """Block until a change notification arrives or the poll interval elapses"""
+        # Journal entries waiting on an older open transaction become visible soon
+        timeout = min(1.0, self.poll_interval) if self._blocked else self.poll_interval
+        if self._listen_conn is None:
+            deadline = time() + timeout
+            while self._running and time() < deadline:
+                select.select([], [], [], min(1.0, deadline - time()))
+            return
+        try:
+            if select.select([self._listen_conn], [], [], timeout)[0]:
+                self._listen_conn.poll()
+                self._count(notifications=len(self._listen_conn.notifies))
+                self._listen_conn.notifies.clear()
+        except Exception as e:
+            print(f"⚠️ Change listener lost ({e}); reconnecting")
+            self._close_listener()
+
+    def run_forever(self):
+        self._running = True
+        while self._running:
+            if self._listen_conn is None:
+                try:
+                    self._listen_conn = self._listen()
+                except Exception as e:
+                    print(f"⚠️ LISTEN unavailable ({e}); polling every {self.poll_interval}s")
+            try:
+                # Also the downtime catch-up: resumes from the stored watermark
+                self.catch_up()
+                if time() - self._last_prune > 3600:
+                    self._last_prune = time()
+                    self.prune()
+            except Exception as e:
+                print(f"❌ Change verifier error: {e}")
+            self._wait()
+        self._close_listener()
+
+    def start(self):
+        """Run the verifier in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.run_forever, name="change-verifier", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "watermark": self._watermark,
+                "last_run": self._last_run,
+                "listening": self._listen_conn is not None,
+                "recent_tampered": list(self._recent_tampered),
+            }
+
+
+if __name__ == "__main__":
+    from Others.db_connection import connect
+    from Others.alert_dispatcher import AlertDispatcher
+
+    parser = argparse.ArgumentParser(description="Re-verify secure_db rows as they change")
+    parser.add_argument("--once", action="store_true", help="catch up to the journal head and exit")
+    parser.add_argument("--source", choices=["rpc", "index"], default=os.getenv("CHAIN_HASH_SOURCE", "rpc").lower())
+    args = parser.parse_args()
+
+    dispatcher = AlertDispatcher()
+    dispatcher.start()
+    verifier = ChangeVerifier(
+        connect,
+        lookup=lambda conn, ids: chain_lookup(conn, ids, source=args.source),
+        on_tampered=lambda r: dispatcher.submit(r, "change-journal"),
+    )
+    if args.once:
+        print(f"✅ Verified {verifier.catch_up()} journaled changes")
+        dispatcher.stop()
+    else:
+        print(f"👀 Listening on '{CHANGE_VERIFIER_CHANNEL}' for secure_db changes...")
+        verifier.run_forever()
@@ -0,0 +1,24 @@
+import psycopg2
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def connect():
+    """Open a PostgreSQL connection from DB_* env vars (SSL when the host is Neon)
+
+    Used directly by the standalone workers/CLIs, and as the factory behind
+    the API's ConnectionPool (backend get_db() borrows from it).
+    """
+    db_host = os.getenv("DB_HOST", "localhost")
+    params = dict(
+        dbname=os.getenv("DB_NAME", "neondb" if "neon.tech" in db_host else "audit_logs"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD"),
+        host=db_host,
+        port=os.getenv("DB_PORT", 5432),
+    )
+    if "neon.tech" in db_host:
+        return psycopg2.connect(sslmode='require', connect_timeout=10, **params)
+    return psycopg2.connect(connect_timeout=5, **params)
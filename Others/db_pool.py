@@ -0,0 +1,351 @@
+"""Process-wide PostgreSQL connection pool for the API
+
+Every request used to open (and TLS-handshake) a fresh Neon connection.
+ConnectionPool keeps up to DB_POOL_MAX connections open and hands them out
+as PooledConnection proxies whose close() returns the connection instead of
+closing it, so existing `conn = get_db() ... conn.close()` code pools as is.
+
+    pool = ConnectionPool(connect)
+    with pool.connection() as conn:
+        ...
+
+Connections idle for longer than DB_POOL_HEALTH_CHECK_INTERVAL are pinged
+(SELECT 1) before being handed out; broken ones, ones older than
+DB_POOL_MAX_LIFETIME and surplus ones idle beyond DB_POOL_IDLE_TIMEOUT are
+closed. A connection whose session was changed (autocommit, e.g. for
+LISTEN, set_session or set_isolation_level) is closed on release rather
+than reused, since its session state is not ours to reset.
+"""
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from time import time, monotonic
+from dotenv import load_dotenv
+from psycopg2 import extensions
+
+load_dotenv()
+
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 1))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 10))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", 1800))
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 10))
+# Ping connections that sat idle longer than this before lending them (0 = always)
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30))
+
+# Acquire latencies kept for the percentiles in stats()
+LATENCY_WINDOW = 1000
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the acquire timeout"""
+
+
+class _Slot:
+    """A raw connection plus the bookkeeping the pool needs"""
+
+    __slots__ = ("conn", "created_at", "released_at")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = monotonic()
+        self.released_at = self.created_at
+
+
+class PooledConnection:
+    """psycopg2 connection proxy; close() gives it back to the pool"""
+
+    def __init__(self, pool, slot):
+        self._pool = pool
+        self._slot = slot
+        self._dirty = False
+
+    def __getattr__(self, name):
+        slot = self.__dict__.get("_slot")
+        if slot is None:
+            raise AttributeError(f"Connection already returned to the pool ({name})")
+        return getattr(slot.conn, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+            return
+        if name == "autocommit":
+            self._dirty = True
+        setattr(self._slot.conn, name, value)
+
+    # Session changes outlive the borrower: the connection is closed on release
+    def set_session(self, *args, **kwargs):
+        self._dirty = True
+        return self._slot.conn.set_session(*args, **kwargs)
+
+    def set_isolation_level(self, level):
+        self._dirty = True
+        return self._slot.conn.set_isolation_level(level)
+
+    def fileno(self):
+        # select.select() looks this up on the type, not through __getattr__
+        return self._slot.conn.fileno()
+
+    @property
+    def closed(self):
+        return 1 if self._slot is None else self._slot.conn.closed
+
+    def close(self):
+        if self._slot is None:
+            return
+        slot, self._slot = self._slot, None
+        self._pool._release(slot, discard=self._dirty)
+
+    # `with conn:` keeps psycopg2's meaning (commit or roll back, stay open)
+    def __enter__(self):
+        self._slot.conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._slot.conn.__exit__(exc_type, exc, tb)
+
+
+class ConnectionPool:
+    """Bounded, health-checked pool of psycopg2 connections
+
+    `connect` is a zero-argument callable returning a new connection
+    (Others.db_connection.connect). Thread-safe; callers block up to
+    `acquire_timeout` seconds when all `max_size` connections are lent out.
+    """
+
+    def __init__(self, connect, min_size=DB_POOL_MIN, max_size=DB_POOL_MAX, idle_timeout=DB_POOL_IDLE_TIMEOUT,
+                 max_lifetime=DB_POOL_MAX_LIFETIME, acquire_timeout=DB_POOL_ACQUIRE_TIMEOUT,
+                 health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL):
+        self.connect = connect
+        self.max_size = max(1, max_size)
+        self.min_size = max(0, min(min_size, self.max_size))
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        # Most recently released last: handing those out first lets the rest age out
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {"acquired": 0, "created": 0, "timeouts": 0, "connect_errors": 0,
+                        "health_check_failures": 0, "closed_expired": 0, "closed_idle": 0,
+                        "closed_broken": 0, "closed_dirty": 0}
+        self._reaper = None
+        self._stop = threading.Event()
+
+    # -- lending -------------------------------------------------------------
+
+    def acquire(self, timeout=None) -> PooledConnection:
+        """Borrow a connection; close() on the returned proxy gives it back"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = monotonic()
+        deadline = started + timeout
+        while True:
+            slot = None
+            with self._lock:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                self._waiting += 1
+                try:
+                    while not self._idle and self._size >= self.max_size:
+                        remaining = deadline - monotonic()
+                        if remaining <= 0:
+                            self._counts["timeouts"] += 1
+                            raise PoolTimeout(f"No database connection free within {timeout}s "
+                                              f"({self._in_use}/{self.max_size} in use)")
+                        self._available.wait(remaining)
+                finally:
+                    self._waiting -= 1
+                if self._idle:
+                    slot = self._idle.pop()
+                # Reserve the slot before leaving the lock; connecting/pinging happens outside it
+                elif self._size < self.max_size:
+                    self._size += 1
+                self._in_use += 1
+
+            if slot is None:
+                try:
+                    slot = _Slot(self.connect())
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._counts["connect_errors"] += 1
+                        self._available.notify()
+                    raise
+                with self._lock:
+                    self._counts["created"] += 1
+            elif not self._usable(slot):
+                self._discard(slot, in_use=True)
+                continue
+
+            with self._lock:
+                self._counts["acquired"] += 1
+                self._latencies.append(monotonic() - started)
+            return PooledConnection(self, slot)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """`with pool.connection() as conn:` - rolled back (if needed) and returned on exit"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _usable(self, slot) -> bool:
+        now = monotonic()
+        if slot.conn.closed:
+            self._count("closed_broken")
+            return False
+        if self.max_lifetime and now - slot.created_at > self.max_lifetime:
+            self._count("closed_expired")
+            return False
+        if now - slot.released_at >= self.health_check_interval:
+            try:
+                cursor = slot.conn.cursor()
+                cursor.execute("SELECT 1;")
+                cursor.close()
+                slot.conn.rollback()
+            except Exception:
+                self._count("health_check_failures")
+                return False
+        return True
+
+    def _release(self, slot, discard=False):
+        conn = slot.conn
+        reason = None
+        if conn.closed:
+            reason = "closed_broken"
+        elif discard:
+            reason = "closed_dirty"
+        else:
+            try:
+                # Never lend out a connection mid-transaction
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                reason = "closed_broken"
+
+        if reason or self._closed:
+            if reason:
+                self._count(reason)
+            self._discard(slot, in_use=True)
+            return
+        slot.released_at = monotonic()
+        with self._lock:
+            self._in_use -= 1
+            self._idle.append(slot)
+            self._available.notify()
+
+    def _discard(self, slot, in_use=False):
+        try:
+            slot.conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._size -= 1
+            if in_use:
+                self._in_use -= 1
+            self._available.notify()
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    # -- maintenance ---------------------------------------------------------
+
+    def _maintain(self):
+        """Close expired and surplus idle connections, then top up to min_size"""
+        now = monotonic()
+        expired = []
+        with self._lock:
+            keep = deque()
+            # Oldest-released first, so surplus connections are the ones trimmed
+            for slot in self._idle:
+                surplus = self._size - len(expired) > self.min_size
+                if self.max_lifetime and now - slot.created_at > self.max_lifetime:
+                    expired.append((slot, "closed_expired"))
+                elif surplus and now - slot.released_at > self.idle_timeout:
+                    expired.append((slot, "closed_idle"))
+                else:
+                    keep.append(slot)
+            self._idle = keep
+        for slot, reason in expired:
+            self._count(reason)
+            self._discard(slot)
+
+        while True:
+            with self._lock:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                slot = _Slot(self.connect())
+            except Exception as e:
+                with self._lock:
+                    self._size -= 1
+                    self._counts["connect_errors"] += 1
+                print(f"⚠️ Connection pool could not open a connection: {e}")
+                return
+            with self._lock:
+                self._counts["created"] += 1
+                self._idle.appendleft(slot)
+                self._available.notify()
+
+    def _run(self):
+        interval = max(1.0, min(self.idle_timeout, self.health_check_interval or 30) / 2)
+        while not self._stop.wait(interval):
+            try:
+                self._maintain()
+            except Exception as e:
+                print(f"❌ Connection pool maintenance error: {e}")
+
+    def open(self):
+        """Open min_size connections and start the maintenance thread"""
+        with self._lock:
+            self._closed = False
+        self._maintain()
+        if self._reaper and self._reaper.is_alive():
+            return
+        self._stop.clear()
+        self._reaper = threading.Thread(target=self._run, name="db-pool-maintenance", daemon=True)
+        self._reaper.start()
+
+    def close(self):
+        """Close idle connections now; lent-out ones are closed when returned"""
+        self._stop.set()
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._available.notify_all()
+        for slot in idle:
+            self._discard(slot)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                **self._counts,
+                "acquire_ms": {
+                    "avg": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+                    "p50": round(latencies[len(latencies) // 2] * 1000, 3) if latencies else None,
+                    "p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 3) if latencies else None,
+                    "max": round(latencies[-1] * 1000, 3) if latencies else None,
+                    "samples": len(latencies),
+                },
+                "checked_at": time(),
+            }
@@ -0,0 +1,144 @@
+"""Set-based verification inside PostgreSQL (Database/in_db_verification.sql)
+
+One scan of secure_db recomputes every record hash with pgcrypto, compares
+it to record_hash and to the locally mirrored chain anchors (HashAdded
+index, confirmed Merkle batches), and returns only the mismatching rows.
+Chain hashes that only live on the contract (CHAIN_HASH_SOURCE=rpc without
+the indexer) are not consulted; use the verification engine for those.
+
+    python -m Others.db_verification
+    python -m Others.db_verification --after-id 100000 --limit 500000 --json
+"""
+import argparse
+import json
+from time import time
+
+
+def _exists(cursor, relation) -> bool:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL;", (relation,))
+    return cursor.fetchone()[0]
+
+
+def anchor_sources(cursor) -> list:
+    """Chain-anchor mirrors installed in this database"""
+    sources = []
+    if _exists(cursor, "anchor_proof") and _exists(cursor, "anchor_batch"):
+        sources.append("merkle")
+    if _exists(cursor, "chain_anchor_latest"):
+        sources.append("index")
+    return sources
+
+
+def find_mismatches(cursor, after_id=0, limit=None, sources=None) -> list:
+    """Rows whose recomputed hash, stored hash and anchored hash disagree
+
+    Returns [{id, reason, stored_hash, computed_hash, blockchain_hash}] where
+    reason is "data_modified" (row no longer hashes to record_hash) or
+    "hash_replaced" (record_hash differs from the anchored hash). Rows with
+    no anchor are only checked against record_hash; rows whose hash_version
+    has no SQL implementation (BLAKE2b) are only checked against the anchor.
+    """
+    if sources is None:
+        sources = anchor_sources(cursor)
+
+    joins, chain_terms = [], []
+    if "merkle" in sources:
+        joins.append("""
+            LEFT JOIN (
+                SELECT p.employee_id, p.record_hash
+                FROM anchor_proof p JOIN anchor_batch b ON b.id = p.batch_id
+                WHERE b.status = 'confirmed'
+            ) m ON m.employee_id = s.id""")
+        chain_terms.append("m.record_hash")
+    if "index" in sources:
+        joins.append("LEFT JOIN chain_anchor_latest a ON a.employee_id = s.id")
+        chain_terms.append("a.record_hash")
+    chain_hash = f"COALESCE({', '.join(chain_terms)})" if chain_terms else "NULL::TEXT"
+
+    params = [after_id]
+    limit_clause = ""
+    if limit is not None:
+        # Bound the scanned range, not the number of mismatches returned
+        limit_clause = "AND s.id <= (SELECT MAX(id) FROM (SELECT id FROM secure_db WHERE id > %s ORDER BY id LIMIT %s) r)"
+        params += [after_id, limit]
+
+    cursor.execute(f"""
+        SELECT id, reason, record_hash, computed_hash, chain_hash FROM (
+            SELECT s.id, s.record_hash,
+                   secure_db_record_hash(s.name, s.role, s.salary, s.created_at, s.hash_version) AS computed_hash,
+                   {chain_hash} AS chain_hash
+            FROM secure_db s
+            {''.join(joins)}
+            WHERE s.id > %s {limit_clause}
+              AND s.record_hash IS NOT NULL AND s.created_at IS NOT NULL
+        ) v
+        CROSS JOIN LATERAL (
+            SELECT CASE
+                WHEN v.computed_hash IS NOT NULL AND v.computed_hash <> v.record_hash THEN 'data_modified'
+                WHEN v.chain_hash IS NOT NULL AND v.chain_hash <> v.record_hash THEN 'hash_replaced'
+            END AS reason
+        ) r
+        WHERE r.reason IS NOT NULL
+        ORDER BY id;
+    """, params)
+
+    return [
+        {"id": row[0], "reason": row[1], "stored_hash": row[2], "computed_hash": row[3],
+         "blockchain_hash": row[4] or "0" * 64}
+        for row in cursor.fetchall()
+    ]
+
+
+def compute_hashes(cursor, employee_ids) -> dict:
+    """In-database record hash per ID (for parity checks against the Python path)"""
+    cursor.execute("""
+        SELECT id, secure_db_record_hash(name, role, salary, created_at, hash_version)
+        FROM secure_db WHERE id = ANY(%s);
+    """, (list(employee_ids),))
+    return dict(cursor.fetchall())
+
+
+def run(conn, after_id=0, limit=None) -> dict:
+    """find_mismatches with timing, as returned by the API and CLI"""
+    cursor = conn.cursor()
+    try:
+        sources = anchor_sources(cursor)
+        started = time()
+        mismatches = find_mismatches(cursor, after_id, limit, sources)
+        elapsed = time() - started
+        conn.rollback()
+    finally:
+        cursor.close()
+    return {
+        "after_id": after_id,
+        "limit": limit,
+        "anchor_sources": sources,
+        "mismatch_count": len(mismatches),
+        "mismatches": mismatches,
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+if __name__ == "__main__":
+    from Others.db_connection import connect
+
+    parser = argparse.ArgumentParser(description="Find tampered secure_db rows with one in-database scan")
+    parser.add_argument("--after-id", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=None, help="max rows to scan")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        report = run(conn, args.after_id, args.limit)
+    finally:
+        conn.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"✅ Scan finished in {report['elapsed_seconds']}s "
+              f"(anchors: {', '.join(report['anchor_sources']) or 'none'}): "
+              f"{report['mismatch_count']} mismatching record(s)")
+        for mismatch in report["mismatches"]:
+            print(f"   🚨 ID {mismatch['id']}: {mismatch['reason']}")
@@ -0,0 +1,61 @@
+from web3 import Web3
+import json
+import os
+from dotenv import load_dotenv, set_key
+from solcx import compile_source, install_solc
+
+load_dotenv()
+
+print("🚀 Deploying V3 Contract (Merkle root anchoring) to Sepolia...\n")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Install Solidity compiler
+install_solc('0.8.0')
+
+# Contract source code
+with open(os.path.join(SCRIPT_DIR, 'smart_contract_v3.sol'), 'r') as f:
+    contract_source = f.read()
+
+# Compile
+compiled = compile_source(contract_source, output_values=['abi', 'bin'], solc_version='0.8.0')
+contract_id, contract_interface = compiled.popitem()
+bytecode = contract_interface['bin']
+abi = contract_interface['abi']
+
+# Connect to Sepolia
+w3 = Web3(Web3.HTTPProvider(os.getenv("INFURA_URL")))
+account = os.getenv("ACCOUNT_ADDRESS")
+private_key = os.getenv("PRIVATE_KEY")
+
+# Deploy
+Contract = w3.eth.contract(abi=abi, bytecode=bytecode)
+nonce = w3.eth.get_transaction_count(account)
+
+tx = Contract.constructor().build_transaction({
+    'chainId': 11155111,
+    'gas': 2000000,
+    'gasPrice': w3.eth.gas_price,
+    'nonce': nonce,
+})
+
+signed_tx = w3.eth.account.sign_transaction(tx, private_key=private_key)
+tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+
+print(f"⏳ Deploying... TX: {tx_hash.hex()}")
+receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+
+contract_address = receipt.contractAddress
+print(f"\n✅ Contract deployed!")
+print(f"📍 Address: {contract_address}")
+print(f"🔗 Etherscan: https://sepolia.etherscan.io/address/{contract_address}")
+
+# Update .env (V2 stays at CONTRACT_ADDRESS, V3 is used for Merkle batches)
+env_file = '.env'
+set_key(env_file, 'CONTRACT_V3_ADDRESS', contract_address)
+print(f"\n✅ Updated .env with CONTRACT_V3_ADDRESS")
+
+# Save ABI
+with open(os.path.join(SCRIPT_DIR, 'contract_abi_v3.json'), 'w') as f:
+    json.dump(abi, f, indent=2)
+print(f"✅ Saved ABI to contract_abi_v3.json")
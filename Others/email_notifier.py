@@ -4,6 +4,7 @@ from email.mime.multipart import MIMEMultipart
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+from html import escape
 
 load_dotenv()
 
@@ -12,9 +13,106 @@ EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 EMAIL_RECIPIENT = os.getenv("EMAIL_RECIPIENT")
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+# Set to false for local relays (e.g. aiosmtpd) that do not offer STARTTLS
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+
+def build_alert_message(employee_name, employee_id, stored_hash, computed_hash, blockchain_hash,
+                        sender=EMAIL_SENDER, recipient=EMAIL_RECIPIENT):
+    """Alert email for one tampered record"""
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = recipient
+    msg['Subject'] = f"🚨 DATA TAMPERING DETECTED - Employee {employee_name}"
+    
+    # Safe string conversion
+    stored_str = str(stored_hash) if stored_hash else "N/A"
+    computed_str = str(computed_hash) if computed_hash else "N/A"
+    blockchain_str = str(blockchain_hash) if blockchain_hash else "N/A"
+    
+    body = f"""
+    <html>
+    <body>
+        <h2 style="color: red;">⚠️ TAMPERING ALERT</h2>
+        <p>Data tampering has been detected in the audit database.</p>
+        
+        <h3>Employee Details:</h3>
+        <ul>
+            <li><b>Name:</b> {escape(str(employee_name))}</li>
+            <li><b>ID:</b> {employee_id}</li>
+            <li><b>Timestamp:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</li>
+        </ul>
+        
+        <h3>Hash Verification:</h3>
+        <ul>
+            <li><b>Stored Hash:</b> <code>{stored_str[:32]}...</code></li>
+            <li><b>Computed Hash:</b> <code style="color: red;">{computed_str[:32]}...</code></li>
+            <li><b>Blockchain Hash:</b> <code>{blockchain_str[:32]}...</code></li>
+        </ul>
+        
+        <p style="color: red; font-weight: bold;">
+            The data has been modified after initial storage. 
+            Immediate investigation required!
+        </p>
+        
+        <hr>
+        <p style="font-size: 12px; color: gray;">
+            This is an automated alert from the Blockchain Audit System.
+        </p>
+    </body>
+    </html>
+    """
+    
+    msg.attach(MIMEText(body, 'html'))
+    return msg
+
+def build_digest_message(alerts, sender=EMAIL_SENDER, recipient=EMAIL_RECIPIENT):
+    """One email summarizing several tampered records (alert dicts from Others/alert_dispatcher.py)"""
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = recipient
+    msg['Subject'] = f"🚨 DATA TAMPERING DETECTED - {len(alerts)} records"
+    
+    rows = "".join(
+        f"""
+            <tr>
+                <td>{alert['employee_id']}</td>
+                <td>{escape(str(alert['name']))}</td>
+                <td><code>{str(alert['stored_hash'] or 'N/A')[:16]}...</code></td>
+                <td><code style="color: red;">{str(alert['computed_hash'] or 'N/A')[:16]}...</code></td>
+                <td><code>{str(alert['blockchain_hash'] or 'N/A')[:16]}...</code></td>
+                <td>{alert['detected_at']}</td>
+            </tr>"""
+        for alert in alerts
+    )
+    body = f"""
+    <html>
+    <body>
+        <h2 style="color: red;">⚠️ TAMPERING ALERT - {len(alerts)} records</h2>
+        <p>Data tampering has been detected in the audit database.</p>
+        
+        <table border="1" cellpadding="4" cellspacing="0">
+            <tr><th>ID</th><th>Name</th><th>Stored Hash</th><th>Computed Hash</th><th>Blockchain Hash</th><th>Detected</th></tr>{rows}
+        </table>
+        
+        <p style="color: red; font-weight: bold;">Immediate investigation required!</p>
+        
+        <hr>
+        <p style="font-size: 12px; color: gray;">
+            This is an automated alert from the Blockchain Audit System.
+        </p>
+    </body>
+    </html>
+    """
+    
+    msg.attach(MIMEText(body, 'html'))
+    return msg
 
 def send_tampering_alert(employee_name, employee_id, stored_hash, computed_hash, blockchain_hash):
-    """Send email alert when tampering is detected"""
+    """Send email alert when tampering is detected
+    
+    Opens a fresh SMTP session per call; bulk verification goes through
+    Others/alert_dispatcher.py, which pools the connection and sends digests.
+    """
     
     # Skip if email not configured
     if not EMAIL_SENDER or not EMAIL_PASSWORD or not EMAIL_RECIPIENT:
@@ -22,50 +120,7 @@ def send_tampering_alert(employee_name, employee_id, stored_hash, computed_hash,
         return False
     
     try:
-        msg = MIMEMultipart()
-        msg['From'] = EMAIL_SENDER
-        msg['To'] = EMAIL_RECIPIENT
-        msg['Subject'] = f"🚨 DATA TAMPERING DETECTED - Employee {employee_name}"
-        
-        # Safe string conversion
-        stored_str = str(stored_hash) if stored_hash else "N/A"
-        computed_str = str(computed_hash) if computed_hash else "N/A"
-        blockchain_str = str(blockchain_hash) if blockchain_hash else "N/A"
-        
-        body = f"""
-        <html>
-        <body>
-            <h2 style="color: red;">⚠️ TAMPERING ALERT</h2>
-            <p>Data tampering has been detected in the audit database.</p>
-            
-            <h3>Employee Details:</h3>
-            <ul>
-                <li><b>Name:</b> {employee_name}</li>
-                <li><b>ID:</b> {employee_id}</li>
-                <li><b>Timestamp:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</li>
-            </ul>
-            
-            <h3>Hash Verification:</h3>
-            <ul>
-                <li><b>Stored Hash:</b> <code>{stored_str[:32]}...</code></li>
-                <li><b>Computed Hash:</b> <code style="color: red;">{computed_str[:32]}...</code></li>
-                <li><b>Blockchain Hash:</b> <code>{blockchain_str[:32]}...</code></li>
-            </ul>
-            
-            <p style="color: red; font-weight: bold;">
-                The data has been modified after initial storage. 
-                Immediate investigation required!
-            </p>
-            
-            <hr>
-            <p style="font-size: 12px; color: gray;">
-                This is an automated alert from the Blockchain Audit System.
-            </p>
-        </body>
-        </html>
-        """
-        
-        msg.attach(MIMEText(body, 'html'))
+        msg = build_alert_message(employee_name, employee_id, stored_hash, computed_hash, blockchain_hash)
         
         server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
         server.starttls()
@@ -0,0 +1,316 @@
+"""Epoch attestation over the secure_db hash chain (Database/record_chain.sql)
+
+Triggers append every insert, first hash assignment, delete and truncate on
+secure_db to record_chain, each link hashing the previous one. The
+EpochAnchorer periodically anchors the chain head as a root on the V3
+contract (anchorRoot), so a single rootAnchoredAt() lookup attests the
+whole table up to that epoch; `verify_epoch` replays the chain against the
+live table to prove it. Per-row chain lookups are only needed for records
+journaled after the last epoch.
+
+    python -m Others.epoch_anchor --anchor-once
+    python -m Others.epoch_anchor --verify [--epoch 12]
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from time import time
+from dotenv import load_dotenv
+
+from Others.record_hash import hash_record, HASH_VERSION_LEGACY
+
+load_dotenv()
+
+# Anchor a new epoch at most this often, and only when at least EPOCH_MIN_ENTRIES links were added
+EPOCH_INTERVAL = float(os.getenv("EPOCH_INTERVAL", 3600))
+EPOCH_MIN_ENTRIES = int(os.getenv("EPOCH_MIN_ENTRIES", 1))
+
+CHAIN_PREFIX = b'\x02'
+GENESIS = "0" * 64
+
+
+def chain_link(prev_hash: str, seq: int, op: str, employee_id: int, record_hash) -> str:
+    """Next chain hash; must match record_chain_append() in Database/record_chain.sql"""
+    record = (record_hash or "").encode('utf-8')
+    return hashlib.sha256(
+        CHAIN_PREFIX + bytes.fromhex(prev_hash)
+        + int(seq).to_bytes(8, 'big', signed=True)
+        + op.encode('utf-8')
+        + int(employee_id).to_bytes(8, 'big', signed=True)
+        + len(record).to_bytes(4, 'big', signed=True) + record
+    ).hexdigest()
+
+
+def chain_head(cursor):
+    """(seq, chain_hash) of the newest link"""
+    cursor.execute("SELECT seq, chain_hash FROM record_chain_head WHERE id = 1;")
+    return cursor.fetchone()
+
+
+def latest_epoch(cursor, status="confirmed"):
+    """Newest epoch with `status` as a dict, or None"""
+    cursor.execute("""
+        SELECT id, last_seq, chain_hash, entry_count, status, tx_hash, block_number, created_at, anchored_at
+        FROM chain_epoch WHERE status = %s ORDER BY last_seq DESC LIMIT 1;
+    """, (status,))
+    row = cursor.fetchone()
+    return _epoch_dict(row) if row else None
+
+
+def get_epoch(cursor, epoch_id):
+    cursor.execute("""
+        SELECT id, last_seq, chain_hash, entry_count, status, tx_hash, block_number, created_at, anchored_at
+        FROM chain_epoch WHERE id = %s;
+    """, (epoch_id,))
+    row = cursor.fetchone()
+    return _epoch_dict(row) if row else None
+
+
+def list_epochs(cursor, limit=20) -> list:
+    cursor.execute("""
+        SELECT id, last_seq, chain_hash, entry_count, status, tx_hash, block_number, created_at, anchored_at
+        FROM chain_epoch ORDER BY last_seq DESC LIMIT %s;
+    """, (limit,))
+    return [_epoch_dict(row) for row in cursor.fetchall()]
+
+
+def _epoch_dict(row) -> dict:
+    return {
+        "id": row[0], "last_seq": row[1], "chain_hash": row[2], "entry_count": row[3], "status": row[4],
+        "tx_hash": row[5], "block_number": row[6], "created_at": row[7], "anchored_at": row[8],
+        "etherscan_link": f"https://sepolia.etherscan.io/tx/{row[5]}" if row[5] else None,
+    }
+
+
+class EpochAnchorer:
+    """Anchors the record_chain head as an epoch root every `interval` seconds
+
+    `push(root, count)` sends the root and returns the receipt or None
+    (defaults to blockchain_client.push_root, i.e. AuditLogV3.anchorRoot).
+    """
+
+    def __init__(self, get_connection, interval=EPOCH_INTERVAL, min_entries=EPOCH_MIN_ENTRIES, push=None):
+        self.get_connection = get_connection
+        self.interval = interval
+        self.min_entries = min_entries
+        self.push = push
+        self._thread = None
+        self._stop = threading.Event()
+
+    def run_once(self):
+        """Anchor the current head if enough links were added; returns the epoch dict or None"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            head_seq, head_hash = chain_head(cursor)
+            cursor.execute("SELECT COALESCE(MAX(last_seq), 0) FROM chain_epoch WHERE status <> 'failed';")
+            previous_seq = cursor.fetchone()[0]
+            if head_seq - previous_seq < max(1, self.min_entries):
+                conn.rollback()
+                return None
+
+            cursor.execute("""
+                INSERT INTO chain_epoch (last_seq, chain_hash, entry_count)
+                VALUES (%s, %s, %s) RETURNING id;
+            """, (head_seq, head_hash, head_seq))
+            epoch_id = cursor.fetchone()[0]
+            conn.commit()
+
+            push = self.push
+            if push is None:
+                from Others.blockchain_client import push_root
+                push = push_root
+            # leafCount = links covered, so the on-chain event shows how much the root attests
+            receipt = push(head_hash, head_seq)
+
+            if receipt is None:
+                cursor.execute("UPDATE chain_epoch SET status = 'failed' WHERE id = %s;", (epoch_id,))
+                conn.commit()
+                print(f"❌ Epoch #{epoch_id} (seq {head_seq}) failed to anchor")
+                return None
+
+            cursor.execute("""
+                UPDATE chain_epoch SET status = 'confirmed', tx_hash = %s, block_number = %s, anchored_at = %s
+                WHERE id = %s;
+            """, (receipt['transactionHash'].hex(), receipt['blockNumber'], datetime.now(), epoch_id))
+            conn.commit()
+            print(f"✅ Epoch #{epoch_id} anchored: {head_seq - previous_seq} new links, head {head_hash[:16]}...")
+            epoch = get_epoch(cursor, epoch_id)
+            conn.rollback()
+            cursor.close()
+            return epoch
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Epoch anchor error: {e}")
+
+    def start(self):
+        """Anchor epochs in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="epoch-anchorer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def verify_epoch(conn, epoch=None, check_on_chain=True, max_listed=100) -> dict:
+    """Attest secure_db up to an epoch with one root comparison
+
+    Replays record_chain from genesis (streamed through a server-side
+    cursor) and checks that:
+      - every link recomputes (the journal was not edited),
+      - the replayed head equals the epoch root, and the root is anchored,
+      - the live row for each ID whose latest link falls inside the epoch
+        matches it: present with the journaled record_hash after I/H (and
+        that hash recomputes from the row's fields), absent after D or a
+        truncate.
+    IDs with links after the epoch are left to per-record verification.
+    Also reports rows no link accounts for (inserted with triggers off).
+    """
+    cursor = conn.cursor()
+    if epoch is None:
+        epoch = latest_epoch(cursor)
+        if epoch is None:
+            cursor.close()
+            return {"epoch": None, "attested": False, "detail": "No confirmed epoch yet"}
+    last_seq = epoch["last_seq"]
+
+    started = time()
+    anchored_at = None
+    if check_on_chain:
+        from Others.blockchain_client import fetch_root_timestamp
+        anchored_at = fetch_root_timestamp(epoch["chain_hash"])
+
+    # A truncate after the epoch legitimately removes everything before it
+    cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM record_chain WHERE op = 'T';")
+    last_truncate = cursor.fetchone()[0]
+    conn.rollback()
+
+    # `latest`: the ID's newest link overall (not just in the epoch), joined to the live row
+    stream = conn.cursor(name="epoch_replay")
+    stream.itersize = 10000
+    stream.execute("""
+        SELECT c.seq, c.op, c.employee_id, c.record_hash, c.chain_hash,
+               c.op <> 'T' AND c.seq = c.latest_seq AS latest,
+               s.id IS NOT NULL AS present, s.record_hash AS live_hash,
+               s.name, s.role, s.salary, s.created_at, s.hash_version
+        FROM (
+            SELECT *, MAX(seq) FILTER (WHERE op <> 'T') OVER (PARTITION BY employee_id) AS latest_seq
+            FROM record_chain
+        ) c
+        LEFT JOIN secure_db s ON s.id = c.employee_id AND c.op <> 'T'
+        WHERE c.seq <= %s
+        ORDER BY c.seq;
+    """, (last_seq,))
+
+    head, expected_seq, broken_at = GENESIS, 1, None
+    missing, changed, tampered, resurrected = [], [], [], []
+    for (seq, op, employee_id, record_hash, stored_link, latest, present, live_hash,
+         name, role, salary, created_at, hash_version) in stream:
+        if broken_at is None:
+            link = chain_link(head, seq, op, employee_id, record_hash)
+            if seq != expected_seq or link != stored_link:
+                broken_at = seq
+            head = stored_link if broken_at is None else head
+            expected_seq = seq + 1
+        if not latest:
+            continue
+        if op in ('I', 'H') and seq > last_truncate:
+            if not present:
+                missing.append(employee_id)
+            elif live_hash != record_hash:
+                changed.append(employee_id)
+            elif hash_record(name, role, salary, created_at,
+                             HASH_VERSION_LEGACY if hash_version is None else hash_version) != record_hash:
+                # Fields edited in place (record_hash left alone)
+                tampered.append(employee_id)
+        elif present:
+            # Deleted/truncated per the chain, yet back without an insert link
+            resurrected.append(employee_id)
+    stream.close()
+
+    cursor.execute("""
+        SELECT r.id FROM secure_db r
+        WHERE NOT EXISTS (SELECT 1 FROM record_chain c WHERE c.employee_id = r.id)
+        ORDER BY r.id LIMIT %s;
+    """, (max_listed,))
+    unjournaled = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT COUNT(*) FROM record_chain WHERE seq > %s;", (last_seq,))
+    links_after_epoch = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM record_chain WHERE seq > %s AND op = 'I';", (last_seq,))
+    records_after_epoch = cursor.fetchone()[0]
+    conn.rollback()
+    cursor.close()
+
+    chain_intact = broken_at is None and head == epoch["chain_hash"]
+    root_anchored = bool(anchored_at) if check_on_chain else None
+    attested = (chain_intact and root_anchored is not False
+                and not missing and not changed and not tampered and not resurrected and not unjournaled)
+    return {
+        "epoch": epoch,
+        "attested": attested,
+        "chain_intact": chain_intact,
+        "chain_broken_at_seq": broken_at,
+        "replayed_head": head,
+        "root_anchored": root_anchored,
+        "root_anchored_at": datetime.fromtimestamp(anchored_at).isoformat() if anchored_at else None,
+        "missing_rows": missing[:max_listed],
+        "missing_count": len(missing),
+        "hash_changed_rows": changed[:max_listed],
+        "hash_changed_count": len(changed),
+        "tampered_rows": tampered[:max_listed],
+        "tampered_count": len(tampered),
+        "reinserted_rows": resurrected[:max_listed],
+        "reinserted_count": len(resurrected),
+        "unjournaled_rows": unjournaled,
+        # Only these still need per-record chain lookups
+        "links_after_epoch": links_after_epoch,
+        "records_after_epoch": records_after_epoch,
+        "elapsed_seconds": round(time() - started, 3),
+    }
+
+
+if __name__ == "__main__":
+    from Others.db_connection import connect
+
+    parser = argparse.ArgumentParser(description="Anchor or verify secure_db hash-chain epochs")
+    parser.add_argument("--anchor-once", action="store_true", help="anchor the current chain head")
+    parser.add_argument("--verify", action="store_true", help="attest the table against an epoch")
+    parser.add_argument("--epoch", type=int, default=None, help="epoch ID to verify (default: latest confirmed)")
+    parser.add_argument("--offline", action="store_true", help="skip the on-chain root check")
+    args = parser.parse_args()
+
+    if args.verify:
+        conn = connect()
+        try:
+            epoch = None
+            if args.epoch is not None:
+                cursor = conn.cursor()
+                epoch = get_epoch(cursor, args.epoch)
+                cursor.close()
+                if epoch is None:
+                    raise SystemExit(f"❌ Epoch {args.epoch} not found")
+            print(json.dumps(verify_epoch(conn, epoch, check_on_chain=not args.offline), indent=2, default=str))
+        finally:
+            conn.close()
+    elif args.anchor_once:
+        EpochAnchorer(connect).run_once()
+    else:
+        print(f"⛓️ Anchoring an epoch every {EPOCH_INTERVAL}s...")
+        anchorer = EpochAnchorer(connect)
+        anchorer.start()
+        anchorer._thread.join()
@@ -0,0 +1,177 @@
+import os
+import threading
+from datetime import datetime
+from time import sleep
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Only index blocks this far behind the head; also how far to rewind on a reorg
+INDEXER_CONFIRMATIONS = int(os.getenv("INDEXER_CONFIRMATIONS", 6))
+# Max blocks per eth_getLogs request (providers cap the range)
+INDEXER_BLOCK_RANGE = int(os.getenv("INDEXER_BLOCK_RANGE", 2000))
+# First block to index (the contract deployment block)
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", 0))
+INDEXER_POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", 12))
+
+
+class EventIndexer:
+    """Mirrors HashAdded events into the chain_anchor table
+
+    Progress is persisted in indexer_state, so each run only pulls the
+    eth_getLogs ranges after the last processed block. `w3`/`contract` are
+    injectable so the indexer runs unchanged against eth-tester or anvil.
+    """
+
+    def __init__(self, w3, contract, get_connection, name="audit_log",
+                 confirmations=INDEXER_CONFIRMATIONS, block_range=INDEXER_BLOCK_RANGE,
+                 start_block=INDEXER_START_BLOCK, poll_interval=INDEXER_POLL_INTERVAL,
+                 on_anchor=None):
+        self.w3 = w3
+        self.contract = contract
+        self.get_connection = get_connection
+        self.name = name
+        self.confirmations = confirmations
+        self.block_range = block_range
+        self.start_block = start_block
+        self.poll_interval = poll_interval
+        self.on_anchor = on_anchor
+        self._thread = None
+        self._running = False
+
+    # ---- state ----
+
+    def _load_state(self, cursor):
+        cursor.execute("SELECT last_block, last_block_hash FROM indexer_state WHERE name = %s;", (self.name,))
+        row = cursor.fetchone()
+        if row is None:
+            return self.start_block - 1, None
+        return row[0], row[1]
+
+    def _save_state(self, cursor, last_block, last_block_hash):
+        cursor.execute("""
+            INSERT INTO indexer_state (name, last_block, last_block_hash, updated_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (name) DO UPDATE
+            SET last_block = EXCLUDED.last_block,
+                last_block_hash = EXCLUDED.last_block_hash,
+                updated_at = EXCLUDED.updated_at;
+        """, (self.name, last_block, last_block_hash, datetime.now()))
+
+    def _block_hash(self, block_number) -> str:
+        return self.w3.eth.get_block(block_number)['hash'].hex()
+
+    # ---- reorgs ----
+
+    def _check_reorg(self, cursor, last_block, last_block_hash) -> int:
+        """Rewind `confirmations` blocks if the last processed block was reorged out"""
+        if last_block_hash is None or last_block < self.start_block:
+            return last_block
+        if self._block_hash(last_block) == last_block_hash:
+            return last_block
+
+        rewind_to = max(self.start_block - 1, last_block - self.confirmations)
+        print(f"⚠️ Reorg detected at block {last_block}, rewinding to {rewind_to}")
+        cursor.execute("DELETE FROM chain_anchor WHERE block_number > %s;", (rewind_to,))
+        rewind_hash = self._block_hash(rewind_to) if rewind_to >= self.start_block else None
+        self._save_state(cursor, rewind_to, rewind_hash)
+        return rewind_to
+
+    # ---- indexing ----
+
+    def run_once(self) -> int:
+        """Index every confirmed block since the last run; returns events indexed"""
+        conn = self.get_connection()
+        indexed = 0
+        try:
+            cursor = conn.cursor()
+            last_block, last_block_hash = self._load_state(cursor)
+            last_block = self._check_reorg(cursor, last_block, last_block_hash)
+            conn.commit()
+
+            safe_head = self.w3.eth.block_number - self.confirmations
+            while last_block < safe_head:
+                from_block = last_block + 1
+                to_block = min(safe_head, from_block + self.block_range - 1)
+
+                logs = self.contract.events.HashAdded.get_logs(from_block=from_block, to_block=to_block)
+                for log in logs:
+                    cursor.execute("""
+                        INSERT INTO chain_anchor (employee_id, record_hash, block_number, block_hash, tx_hash, log_index, anchored_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT (block_number, log_index) DO NOTHING;
+                    """, (
+                        log['args']['employeeId'],
+                        log['args']['recordHash'].hex(),
+                        log['blockNumber'],
+                        log['blockHash'].hex(),
+                        log['transactionHash'].hex(),
+                        log['logIndex'],
+                        datetime.fromtimestamp(log['args']['timestamp']),
+                    ))
+
+                # Range and progress commit together, so a crash never skips or half-applies a range
+                self._save_state(cursor, to_block, self._block_hash(to_block))
+                conn.commit()
+
+                indexed += len(logs)
+                last_block = to_block
+                if self.on_anchor:
+                    for log in logs:
+                        self.on_anchor(log['args']['employeeId'], log['args']['recordHash'].hex())
+
+            cursor.close()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        if indexed:
+            print(f"⛓️ Indexed {indexed} HashAdded events up to block {last_block}")
+        return indexed
+
+    def run_forever(self):
+        self._running = True
+        while self._running:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Indexer error: {e}")
+            sleep(self.poll_interval)
+
+    def start(self):
+        """Run the indexer in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.run_forever, name="event-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+
+def fetch_indexed_hashes(cursor, employee_ids) -> dict:
+    """Latest indexed chain hash per employee ID (IDs with no event are omitted)"""
+    if not employee_ids:
+        return {}
+    cursor.execute(
+        "SELECT employee_id, record_hash FROM chain_anchor_latest WHERE employee_id = ANY(%s);",
+        (list(employee_ids),)
+    )
+    return dict(cursor.fetchall())
+
+
+if __name__ == "__main__":
+    from Others.blockchain_client import w3, contract
+    from Others.db_connection import connect
+    from Others.hash_cache import HashCache, HASH_CACHE_BACKEND
+
+    on_anchor = None
+    if HASH_CACHE_BACKEND == "sqlite":
+        # Shared cache file: invalidate the API workers' entries as events arrive
+        shared_cache = HashCache()
+        on_anchor = lambda employee_id, _: shared_cache.invalidate(employee_id)
+
+    print("⛓️ Starting HashAdded indexer...")
+    EventIndexer(w3, contract, connect, on_anchor=on_anchor).run_forever()
@@ -1,8 +1,8 @@
 import psycopg2
-import hashlib
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from Others.record_hash import hash_record, RECORD_HASH_VERSION
 
 load_dotenv()
 
@@ -29,18 +29,18 @@ try:
         emp_id, name, role, salary = row
         
         # Generate proper timestamp
-        timestamp = datetime.now().isoformat()
+        created_at = datetime.now()
+        timestamp = created_at.isoformat()
         
         # Generate proper hash
-        data_to_hash = f"{name}{role}{salary}{timestamp}".encode('utf-8')
-        record_hash = hashlib.sha256(data_to_hash).hexdigest()
+        record_hash = hash_record(name, role, salary, created_at, RECORD_HASH_VERSION)
         
         # Update the record
         cursor.execute("""
             UPDATE secure_db 
-            SET record_hash = %s, created_at = %s 
+            SET record_hash = %s, created_at = %s, hash_version = %s 
             WHERE id = %s
-        """, (record_hash, timestamp, emp_id))
+        """, (record_hash, created_at, RECORD_HASH_VERSION, emp_id))
         
         print(f"✅ Updated ID {emp_id}: {name}")
         print(f"   Hash: {record_hash[:32]}...")
@@ -0,0 +1,163 @@
+import os
+import threading
+from time import time, sleep
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Blocks sampled per eth_feeHistory call and how often the sampler refreshes
+GAS_FEE_HISTORY_BLOCKS = int(os.getenv("GAS_FEE_HISTORY_BLOCKS", 20))
+GAS_SAMPLE_INTERVAL = float(os.getenv("GAS_SAMPLE_INTERVAL", 12))
+# Cached fees older than this are refreshed before being used for a transaction
+GAS_CACHE_TTL = float(os.getenv("GAS_CACHE_TTL", 30))
+# low / medium / high - which priority-fee percentile transactions pay
+GAS_URGENCY = os.getenv("GAS_URGENCY", "medium").lower()
+# maxFeePerGas = base fee * headroom + priority fee (survives a few full blocks)
+GAS_BASE_FEE_HEADROOM = float(os.getenv("GAS_BASE_FEE_HEADROOM", 2))
+# Safety margin applied to cached gas estimates
+GAS_ESTIMATE_MARGIN = float(os.getenv("GAS_ESTIMATE_MARGIN", 1.2))
+
+URGENCY_PERCENTILES = {"low": 10, "medium": 50, "high": 90}
+
+
+class GasOracle:
+    """Cached fee and gas-limit source for transactions and /gas-stats
+
+    A background sampler pulls eth_feeHistory and keeps base fee and
+    priority-fee percentiles; gas limits are estimated once per contract
+    method and reused. Falls back to legacy gasPrice on pre-1559 chains.
+    """
+
+    def __init__(self, w3, account_address, block_count=GAS_FEE_HISTORY_BLOCKS,
+                 sample_interval=GAS_SAMPLE_INTERVAL, ttl=GAS_CACHE_TTL, urgency=GAS_URGENCY,
+                 base_fee_headroom=GAS_BASE_FEE_HEADROOM, estimate_margin=GAS_ESTIMATE_MARGIN,
+                 probes=None):
+        self.w3 = w3
+        self.account_address = account_address
+        self.block_count = block_count
+        self.sample_interval = sample_interval
+        self.ttl = ttl
+        self.urgency = urgency if urgency in URGENCY_PERCENTILES else "medium"
+        self.base_fee_headroom = base_fee_headroom
+        self.estimate_margin = estimate_margin
+        # fn_name -> zero-arg callable building a worst-case call to estimate instead
+        # (e.g. addHash on a never-used ID, so the estimate covers a fresh storage slot)
+        self.probes = probes or {}
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._gas_limits = {}
+        self._thread = None
+        self._running = False
+        self.rpc_calls = 0
+
+    # ---- fee sampling ----
+
+    def sample(self) -> dict:
+        """Refresh the fee snapshot from eth_feeHistory (legacy gasPrice fallback)"""
+        percentiles = sorted(URGENCY_PERCENTILES.values())
+        try:
+            self.rpc_calls += 1
+            history = self.w3.eth.fee_history(self.block_count, 'latest', percentiles)
+            # Last entry is the base fee of the next (pending) block
+            base_fee = history['baseFeePerGas'][-1]
+            rewards = [row for row in history.get('reward', []) if row]
+            priority = {}
+            for column, percentile in enumerate(percentiles):
+                values = sorted(row[column] for row in rewards)
+                priority[percentile] = values[len(values) // 2] if values else 0
+            ratios = history.get('gasUsedRatio', [])
+            snapshot = {
+                "eip1559": True,
+                "base_fee": base_fee,
+                "priority_fees": priority,
+                "gas_used_ratio": sum(ratios) / len(ratios) if ratios else None,
+                "oldest_block": history['oldestBlock'],
+                "sampled_at": time(),
+            }
+        except Exception as e:
+            # Chains without EIP-1559 (or providers without feeHistory)
+            self.rpc_calls += 1
+            snapshot = {
+                "eip1559": False,
+                "gas_price": self.w3.eth.gas_price,
+                "sampled_at": time(),
+                "fee_history_error": str(e),
+            }
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self, refresh=True) -> dict:
+        """Cached fees; refreshed first if older than the TTL (unless refresh=False)"""
+        with self._lock:
+            snapshot = self._snapshot
+        if refresh and (snapshot is None or time() - snapshot["sampled_at"] > self.ttl):
+            snapshot = self.sample()
+        return snapshot
+
+    def fee_params(self, urgency=None) -> dict:
+        """Transaction fee fields: type-2 maxFee/maxPriority, or legacy gasPrice"""
+        snapshot = self.snapshot()
+        if not snapshot["eip1559"]:
+            return {'gasPrice': snapshot["gas_price"]}
+        percentile = URGENCY_PERCENTILES.get(urgency or self.urgency, 50)
+        priority_fee = max(snapshot["priority_fees"].get(percentile, 0), 1)
+        return {
+            'maxPriorityFeePerGas': priority_fee,
+            'maxFeePerGas': int(snapshot["base_fee"] * self.base_fee_headroom) + priority_fee,
+        }
+
+    def effective_gas_price(self, urgency=None):
+        """Expected price actually paid per gas (base fee + tip), from cache only"""
+        snapshot = self.snapshot(refresh=False)
+        if snapshot is None:
+            return None
+        if not snapshot["eip1559"]:
+            return snapshot["gas_price"]
+        percentile = URGENCY_PERCENTILES.get(urgency or self.urgency, 50)
+        return snapshot["base_fee"] + snapshot["priority_fees"].get(percentile, 0)
+
+    # ---- gas limits ----
+
+    def gas_limit(self, contract_function) -> int:
+        """Estimated gas for a contract method, estimated once and cached"""
+        key = (contract_function.address, contract_function.fn_name)
+        with self._lock:
+            if key in self._gas_limits:
+                return self._gas_limits[key]
+        probe = self.probes.get(contract_function.fn_name)
+        target = probe() if probe else contract_function
+        self.rpc_calls += 1
+        estimate = int(target.estimate_gas({'from': self.account_address}) * self.estimate_margin)
+        with self._lock:
+            self._gas_limits[key] = estimate
+        return estimate
+
+    def cached_gas_limit(self, fn_name):
+        """Cached gas limit for a method name, without estimating (None if unknown)"""
+        with self._lock:
+            for (_, name), limit in self._gas_limits.items():
+                if name == fn_name:
+                    return limit
+        return None
+
+    # ---- background sampler ----
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="gas-oracle", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        while self._running:
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"⚠️ Gas oracle sample failed: {e}")
+            sleep(self.sample_interval)
@@ -1,7 +1,7 @@
 import psycopg2
-import hashlib
 from datetime import datetime
 from Others.blockchain_client import push_hash, fetch_hash
+from Others.record_hash import hash_record, hash_rows, RECORD_HASH_VERSION
 
 # ✅ Connect to PostgreSQL
 conn = psycopg2.connect(
@@ -22,26 +22,26 @@ CREATE TABLE IF NOT EXISTS secure_db (
     role TEXT,
     salary TEXT,
     record_hash TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    hash_version SMALLINT NOT NULL DEFAULT 1
 );
 """)
 conn.commit()
 
 def add_employee(name, role, salary):
     """Add new employee and push its hash to blockchain"""
-    timestamp = datetime.now().isoformat()  # Current timestamp
+    timestamp = datetime.now()  # Current timestamp
 
     # Compute hash including timestamp (without employee_id, as it's auto-generated)
-    data_to_hash = f"{name}{role}{salary}{timestamp}".encode('utf-8')
-    record_hash = hashlib.sha256(data_to_hash).hexdigest()
+    record_hash = hash_record(name, role, salary, timestamp, RECORD_HASH_VERSION)
 
     # Insert into DB and return the generated ID
     cursor.execute("""
-        INSERT INTO secure_db (name, role, salary, record_hash, created_at)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO secure_db (name, role, salary, record_hash, created_at, hash_version)
+        VALUES (%s, %s, %s, %s, %s, %s)
         RETURNING id;
         """,
-        (name, role, salary, record_hash, timestamp)
+        (name, role, salary, record_hash, timestamp, RECORD_HASH_VERSION)
     )
     employee_id = cursor.fetchone()[0]
     conn.commit()
@@ -53,16 +53,17 @@ def add_employee(name, role, salary):
 
 def verify_integrity(employee_id):
     """Verify integrity of employee by ID"""
-    cursor.execute("SELECT id, name, role, salary, record_hash, created_at FROM secure_db WHERE id = %s;", (employee_id,))
+    cursor.execute("SELECT id, name, role, salary, record_hash, created_at, hash_version FROM secure_db WHERE id = %s;",
+                   (employee_id,))
     row = cursor.fetchone()
 
     if not row:
         print("❌ Employee not found in database.")
         return
 
-    emp_id, name, role, salary, stored_hash, created_at = row
-    combined_data = f"{name}{role}{salary}{created_at.isoformat()}".encode('utf-8')
-    computed_hash = hashlib.sha256(combined_data).hexdigest()
+    emp_id, name, role, salary, stored_hash, created_at, _ = row
+    # Recompute under the row's own hash_version
+    computed_hash = hash_rows([row])[0][1]
 
     blockchain_hash = fetch_hash(name)
 
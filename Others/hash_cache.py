@@ -0,0 +1,225 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from time import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# memory = per-process LRU; sqlite = one cache file shared by every worker on the host
+HASH_CACHE_BACKEND = os.getenv("HASH_CACHE_BACKEND", "memory").lower()
+HASH_CACHE_PATH = os.getenv("HASH_CACHE_PATH", os.path.join(os.getenv("TMPDIR", "/tmp"), "audit_hash_cache.sqlite"))
+HASH_CACHE_MAX_SIZE = int(os.getenv("HASH_CACHE_MAX_SIZE", 10000))
+HASH_CACHE_TTL = float(os.getenv("HASH_CACHE_TTL", 300))
+# "Not anchored yet" flips as soon as the anchor lands, so it is only cached briefly
+HASH_CACHE_NEGATIVE_TTL = float(os.getenv("HASH_CACHE_NEGATIVE_TTL", 15))
+# When HashAdded events invalidate entries, positive hashes can live much longer
+HASH_CACHE_EVENT_DRIVEN = os.getenv("HASH_CACHE_EVENT_DRIVEN", "false").lower() == "true"
+HASH_CACHE_EVENT_TTL = float(os.getenv("HASH_CACHE_EVENT_TTL", 86400))
+
+NOT_ANCHORED = "0" * 64
+
+
+class MemoryBackend:
+    """Size-bounded LRU in process memory"""
+
+    name = "memory"
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys, now):
+        found, expired = {}, 0
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[1] <= now:
+                    del self._entries[key]
+                    expired += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[0]
+        return found, expired
+
+    def set_many(self, items):
+        """items: {key: (value, expires_at)}; returns how many entries were evicted"""
+        evicted = 0
+        with self._lock:
+            for key, entry in items.items():
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def delete(self, key):
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteBackend:
+    """LRU in a local SQLite file (WAL), so N uvicorn workers share one warm cache"""
+
+    name = "sqlite"
+
+    def __init__(self, max_size, path):
+        self.max_size = max_size
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS hash_cache (
+                employee_id INTEGER PRIMARY KEY,
+                hash TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_hash_cache_access ON hash_cache(last_access);")
+
+    def get_many(self, keys, now):
+        keys = list(keys)
+        found, expired = {}, 0
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT employee_id, hash, expires_at FROM hash_cache WHERE employee_id IN ({placeholders});",
+                    chunk
+                ).fetchall()
+                live = []
+                for employee_id, value, expires_at in rows:
+                    if expires_at <= now:
+                        expired += 1
+                    else:
+                        found[employee_id] = value
+                        live.append(employee_id)
+                if live:
+                    self._conn.executemany(
+                        "UPDATE hash_cache SET last_access = ? WHERE employee_id = ?;",
+                        [(now, employee_id) for employee_id in live]
+                    )
+            if expired:
+                self._conn.execute("DELETE FROM hash_cache WHERE expires_at <= ?;", (now,))
+        return found, expired
+
+    def set_many(self, items):
+        now = time()
+        with self._lock:
+            self._conn.execute("BEGIN;")
+            self._conn.executemany("""
+                INSERT INTO hash_cache (employee_id, hash, expires_at, last_access)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(employee_id) DO UPDATE
+                SET hash = excluded.hash, expires_at = excluded.expires_at, last_access = excluded.last_access;
+            """, [(key, value, expires_at, now) for key, (value, expires_at) in items.items()])
+            overflow = self._conn.execute("SELECT COUNT(*) FROM hash_cache;").fetchone()[0] - self.max_size
+            if overflow > 0:
+                self._conn.execute("""
+                    DELETE FROM hash_cache WHERE employee_id IN (
+                        SELECT employee_id FROM hash_cache ORDER BY last_access LIMIT ?
+                    );
+                """, (overflow,))
+            self._conn.execute("COMMIT;")
+        return max(overflow, 0)
+
+    def delete(self, key):
+        with self._lock:
+            return self._conn.execute("DELETE FROM hash_cache WHERE employee_id = ?;", (key,)).rowcount > 0
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM hash_cache;")
+
+    def size(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM hash_cache;").fetchone()[0]
+
+
+class HashCache:
+    """Cache for on-chain hash reads, keyed by employee ID
+
+    Anchored hashes and "not anchored" results get separate TTLs; RPC
+    errors are never cached. Entries are dropped by `invalidate()` when a
+    HashAdded event for the ID is observed.
+    """
+
+    def __init__(self, backend=None, ttl=None, negative_ttl=HASH_CACHE_NEGATIVE_TTL):
+        if backend is None:
+            if HASH_CACHE_BACKEND == "sqlite":
+                backend = SQLiteBackend(HASH_CACHE_MAX_SIZE, HASH_CACHE_PATH)
+            else:
+                backend = MemoryBackend(HASH_CACHE_MAX_SIZE)
+        if ttl is None:
+            ttl = HASH_CACHE_EVENT_TTL if HASH_CACHE_EVENT_DRIVEN else HASH_CACHE_TTL
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0,
+                       "evictions": 0, "invalidations": 0, "stores": 0}
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    def get_many(self, employee_ids):
+        """Returns ({employee_id: hash} for cache hits, [missing employee IDs])"""
+        found, expired = self.backend.get_many(employee_ids, time())
+        missing = [employee_id for employee_id in employee_ids if employee_id not in found]
+        negative = sum(1 for value in found.values() if value == NOT_ANCHORED)
+        self._count(hits=len(found) - negative, negative_hits=negative, misses=len(missing), expired=expired)
+        return found, missing
+
+    def put_many(self, hashes):
+        """Store fetched hashes ({employee_id: hash}); only pass successful lookups"""
+        if not hashes:
+            return
+        now = time()
+        items = {
+            employee_id: (value, now + (self.negative_ttl if value == NOT_ANCHORED else self.ttl))
+            for employee_id, value in hashes.items()
+        }
+        evicted = self.backend.set_many(items)
+        self._count(stores=len(items), evictions=evicted)
+
+    def invalidate(self, employee_id):
+        """Drop one ID (e.g. a HashAdded event was seen for it)"""
+        if self.backend.delete(employee_id):
+            self._count(invalidations=1)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats.update({
+            "backend": self.backend.name,
+            "size": self.backend.size(),
+            "max_size": self.backend.max_size,
+            "ttl_seconds": self.ttl,
+            "negative_ttl_seconds": self.negative_ttl,
+            "event_driven": HASH_CACHE_EVENT_DRIVEN,
+            "hit_rate": round((stats["hits"] + stats["negative_hits"]) / lookups, 4) if lookups else None,
+        })
+        return stats
@@ -0,0 +1,126 @@
+"""Concurrent HTTP load test for the API, optionally against a second server for comparison
+
+Fires a read-mostly request mix from N concurrent clients for a fixed
+duration at each concurrency level and reports throughput, latency
+percentiles and errors. To compare the async database layer with the
+previous (psycopg2 + threadpool) implementation, run the older commit on
+another port and pass it as --baseline:
+
+    git worktree add ../audit-sync <commit before the async layer>
+    (cd ../audit-sync/backend && uvicorn main:app --port 8001)
+    (cd backend && uvicorn main:app --port 8000)
+    python -m Others.load_test --url http://127.0.0.1:8000 --baseline http://127.0.0.1:8001
+
+Both servers should point at the same database; the mix only reads.
+"""
+import argparse
+import asyncio
+import random
+import sys
+from time import perf_counter
+
+import aiohttp
+
+DEFAULT_CONCURRENCY = "10,50,200"
+DEFAULT_DURATION = 15.0
+
+
+def request_mix(max_id):
+    """(method, path, json) tuples weighted like dashboard traffic"""
+    employee_id = random.randint(1, max_id)
+    choice = random.random()
+    if choice < 0.35:
+        return "GET", "/dashboard-quick", None
+    if choice < 0.60:
+        return "GET", f"/employees/check-duplicate/Employee {employee_id}", None
+    if choice < 0.85:
+        return "POST", "/employees/search", {"name": str(employee_id)[:2], "min_salary": 40000}
+    return "GET", "/dashboard-stats", None
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def run_level(base_url, concurrency, duration, max_id) -> dict:
+    latencies, errors = [], 0
+    deadline = perf_counter() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=60)
+
+    async with aiohttp.ClientSession(base_url, connector=connector, timeout=timeout) as session:
+        async def client():
+            nonlocal errors
+            while perf_counter() < deadline:
+                method, path, body = request_mix(max_id)
+                started = perf_counter()
+                try:
+                    async with session.request(method, path, json=body) as response:
+                        await response.read()
+                        if response.status >= 400:
+                            errors += 1
+                            continue
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    errors += 1
+                    continue
+                latencies.append(perf_counter() - started)
+
+        started = perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": (percentile(latencies, 0.50) or 0) * 1000,
+        "p95_ms": (percentile(latencies, 0.95) or 0) * 1000,
+        "p99_ms": (percentile(latencies, 0.99) or 0) * 1000,
+    }
+
+
+def print_row(label, report):
+    print(f"{label:<10} {report['concurrency']:>5} {report['requests']:>9} {report['errors']:>7} "
+          f"{report['rps']:>9.1f} {report['p50_ms']:>9.1f} {report['p95_ms']:>9.1f} {report['p99_ms']:>9.1f}")
+
+
+async def main(args):
+    levels = [int(level) for level in args.concurrency.split(",")]
+    targets = [("async", args.url)] + ([("baseline", args.baseline)] if args.baseline else [])
+
+    print(f"🚀 {args.duration:.0f}s per level, concurrency {levels}")
+    print(f"\n{'server':<10} {'conc':>5} {'requests':>9} {'errors':>7} {'req/s':>9} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    results = {}
+    for concurrency in levels:
+        for label, url in targets:
+            report = await run_level(url, concurrency, args.duration, args.max_id)
+            results[(label, concurrency)] = report
+            print_row(label, report)
+
+    if args.baseline:
+        print("\n📊 async vs baseline")
+        for concurrency in levels:
+            new, old = results[("async", concurrency)], results[("baseline", concurrency)]
+            speedup = new["rps"] / old["rps"] if old["rps"] else float("inf")
+            print(f"   concurrency {concurrency:>4}: {speedup:.2f}x throughput, "
+                  f"p95 {old['p95_ms']:.1f} -> {new['p95_ms']:.1f} ms")
+    if any(report["errors"] for report in results.values()):
+        print("\n⚠️ Some requests failed; check pool sizes (GET /db/pool) and server logs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the audit API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="server under test")
+    parser.add_argument("--baseline", help="server to compare against (e.g. the sync implementation)")
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY, help="comma separated client counts")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds per level")
+    parser.add_argument("--max-id", type=int, default=1000, help="highest employee ID used in requests")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,91 @@
+import hashlib
+
+# Domain separation prefixes so a leaf can never be passed off as an inner node
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+def _hash_bytes(record_hash: str) -> bytes:
+    """Convert a hex record hash (with or without 0x) to 32 raw bytes"""
+    if record_hash.startswith('0x'):
+        record_hash = record_hash[2:]
+    return bytes.fromhex(record_hash)
+
+
+def merkle_leaf(employee_id: int, record_hash: str) -> bytes:
+    """Leaf = sha256(0x00 || employee_id as uint256 || record_hash)
+
+    Binding the employee ID into the leaf means a proof can't be replayed
+    for a different employee that happens to share a record hash.
+    """
+    return hashlib.sha256(
+        LEAF_PREFIX + int(employee_id).to_bytes(32, 'big') + _hash_bytes(record_hash)
+    ).digest()
+
+
+def _parent(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def build_merkle_tree(leaves):
+    """Build all tree levels bottom-up; levels[0] are the leaves, levels[-1] is [root]
+
+    An odd node at the end of a level is promoted unchanged to the next level.
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree with no leaves")
+
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        next_level = []
+        for i in range(0, len(level) - 1, 2):
+            next_level.append(_parent(level[i], level[i + 1]))
+        if len(level) % 2 == 1:
+            next_level.append(level[-1])
+        levels.append(next_level)
+    return levels
+
+
+def merkle_root(levels) -> str:
+    """Hex root of a tree returned by build_merkle_tree"""
+    return levels[-1][0].hex()
+
+
+def merkle_proof(levels, index: int):
+    """Inclusion proof for leaf `index` as a list of [side, sibling_hex] pairs
+
+    `side` is "L" when the sibling sits to the left of the running hash.
+    Levels where the node was promoted without a sibling contribute nothing.
+    """
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            side = "L" if sibling < index else "R"
+            proof.append([side, level[sibling].hex()])
+        index //= 2
+    return proof
+
+
+def compute_root_from_proof(leaf: bytes, proof) -> str:
+    """Fold a proof over a leaf and return the resulting hex root"""
+    node = leaf
+    for side, sibling_hex in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        if side == "L":
+            node = _parent(sibling, node)
+        else:
+            node = _parent(node, sibling)
+    return node.hex()
+
+
+def verify_merkle_proof(employee_id: int, record_hash: str, proof, root: str) -> bool:
+    """Check that (employee_id, record_hash) is included under `root`"""
+    try:
+        leaf = merkle_leaf(employee_id, record_hash)
+        if root.startswith('0x'):
+            root = root[2:]
+        return compute_root_from_proof(leaf, proof) == root.lower()
+    except (ValueError, TypeError):
+        return False
@@ -0,0 +1,310 @@
+import json
+import os
+import threading
+from datetime import datetime
+from time import time
+from dotenv import load_dotenv
+
+from Others.merkle import merkle_leaf, build_merkle_tree, merkle_root, merkle_proof, verify_merkle_proof
+from Others.blockchain_client import push_root, fetch_root_timestamp
+
+load_dotenv()
+
+# Batch is flushed when it reaches ANCHOR_BATCH_SIZE records or its oldest record
+# has waited ANCHOR_BATCH_WINDOW seconds, whichever comes first
+ANCHOR_BATCH_SIZE = int(os.getenv("ANCHOR_BATCH_SIZE", 64))
+ANCHOR_BATCH_WINDOW = float(os.getenv("ANCHOR_BATCH_WINDOW", 30))
+
+# Failed batches (and 'pending' ones older than ANCHOR_RETRY_PENDING_AFTER
+# seconds, left by a crash) are re-pushed on start and then at most every
+# ANCHOR_RETRY_INTERVAL seconds, on a flush
+ANCHOR_RETRY_INTERVAL = float(os.getenv("ANCHOR_RETRY_INTERVAL", 60))
+ANCHOR_RETRY_PENDING_AFTER = float(os.getenv("ANCHOR_RETRY_PENDING_AFTER", 300))
+
+# Check each batch root against the V3 contract once before trusting its proofs
+MERKLE_VERIFY_ROOT_ON_CHAIN = os.getenv("MERKLE_VERIFY_ROOT_ON_CHAIN", "true").lower() == "true"
+
+# Roots already confirmed on-chain (one lookup per batch, not per record)
+_confirmed_roots = set()
+
+
+class MerkleBatcher:
+    """Accumulates record hashes and anchors one Merkle root per batch
+
+    `get_connection` is a zero-argument callable returning a psycopg2
+    connection; proofs are written before the root is sent so a crash
+    mid-anchor leaves a 'pending' batch, and a failed send a 'failed' one,
+    both of which `retry_unconfirmed` re-pushes.
+    """
+
+    def __init__(self, get_connection, batch_size=ANCHOR_BATCH_SIZE, window=ANCHOR_BATCH_WINDOW, on_anchored=None):
+        self.get_connection = get_connection
+        self.batch_size = batch_size
+        self.window = window
+        self.on_anchored = on_anchored
+        self._pending = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        # Never retried yet: the first flush (or the worker start) re-pushes leftovers
+        self._last_retry = 0.0
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Start the background thread that flushes batches on size/window"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="merkle-batcher", daemon=True)
+        self._thread.start()
+        print(f"✅ Merkle batcher started (size={self.batch_size}, window={self.window}s)")
+
+    def stop(self):
+        """Stop the background thread and anchor whatever is still pending"""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+        if self._thread:
+            self._thread.join(timeout=self.window + 5)
+        self.flush()
+
+    def add(self, employee_id: int, record_hash: str):
+        """Queue a record hash for the next batch"""
+        with self._lock:
+            if not self._pending:
+                self._oldest = time()
+            self._pending.append((employee_id, record_hash))
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.notify_all()
+
+    def add_many(self, records):
+        """Queue [(employee_id, record_hash), ...] at once; a bulk insert lands in one batch"""
+        records = list(records)
+        if not records:
+            return
+        with self._lock:
+            if not self._pending:
+                self._oldest = time()
+            self._pending.extend(records)
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.notify_all()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        with self._flush_lock:
+            self._retry_safely()
+        while True:
+            with self._lock:
+                while self._running and not self._due():
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self.window - (time() - self._oldest))
+                    self._wakeup.wait(timeout=timeout)
+                if not self._running:
+                    return
+            self.flush()
+
+    def _due(self) -> bool:
+        if not self._pending:
+            return False
+        return len(self._pending) >= self.batch_size or time() - self._oldest >= self.window
+
+    def flush(self):
+        """Anchor everything currently pending as one batch; returns the batch id"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._oldest = None
+            if not batch:
+                return None
+
+            # Latest hash wins if the same employee was queued twice in one window
+            latest = {}
+            for employee_id, record_hash in batch:
+                latest[employee_id] = record_hash
+            records = sorted(latest.items())
+
+            try:
+                batch_id = self._anchor_batch(records)
+            except Exception as e:
+                # Nothing persisted: requeue so the records go out with the next batch
+                print(f"❌ Merkle batch of {len(records)} records failed, requeued: {e}")
+                self._requeue(records)
+                batch_id = None
+
+            if time() - self._last_retry >= ANCHOR_RETRY_INTERVAL:
+                self._retry_safely()
+            return batch_id
+
+    def _retry_safely(self):
+        try:
+            self._retry_unconfirmed()
+        except Exception as e:
+            print(f"❌ Merkle batch retry failed: {e}")
+
+    def _requeue(self, records):
+        with self._lock:
+            if not self._pending:
+                self._oldest = time()
+            self._pending = list(records) + self._pending
+
+    def retry_unconfirmed(self) -> int:
+        """Re-push the roots of failed batches (and of pending ones left by a crash); returns how many confirmed"""
+        with self._flush_lock:
+            return self._retry_unconfirmed()
+
+    def _retry_unconfirmed(self) -> int:
+        self._last_retry = time()
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            # Pending batches younger than ANCHOR_RETRY_PENDING_AFTER may still be
+            # in flight elsewhere; batches whose proofs all moved to newer batches
+            # no longer anchor anything
+            cursor.execute("""
+                SELECT b.id, b.merkle_root, b.leaf_count
+                FROM anchor_batch b
+                WHERE (b.status = 'failed'
+                       OR (b.status = 'pending' AND b.created_at < NOW() - make_interval(secs => %s)))
+                  AND EXISTS (SELECT 1 FROM anchor_proof p WHERE p.batch_id = b.id)
+                ORDER BY b.id;
+            """, (ANCHOR_RETRY_PENDING_AFTER,))
+            batches = cursor.fetchall()
+            conn.commit()
+
+            confirmed = 0
+            for batch_id, root, leaf_count in batches:
+                if fetch_root_timestamp(root) > 0:
+                    # Mined before a crash or a lost receipt: nothing to send
+                    cursor.execute("""
+                        UPDATE anchor_batch SET status = 'confirmed', anchored_at = COALESCE(anchored_at, %s)
+                        WHERE id = %s;
+                    """, (datetime.now(), batch_id))
+                    conn.commit()
+                    _confirmed_roots.add(root)
+                    confirmed += 1
+                    continue
+                tx_hash = self._push(conn, cursor, batch_id, root, leaf_count)
+                if tx_hash:
+                    confirmed += 1
+                    cursor.execute("SELECT employee_id, record_hash FROM anchor_proof WHERE batch_id = %s ORDER BY leaf_index;",
+                                   (batch_id,))
+                    self._notify(batch_id, root, cursor.fetchall(), tx_hash)
+                else:
+                    # Still failing (e.g. RPC down): later batches are not held up behind it
+                    break
+            cursor.close()
+        finally:
+            conn.close()
+        if batches:
+            print(f"🔁 Retried Merkle batches: {confirmed}/{len(batches)} confirmed")
+        return confirmed
+
+    def _push(self, conn, cursor, batch_id, root, leaf_count):
+        """Send one root; records the outcome on anchor_batch and returns the tx hash (None on failure)"""
+        receipt = push_root(root, leaf_count)
+        if receipt and receipt['status'] == 1:
+            tx_hash = receipt['transactionHash'].hex()
+            cursor.execute("""
+                UPDATE anchor_batch
+                SET status = 'confirmed', tx_hash = %s, block_number = %s, anchored_at = %s
+                WHERE id = %s;
+            """, (tx_hash, receipt['blockNumber'], datetime.now(), batch_id))
+            _confirmed_roots.add(root)
+        else:
+            tx_hash = None
+            cursor.execute("UPDATE anchor_batch SET status = 'failed' WHERE id = %s;", (batch_id,))
+        conn.commit()
+        return tx_hash
+
+    def _notify(self, batch_id, root, records, tx_hash):
+        if self.on_anchored:
+            try:
+                self.on_anchored(batch_id, root, records, tx_hash)
+            except Exception as e:
+                print(f"⚠️ on_anchored callback failed: {e}")
+
+    def _anchor_batch(self, records):
+        leaves = [merkle_leaf(employee_id, record_hash) for employee_id, record_hash in records]
+        levels = build_merkle_tree(leaves)
+        root = merkle_root(levels)
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+
+            # Persist root and proofs first. The same records always give the
+            # same root, so a collision is an earlier batch of exactly these
+            # records: reuse it, and only send it if it is not confirmed yet
+            cursor.execute("""
+                INSERT INTO anchor_batch (merkle_root, leaf_count, status)
+                VALUES (%s, %s, 'pending')
+                ON CONFLICT (merkle_root) DO UPDATE SET leaf_count = EXCLUDED.leaf_count
+                RETURNING id, status;
+            """, (root, len(records)))
+            batch_id, status = cursor.fetchone()
+
+            for index, (employee_id, record_hash) in enumerate(records):
+                cursor.execute("""
+                    INSERT INTO anchor_proof (employee_id, batch_id, leaf_index, record_hash, proof)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (employee_id) DO UPDATE
+                    SET batch_id = EXCLUDED.batch_id,
+                        leaf_index = EXCLUDED.leaf_index,
+                        record_hash = EXCLUDED.record_hash,
+                        proof = EXCLUDED.proof;
+                """, (employee_id, batch_id, index, record_hash, json.dumps(merkle_proof(levels, index))))
+            conn.commit()
+            if status == 'confirmed':
+                cursor.close()
+                return batch_id
+
+            # One transaction anchors the whole batch; a failed one stays
+            # 'failed' with its proofs and is re-pushed by _retry_unconfirmed
+            tx_hash = self._push(conn, cursor, batch_id, root, len(records))
+            cursor.close()
+        finally:
+            conn.close()
+
+        if tx_hash:
+            self._notify(batch_id, root, records, tx_hash)
+        return batch_id
+
+
+def _root_is_anchored(root: str) -> bool:
+    if not MERKLE_VERIFY_ROOT_ON_CHAIN or root in _confirmed_roots:
+        return True
+    if fetch_root_timestamp(root) > 0:
+        _confirmed_roots.add(root)
+        return True
+    return False
+
+
+def fetch_merkle_anchored_hashes(cursor, employee_ids) -> dict:
+    """Anchored record hash per employee ID, for records covered by a confirmed batch
+
+    Proofs are checked locally against the batch root; only records whose
+    proof folds to an anchored root are returned.
+    """
+    if not employee_ids:
+        return {}
+
+    cursor.execute("""
+        SELECT p.employee_id, p.record_hash, p.proof, b.merkle_root
+        FROM anchor_proof p
+        JOIN anchor_batch b ON b.id = p.batch_id
+        WHERE b.status = 'confirmed' AND p.employee_id = ANY(%s);
+    """, (list(employee_ids),))
+
+    anchored = {}
+    for employee_id, record_hash, proof, root in cursor.fetchall():
+        if isinstance(proof, str):
+            proof = json.loads(proof)
+        if verify_merkle_proof(employee_id, record_hash, proof, root) and _root_is_anchored(root):
+            anchored[employee_id] = record_hash
+    return anchored
@@ -24,8 +24,8 @@ print("2️⃣ Testing /employees endpoint...")
 try:
     response = requests.get(f"{API_BASE}/employees", timeout=10)
     if response.status_code == 200:
-        employees = response.json()
-        print(f"✅ Found {len(employees)} employees\n")
+        page = response.json()
+        print(f"✅ Found {page['total']} employees\n")
     else:
         print(f"❌ Failed with status {response.status_code}\n")
 except Exception as e:
@@ -0,0 +1,147 @@
+"""Canonical record hashing for secure_db, versioned per row (secure_db.hash_version)
+
+Version 1 (legacy): sha256(f"{name}{role}{salary}{created_at.isoformat()}")
+    No field delimiters, so ("ab", "c") and ("a", "bc") collide.
+Version 2: sha256 over a length-prefixed binary encoding
+Version 3: the version 2 encoding under BLAKE2b-256 (32 bytes, still fits bytes32)
+
+Binary encoding (versions 2+):
+    version byte
+    name, role, salary: int32 big-endian byte length + UTF-8 bytes (length -1 for NULL)
+    created_at: int64 big-endian microseconds since 1970-01-01 (naive, as stored)
+
+Database/in_db_verification.sql mirrors versions 1 and 2 in SQL; run
+`python -m Others.benchmark_hashing` to compare versions against the f-string path.
+"""
+import hashlib
+import os
+import struct
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HASH_VERSION_LEGACY = 1
+HASH_VERSION_SHA256 = 2
+HASH_VERSION_BLAKE2B = 3
+
+# Version written for new records
+RECORD_HASH_VERSION = int(os.getenv("RECORD_HASH_VERSION", HASH_VERSION_SHA256))
+
+_LENGTH = struct.Struct(">i")
+_NULL = _LENGTH.pack(-1)
+_TIMESTAMP = struct.Struct(">q")
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _blake2b(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+# version -> digest function over the encoded record
+_DIGESTS = {
+    HASH_VERSION_LEGACY: _sha256,
+    HASH_VERSION_SHA256: _sha256,
+    HASH_VERSION_BLAKE2B: _blake2b,
+}
+
+SUPPORTED_VERSIONS = tuple(_DIGESTS)
+
+
+def _field(value) -> bytes:
+    if value is None:
+        return _NULL
+    data = str(value).encode('utf-8')
+    return _LENGTH.pack(len(data)) + data
+
+
+def _micros(created_at: datetime) -> int:
+    # Integer arithmetic only: no timedelta objects, exact for every datetime
+    seconds = ((created_at.toordinal() - _EPOCH_ORDINAL) * 86400
+               + created_at.hour * 3600 + created_at.minute * 60 + created_at.second)
+    return seconds * 1_000_000 + created_at.microsecond
+
+
+def encode_record(name, role, salary, created_at: datetime, version=RECORD_HASH_VERSION) -> bytes:
+    """Canonical bytes that get hashed for `version`"""
+    if version == HASH_VERSION_LEGACY:
+        return f"{name}{role}{salary}{created_at.isoformat()}".encode('utf-8')
+    if version not in _DIGESTS:
+        raise ValueError(f"Unsupported record hash version: {version}")
+    return (bytes((version,)) + _field(name) + _field(role) + _field(salary)
+            + _TIMESTAMP.pack(_micros(created_at)))
+
+
+def hash_record(name, role, salary, created_at: datetime, version=RECORD_HASH_VERSION) -> str:
+    """Hex record hash for one record"""
+    if version not in _DIGESTS:
+        raise ValueError(f"Unsupported record hash version: {version}")
+    return _DIGESTS[version](encode_record(name, role, salary, created_at, version))
+
+
+def _encode_fields(name, role, salary, created_at, prefix, pack_length=_LENGTH.pack,
+                   pack_timestamp=_TIMESTAMP.pack, null=_NULL, epoch=_EPOCH_ORDINAL) -> bytes:
+    # encode_record() for versions 2+, with globals bound as defaults for the batch loops
+    parts = [prefix]
+    for value in (name, role, salary):
+        if value is None:
+            parts.append(null)
+        else:
+            data = value.encode('utf-8') if value.__class__ is str else str(value).encode('utf-8')
+            parts.append(pack_length(len(data)))
+            parts.append(data)
+    parts.append(pack_timestamp(
+        ((created_at.toordinal() - epoch) * 86400 + created_at.hour * 3600
+         + created_at.minute * 60 + created_at.second) * 1_000_000 + created_at.microsecond
+    ))
+    return b"".join(parts)
+
+
+def _hash_batch(rows, version):
+    """[(id, hex_hash)] for rows that all share `version`"""
+    sha256 = hashlib.sha256
+    if version == HASH_VERSION_LEGACY:
+        return [(row[0], sha256(f"{row[1]}{row[2]}{row[3]}{row[5].isoformat()}".encode('utf-8')).hexdigest())
+                for row in rows]
+    prefix, encode = bytes((version,)), _encode_fields
+    if version == HASH_VERSION_SHA256:
+        return [(row[0], sha256(encode(row[1], row[2], row[3], row[5], prefix)).hexdigest()) for row in rows]
+    if version == HASH_VERSION_BLAKE2B:
+        blake2b = hashlib.blake2b
+        return [(row[0], blake2b(encode(row[1], row[2], row[3], row[5], prefix), digest_size=32).hexdigest())
+                for row in rows]
+    raise ValueError(f"Unsupported record hash version: {version}")
+
+
+def hash_rows(rows, version=None):
+    """[(id, hex_hash)] for raw secure_db tuples
+
+    Rows are (id, name, role, salary, record_hash, created_at[, hash_version]);
+    each row hashes under its own hash_version column when present, else
+    under `version` (default: legacy, i.e. rows written before versioning).
+    A batch sharing one version (the common case) runs a single tight loop.
+    """
+    default = HASH_VERSION_LEGACY if version is None else version
+    rows = rows if isinstance(rows, list) else list(rows)
+    if not rows:
+        return []
+    if len(rows[0]) <= 6:
+        return _hash_batch(rows, default)
+
+    versions = {row[6] for row in rows}
+    if len(versions) == 1:
+        only = versions.pop()
+        return _hash_batch(rows, default if only is None else only)
+
+    by_version = {}
+    for index, row in enumerate(rows):
+        by_version.setdefault(default if row[6] is None else row[6], []).append(index)
+    out = [None] * len(rows)
+    for row_version, indexes in by_version.items():
+        for index, pair in zip(indexes, _hash_batch([rows[i] for i in indexes], row_version)):
+            out[index] = pair
+    return out
@@ -0,0 +1,344 @@
+"""Statistical sampling audit: verify a random sample, report the guarantee it buys
+
+A full pass costs one chain lookup per row. To claim "with confidence C,
+fewer than P of the rows are tampered" it is enough to verify a random
+sample of n rows and find none tampered, where n is the smallest size whose
+probability of missing every one of ceil(P * N) tampered rows is at most
+1 - C (hypergeometric, so n stops growing with N: ~300 rows for 95% / 1%).
+
+Sampling methods (no ORDER BY random() over the table):
+    uniform     TABLESAMPLE BERNOULLI (row-level, one sequential read), subsampled to n
+    index       random draws over the primary-key range, keeping IDs that exist
+                (uniform over rows however sparse the IDs; falls back to uniform)
+    stratified  uniform sample allocated across equal created_at ranges in
+                proportion to their row counts, so old and new data are both covered
+
+    python -m Others.sampling_audit --confidence 0.99 --max-tamper-rate 0.005
+    python -m Others.sampling_audit --method stratified --strata 12 --json
+"""
+import argparse
+import json
+import math
+import os
+import random
+from statistics import NormalDist
+from time import time
+from dotenv import load_dotenv
+
+from Others.verification_engine import NOT_ANCHORED, build_result, chain_lookup, classify, hash_rows
+
+load_dotenv()
+
+SAMPLE_CONFIDENCE = float(os.getenv("SAMPLE_CONFIDENCE", 0.95))
+SAMPLE_MAX_TAMPER_RATE = float(os.getenv("SAMPLE_MAX_TAMPER_RATE", 0.01))
+# Extra rows TABLESAMPLE aims for, since BERNOULLI only returns ~pct of rows
+SAMPLE_OVERSAMPLE = 1.3
+# Upper bound on the sample, whatever the requested guarantee
+SAMPLE_MAX_ROWS = int(os.getenv("SAMPLE_MAX_ROWS", 20000))
+
+METHODS = ("uniform", "index", "stratified")
+
+_COLUMNS = "id, name, role, salary, record_hash, created_at, hash_version"
+
+
+def miss_probability(population, tampered_rows, sample_size) -> float:
+    """P(a uniform sample without replacement contains none of `tampered_rows`)"""
+    if tampered_rows <= 0:
+        return 1.0
+    if sample_size > population - tampered_rows:
+        return 0.0
+    p = 1.0
+    for i in range(sample_size):
+        p *= (population - tampered_rows - i) / (population - i)
+    return p
+
+
+def required_sample_size(population, confidence, max_tamper_rate) -> int:
+    """Smallest n that finds at least one tampered row with `confidence` when
+    at least `max_tamper_rate` of `population` rows are tampered"""
+    if population <= 0:
+        return 0
+    tampered_rows = max(1, math.ceil(max_tamper_rate * population))
+    miss, n = 1.0, 0
+    # Multiply in one factor per extra row until missing them all is unlikely enough
+    while miss > 1 - confidence and n < population:
+        miss *= (population - tampered_rows - n) / (population - n)
+        n += 1
+    return n
+
+
+def tamper_rate_upper_bound(population, sample_size, confidence) -> float:
+    """Largest tampered fraction still consistent (at `confidence`) with a clean sample"""
+    if sample_size >= population:
+        return 0.0
+    # Largest D with P(miss all D) > 1 - confidence; miss probability falls as D grows
+    low, high = 0, population - sample_size
+    while low < high:
+        mid = (low + high + 1) // 2
+        if miss_probability(population, mid, sample_size) > 1 - confidence:
+            low = mid
+        else:
+            high = mid - 1
+    return low / population
+
+
+def wilson_interval(found, sample_size, confidence):
+    """Two-sided Wilson score interval for the tampered fraction"""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = found / sample_size
+    denominator = 1 + z * z / sample_size
+    center = (p + z * z / (2 * sample_size)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / sample_size + z * z / (4 * sample_size * sample_size)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def estimate_population(cursor) -> tuple:
+    """(row count, estimated?) - the planner estimate, or COUNT(*) before the first ANALYZE"""
+    cursor.execute("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = 'secure_db'::regclass;")
+    estimate = cursor.fetchone()[0]
+    if estimate > 0:
+        return estimate, True
+    cursor.execute("SELECT COUNT(*) FROM secure_db;")
+    return cursor.fetchone()[0], False
+
+
+def sample_uniform(cursor, population, size, rng) -> list:
+    """`size` rows drawn uniformly via TABLESAMPLE BERNOULLI, retried with a larger rate if short"""
+    if size >= population:
+        cursor.execute(f"SELECT {_COLUMNS} FROM secure_db;")
+        return cursor.fetchall()
+    percent = min(100.0, 100.0 * size * SAMPLE_OVERSAMPLE / max(population, 1))
+    rows = []
+    for _ in range(3):
+        cursor.execute(
+            f"SELECT {_COLUMNS} FROM secure_db TABLESAMPLE BERNOULLI (%s) REPEATABLE (%s);",
+            (percent, rng.randrange(2 ** 31)),
+        )
+        rows = cursor.fetchall()
+        if len(rows) >= size or percent >= 100.0:
+            break
+        percent = min(100.0, percent * 2)
+    # BERNOULLI's row count is random; trim uniformly (not by physical order)
+    return rng.sample(rows, size) if len(rows) > size else rows
+
+
+def sample_by_index(cursor, population, size, rng, max_rounds=6) -> list:
+    """`size` rows via random primary-key draws; IDs that do not exist are redrawn"""
+    cursor.execute("SELECT MIN(id), MAX(id) FROM secure_db;")
+    low, high = cursor.fetchone()
+    if low is None:
+        return []
+    span = high - low + 1
+    density = min(1.0, max(population, 1) / span)
+    if size >= population or density < 0.01:
+        # Too sparse for rejection sampling to pay off
+        return sample_uniform(cursor, population, size, rng)
+
+    found = {}
+    for _ in range(max_rounds):
+        remaining = size - len(found)
+        if remaining <= 0:
+            break
+        draws = min(span, math.ceil(remaining / density * SAMPLE_OVERSAMPLE))
+        candidates = {rng.randrange(low, high + 1) for _ in range(draws)} - found.keys()
+        cursor.execute(f"SELECT {_COLUMNS} FROM secure_db WHERE id = ANY(%s);", (list(candidates),))
+        rows = cursor.fetchall()
+        # Rows come back in index order; shuffle so a surplus is not trimmed by ID
+        rng.shuffle(rows)
+        for row in rows[:remaining]:
+            found[row[0]] = row
+    return list(found.values())
+
+
+def sample_stratified(cursor, population, size, rng, strata=10) -> tuple:
+    """(rows, per-stratum report): equal created_at ranges, proportional allocation"""
+    cursor.execute("SELECT MIN(created_at), MAX(created_at) FROM secure_db;")
+    start, end = cursor.fetchone()
+    if start is None or start == end:
+        return sample_uniform(cursor, population, size, rng), []
+
+    cursor.execute("""
+        SELECT LEAST(width_bucket(extract(epoch FROM created_at), extract(epoch FROM %s::timestamp),
+                                  extract(epoch FROM %s::timestamp), %s), %s) AS stratum, COUNT(*)
+        FROM secure_db WHERE created_at IS NOT NULL
+        GROUP BY stratum ORDER BY stratum;
+    """, (start, end, strata, strata))
+    counts = dict(cursor.fetchall())
+    total = sum(counts.values())
+    # Largest-remainder rounding, so the strata add up to exactly `size`
+    shares = {h: size * n / total for h, n in counts.items()}
+    allocation = {h: int(share) for h, share in shares.items()}
+    by_remainder = sorted(shares, key=lambda h: shares[h] - allocation[h], reverse=True)
+    for h in by_remainder[:size - sum(allocation.values())]:
+        allocation[h] += 1
+
+    width = (end - start) / strata
+    rows, report = [], []
+    pool = sample_uniform(cursor, population, min(population, math.ceil(size * SAMPLE_OVERSAMPLE)), rng)
+    by_stratum = {}
+    for row in pool:
+        if row[5] is None:
+            continue
+        h = min(strata, int((row[5] - start) / width) + 1)
+        by_stratum.setdefault(h, []).append(row)
+    for h in sorted(counts):
+        candidates = by_stratum.get(h, [])
+        take = min(allocation[h], len(candidates))
+        if take < allocation[h] and counts[h] > len(candidates):
+            # Thin stratum in the shared sample: draw its shortfall directly
+            # (a seeded hash order over this created_at range only, served by idx_created_at)
+            seen = [row[0] for row in candidates]
+            cursor.execute(f"""
+                SELECT {_COLUMNS} FROM secure_db
+                WHERE created_at >= %s AND (%s OR created_at < %s) AND NOT (id = ANY(%s))
+                ORDER BY md5(id::text || %s) LIMIT %s;
+            """, (start + width * (h - 1), h == strata, start + width * h, seen,
+                  str(rng.random()), allocation[h] - take))
+            candidates = candidates + cursor.fetchall()
+            take = min(allocation[h], len(candidates))
+        chosen = rng.sample(candidates, take)
+        rows.extend(chosen)
+        report.append({
+            "stratum": h,
+            "from": (start + width * (h - 1)).isoformat(),
+            "to": (start + width * h).isoformat(),
+            "rows": counts[h],
+            "sampled": len(chosen),
+        })
+    return rows, report
+
+
+def sample_audit(conn, confidence=SAMPLE_CONFIDENCE, max_tamper_rate=SAMPLE_MAX_TAMPER_RATE,
+                 method="uniform", strata=10, seed=None, lookup=chain_lookup, on_tampered=None) -> dict:
+    """Verify a random sample sized for (confidence, max_tamper_rate) and report the guarantee
+
+    `lookup(conn, ids)` returns chain hashes as in the verification engine;
+    `on_tampered(result)` is called for each anchored record that fails.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown sampling method: {method}")
+    if not 0 < confidence < 1 or not 0 < max_tamper_rate < 1:
+        raise ValueError("confidence and max_tamper_rate must be between 0 and 1")
+
+    started = time()
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    try:
+        population, estimated = estimate_population(cursor)
+        target = min(required_sample_size(population, confidence, max_tamper_rate), SAMPLE_MAX_ROWS)
+
+        strata_report = []
+        if method == "index":
+            rows = sample_by_index(cursor, population, target, rng)
+        elif method == "stratified":
+            rows, strata_report = sample_stratified(cursor, population, target, rng, strata)
+        else:
+            rows = sample_uniform(cursor, population, target, rng)
+        conn.rollback()
+    finally:
+        cursor.close()
+    sampled_at = time()
+
+    checkable = [row for row in rows if row[4] and row[5]]
+    chain_hashes = lookup(conn, [row[0] for row in checkable]) if checkable else {}
+    computed = dict(hash_rows(checkable))
+
+    counts = {"verified": 0, "tampered": 0, "not_anchored": 0}
+    results, tampered_records = [], []
+    for row in checkable:
+        result = build_result(row, computed[row[0]], chain_hashes.get(row[0], NOT_ANCHORED))
+        status = classify(result)
+        counts[status] += 1
+        results.append(result)
+        if status == "tampered":
+            tampered_records.append(result)
+            if on_tampered:
+                on_tampered(result)
+
+    checked = len(checkable)
+    # Only anchored rows can reveal tampering: a not_anchored row has no chain
+    # hash to compare, so the guarantee rests on verified + tampered alone
+    anchored = counts["verified"] + counts["tampered"]
+    found = counts["tampered"]
+    guarantee = {"confidence": confidence, "max_tamper_rate": max_tamper_rate,
+                 "anchored_shortfall": max(0, target - anchored)}
+    if anchored and found == 0:
+        upper = tamper_rate_upper_bound(population, anchored, confidence) if population else 0.0
+        detection = 1 - miss_probability(population, max(1, math.ceil(max_tamper_rate * population)), anchored)
+        met = detection >= confidence and anchored >= target
+        statement = f"With {confidence:.0%} confidence, at most {upper:.3%} of ~{population} rows are tampered"
+        if not met:
+            statement = (f"Guarantee not met: only {anchored} of {target} required rows could be checked "
+                         f"against the chain ({counts['not_anchored']} not anchored); {statement.lower()}")
+        guarantee.update({
+            "met": met,
+            "detection_probability": round(detection, 6),
+            "tamper_rate_upper_bound": round(upper, 6),
+            "statement": statement,
+        })
+    elif anchored:
+        low, high = wilson_interval(found, anchored, confidence)
+        guarantee.update({
+            "met": False,
+            "tamper_rate_estimate": round(found / anchored, 6),
+            "tamper_rate_interval": [round(low, 6), round(high, 6)],
+            "statement": f"Tampering found in {found} of {anchored} anchored sampled rows "
+                         f"(estimated {low:.2%}-{high:.2%} of the table at {confidence:.0%} confidence)",
+        })
+    elif checked:
+        guarantee.update({"met": False, "statement": f"None of the {checked} sampled rows has a chain hash "
+                                                     f"to compare against (not anchored, or the chain lookup failed)"})
+    else:
+        guarantee.update({"met": False, "statement": "Nothing to verify"})
+
+    return {
+        "method": method,
+        "seed": seed,
+        "population": population,
+        "population_estimated": estimated,
+        "sample_size_target": target,
+        "sampled": len(rows),
+        "checked": checked,
+        "anchored": anchored,
+        "skipped": len(rows) - checked,
+        **counts,
+        "guarantee": guarantee,
+        "strata": strata_report,
+        "tampered_records": tampered_records[:100],
+        "results": results,
+        "sampling_seconds": round(sampled_at - started, 3),
+        "elapsed_seconds": round(time() - started, 3),
+    }
+
+
+if __name__ == "__main__":
+    from Others.db_connection import connect
+
+    parser = argparse.ArgumentParser(description="Verify a random sample of secure_db with a statistical guarantee")
+    parser.add_argument("--confidence", type=float, default=SAMPLE_CONFIDENCE)
+    parser.add_argument("--max-tamper-rate", type=float, default=SAMPLE_MAX_TAMPER_RATE,
+                        help="smallest tampered fraction the sample must catch")
+    parser.add_argument("--method", choices=METHODS, default="uniform")
+    parser.add_argument("--strata", type=int, default=10, help="created_at ranges for --method stratified")
+    parser.add_argument("--seed", type=int, default=None, help="repeatable sample")
+    parser.add_argument("--source", choices=["rpc", "index"], default=os.getenv("CHAIN_HASH_SOURCE", "rpc").lower())
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        report = sample_audit(
+            conn, args.confidence, args.max_tamper_rate, args.method, args.strata, args.seed,
+            lookup=lambda c, ids: chain_lookup(c, ids, source=args.source),
+        )
+    finally:
+        conn.close()
+
+    report.pop("results")
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print(f"✅ Sampled {report['sampled']} of ~{report['population']} rows ({report['method']}) "
+              f"in {report['elapsed_seconds']}s: {report['verified']} verified, {report['tampered']} tampered, "
+              f"{report['not_anchored']} not anchored")
+        print(f"   {report['guarantee']['statement']}")
@@ -0,0 +1,161 @@
+"""Online rollout of Database/search_indexes.sql: salary backfill, salary index, planner check
+
+search_indexes.sql adds salary_amount and the trigger that fills it for new
+and updated rows; existing rows are filled here in id-keyset batches, each
+its own short transaction, so writers are never blocked for long. The
+salary btree is then built CONCURRENTLY and every search shape is EXPLAINed
+to confirm it can use its index.
+
+    psql "$DATABASE_URL" -f Database/search_indexes.sql
+    python -m Others.search_migration backfill --batch 5000
+    python -m Others.search_migration check
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from time import perf_counter
+from dotenv import load_dotenv
+
+from Others.async_db import EMPLOYEE_COLUMNS, connect, search_conditions
+
+load_dotenv()
+
+SEARCH_BACKFILL_BATCH = int(os.getenv("SEARCH_BACKFILL_BATCH", 5000))
+
+# (label, search filters, index the query must be able to use)
+PLAN_CHECKS = [
+    ("name substring", {"name": "ann"}, "idx_{table}_name_trgm"),
+    ("role substring", {"role": "engineer"}, "idx_{table}_role_trgm"),
+    ("salary range", {"min_salary": 100000, "max_salary": 101000}, "idx_{table}_salary_amount"),
+]
+
+
+async def backfill_salary(conn, table="secure_db", batch_size=SEARCH_BACKFILL_BATCH, pause=0.0) -> dict:
+    """Set salary_amount from salary for every row, batch_size rows per transaction
+
+    Rows already holding the right value are skipped, so a rerun (or a run
+    racing the trigger) only touches what is missing.
+    """
+    last_id, scanned, updated, batches = -(2 ** 31) - 1, 0, 0, 0
+    started = perf_counter()
+    while True:
+        row = await conn.fetchrow(f"""
+            WITH batch AS (
+                SELECT id FROM {table} WHERE id > $1::bigint ORDER BY id LIMIT $2
+            ), changed AS (
+                UPDATE {table} t SET salary_amount = secure_db_parse_salary(t.salary)
+                FROM batch
+                WHERE t.id = batch.id
+                  AND t.salary_amount IS DISTINCT FROM secure_db_parse_salary(t.salary)
+                RETURNING 1
+            )
+            SELECT (SELECT max(id) FROM batch) AS last_id, (SELECT count(*) FROM batch) AS scanned,
+                   (SELECT count(*) FROM changed) AS changed;
+        """, last_id, batch_size)
+        if row["last_id"] is None:
+            break
+        last_id = row["last_id"]
+        scanned += row["scanned"]
+        updated += row["changed"]
+        batches += 1
+        if batches % 100 == 0:
+            print(f"   ... {batches} batches, {updated} rows updated, at id {last_id}")
+        if pause:
+            await asyncio.sleep(pause)
+    elapsed = perf_counter() - started
+    return {"scanned": scanned, "updated": updated, "batches": batches, "seconds": round(elapsed, 2),
+            "rows_per_second": round(scanned / elapsed) if elapsed else None}
+
+
+async def create_salary_index(conn, table="secure_db"):
+    """Build the salary_amount btree without blocking writes (rebuilding a failed, invalid one)"""
+    index = f"idx_{table}_salary_amount"
+    valid = await conn.fetchval(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = $1;", index
+    )
+    if valid is False:
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index};")
+    await conn.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {table}(salary_amount);")
+
+
+def _plan_nodes(plan):
+    """Every node of a JSON EXPLAIN plan"""
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.get("Plans", []))
+
+
+def _plan_indexes(plan) -> set:
+    """Names of every index the plan reads"""
+    return {node["Index Name"] for node in _plan_nodes(plan) if "Index Name" in node}
+
+
+async def _explain(conn, query, params) -> dict:
+    return json.loads(await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *params))[0]["Plan"]
+
+
+async def check_plans(conn, table="secure_db") -> list:
+    """EXPLAIN each search shape; `usable` means its index matches the predicate
+
+    The planner's own choice (`chosen`) depends on table size and statistics -
+    on a small table a sequential scan is cheaper - so each query is also
+    planned with sequential scans disabled, which only picks the index if the
+    predicate can use it.
+    """
+    results = []
+    for label, filters, index in PLAN_CHECKS:
+        index = index.format(table=table)
+        where, params = search_conditions(**filters)
+        query = f"SELECT {EMPLOYEE_COLUMNS} FROM {table} WHERE {where} ORDER BY id"
+        chosen = await _explain(conn, query, params)
+        async with conn.transaction():
+            await conn.execute("SET LOCAL enable_seqscan = off;")
+            forced = await _explain(conn, query, params)
+        results.append({
+            "query": label,
+            "index": index,
+            "usable": index in _plan_indexes(forced),
+            "chosen": index in _plan_indexes(chosen),
+            "scans": sorted({node["Node Type"] for node in _plan_nodes(chosen) if node["Node Type"].endswith("Scan")}),
+            "estimated_cost": chosen["Total Cost"],
+        })
+    return results
+
+
+def print_plan_checks(results) -> bool:
+    for result in results:
+        mark = "✅" if result["usable"] else "❌"
+        note = "chosen by the planner" if result["chosen"] else \
+            f"planner prefers {', '.join(result['scans'])} at this table size"
+        print(f"{mark} {result['query']}: {result['index']} {'usable' if result['usable'] else 'NOT usable'} ({note})")
+    return all(result["usable"] for result in results)
+
+
+async def main(args):
+    conn = await connect()
+    try:
+        if args.command == "backfill":
+            print(f"🔄 Backfilling salary_amount in batches of {args.batch}")
+            report = await backfill_salary(conn, batch_size=args.batch, pause=args.pause)
+            print(f"✅ {report['updated']} rows updated in {report['batches']} batches ({report['seconds']}s)")
+            print("🔨 Building idx_secure_db_salary_amount concurrently")
+            await create_salary_index(conn)
+            await conn.execute("ANALYZE secure_db;")
+        ok = print_plan_checks(await check_plans(conn))
+    finally:
+        await conn.close()
+    if not ok:
+        print("❌ Some searches cannot use their index - is Database/search_indexes.sql applied?")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roll out index-backed employee search")
+    parser.add_argument("command", choices=["backfill", "check"])
+    parser.add_argument("--batch", type=int, default=SEARCH_BACKFILL_BATCH, help="rows per backfill transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    asyncio.run(main(parser.parse_args()))
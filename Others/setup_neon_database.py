@@ -30,7 +30,8 @@ try:
             role TEXT,
             salary TEXT,
             record_hash TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            hash_version SMALLINT NOT NULL DEFAULT 1
         );
     """)
     
@@ -0,0 +1,28 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+// Event-only audit log: anchors live purely in transaction logs, no contract storage.
+// Reads are served from an index of HashAdded events (Others/event_indexer.py).
+contract AuditLogEvents {
+    // Same signature as AuditLogV2, so existing event consumers keep working
+    event HashAdded(uint256 indexed employeeId, bytes32 recordHash, uint256 timestamp);
+
+    // Anchor one record hash
+    function addHash(uint256 employeeId, bytes32 recordHash) public {
+        require(employeeId > 0, "Employee ID must be greater than 0");
+        require(recordHash != bytes32(0), "Hash cannot be empty");
+
+        emit HashAdded(employeeId, recordHash, block.timestamp);
+    }
+
+    // Anchor many record hashes in one transaction
+    function addHashes(uint256[] calldata employeeIds, bytes32[] calldata recordHashes) public {
+        require(employeeIds.length == recordHashes.length, "Length mismatch");
+
+        for (uint256 i = 0; i < employeeIds.length; i++) {
+            require(employeeIds[i] > 0, "Employee ID must be greater than 0");
+            require(recordHashes[i] != bytes32(0), "Hash cannot be empty");
+            emit HashAdded(employeeIds[i], recordHashes[i], block.timestamp);
+        }
+    }
+}
@@ -0,0 +1,64 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+contract AuditLogV3 {
+    // Mapping from employee ID to their record hash
+    mapping(uint256 => bytes32) private recordHashes;
+
+    // Mapping from Merkle root to the block timestamp it was anchored at
+    mapping(bytes32 => uint256) private rootTimestamps;
+
+    // Number of Merkle batches anchored so far
+    uint256 public batchCount;
+
+    // Event emitted when a hash is added
+    event HashAdded(uint256 indexed employeeId, bytes32 recordHash, uint256 timestamp);
+
+    // Event emitted when a Merkle root covering a batch of records is anchored
+    event RootAnchored(uint256 indexed batchId, bytes32 indexed merkleRoot, uint256 leafCount, uint256 timestamp);
+
+    // Add or update a hash for an employee record
+    function addHash(uint256 employeeId, bytes32 recordHash) public {
+        require(employeeId > 0, "Employee ID must be greater than 0");
+        require(recordHash != bytes32(0), "Hash cannot be empty");
+
+        recordHashes[employeeId] = recordHash;
+        emit HashAdded(employeeId, recordHash, block.timestamp);
+    }
+
+    // Retrieve the hash for a given employee ID
+    function getHash(uint256 employeeId) public view returns (bytes32) {
+        return recordHashes[employeeId];
+    }
+
+    // Retrieve hashes for many employee IDs in one call (zero for IDs never anchored)
+    function getHashes(uint256[] calldata employeeIds) public view returns (bytes32[] memory) {
+        bytes32[] memory hashes = new bytes32[](employeeIds.length);
+        for (uint256 i = 0; i < employeeIds.length; i++) {
+            hashes[i] = recordHashes[employeeIds[i]];
+        }
+        return hashes;
+    }
+
+    // Check if a hash exists for an employee
+    function hashExists(uint256 employeeId) public view returns (bool) {
+        return recordHashes[employeeId] != bytes32(0);
+    }
+
+    // Anchor the Merkle root of a batch of record hashes
+    function anchorRoot(bytes32 merkleRoot, uint256 leafCount) public returns (uint256) {
+        require(merkleRoot != bytes32(0), "Root cannot be empty");
+        require(leafCount > 0, "Batch cannot be empty");
+        require(rootTimestamps[merkleRoot] == 0, "Root already anchored");
+
+        batchCount += 1;
+        rootTimestamps[merkleRoot] = block.timestamp;
+        emit RootAnchored(batchCount, merkleRoot, leafCount, block.timestamp);
+        return batchCount;
+    }
+
+    // Block timestamp a Merkle root was anchored at (0 if never anchored)
+    function rootAnchoredAt(bytes32 merkleRoot) public view returns (uint256) {
+        return rootTimestamps[merkleRoot];
+    }
+}
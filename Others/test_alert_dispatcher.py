@@ -0,0 +1,135 @@
+"""Exercises the alert dispatcher against local sinks, no external services
+
+Starts an aiosmtpd server and a webhook receiver on localhost, submits
+repeated tamper results, and checks deduplication, cooldown re-alerting,
+digest batching and that every digest reuses one SMTP connection.
+
+    pip install aiosmtpd
+    python -m Others.test_alert_dispatcher
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+from email import message_from_bytes, policy
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from time import time, sleep
+
+from Others.alert_dispatcher import AlertDispatcher, SMTPSink, WebhookSink, LogFileSink
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    sys.exit("❌ aiosmtpd is not installed (pip install aiosmtpd)")
+
+
+class CollectingHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append(message_from_bytes(envelope.content, policy=policy.default))
+        return "250 OK"
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        WebhookHandler.received.append(json.loads(body))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def tampered(employee_id, computed_hash="c" * 64):
+    return {"id": employee_id, "name": f"Employee {employee_id}", "stored_hash": "a" * 64,
+            "computed_hash": computed_hash, "blockchain_hash": "a" * 64}
+
+
+def wait_for_digests(count, timeout=10):
+    deadline = time() + timeout
+    while dispatcher.stats()["digests"] < count and time() < deadline:
+        sleep(0.05)
+
+
+def check(label, condition):
+    global failures
+    print(f"{'✅' if condition else '❌'} {label}")
+    failures += 0 if condition else 1
+
+
+print("🧪 Testing alert dispatcher\n")
+failures = 0
+
+handler = CollectingHandler()
+controller = Controller(handler, hostname="127.0.0.1", port=8025)
+controller.start()
+
+webhook = HTTPServer(("127.0.0.1", 0), WebhookHandler)
+threading.Thread(target=webhook.serve_forever, daemon=True).start()
+
+log_path = os.path.join(tempfile.mkdtemp(), "alerts.log")
+smtp_sink = SMTPSink(host="127.0.0.1", port=8025, sender="audit@localhost", password=None,
+                     recipient="admin@localhost", starttls=False)
+dispatcher = AlertDispatcher(
+    sinks=[smtp_sink, WebhookSink(f"http://127.0.0.1:{webhook.server_port}/alerts"), LogFileSink(log_path)],
+    cooldown=3600, digest_window=0.5, digest_max=100,
+)
+dispatcher.start()
+
+try:
+    # Three passes over the same 10 tampered rows: only the first should alert
+    accepted = sum(dispatcher.submit(tampered(i), "test") for _ in range(3) for i in range(1, 11))
+    check(f"10 of 30 submissions queued (got {accepted})", accepted == 10)
+
+    wait_for_digests(1)
+    check(f"one digest email for 10 findings (got {len(handler.messages)})", len(handler.messages) == 1)
+    check("digest subject counts the records", "10 records" in handler.messages[0]["Subject"])
+    check("webhook got one POST with 10 alerts",
+          len(WebhookHandler.received) == 1 and WebhookHandler.received[0]["count"] == 10)
+    with open(log_path, encoding='utf-8') as f:
+        check("log sink wrote 10 lines", len(f.readlines()) == 10)
+
+    # Changed hashes re-alert inside the cooldown; unchanged ones stay quiet
+    check("row with new hashes re-alerts", dispatcher.submit(tampered(1, "d" * 64), "test"))
+    check("unchanged row stays deduplicated", not dispatcher.submit(tampered(2), "test"))
+    dispatcher.submit(tampered(11), "test")
+    wait_for_digests(2)
+    check(f"second digest sent (emails: {len(handler.messages)})", len(handler.messages) == 2)
+    check(f"both digests over one SMTP connection (opened {smtp_sink.connections_opened})",
+          smtp_sink.connections_opened == 1 and len(handler.sessions) == 1)
+
+    dispatcher.stop()
+    stats = dispatcher.stats()
+    check(f"stats: {stats['deduplicated']} deduplicated, {stats['digests']} digests, no sink errors",
+          stats["deduplicated"] == 21 and stats["digests"] == 2 and not any(stats["sink_errors"].values()))
+
+    # A digest no sink accepts is not counted as sent and does not start the cooldown
+    class FailingSink(LogFileSink):
+        name = "failing"
+
+        def send(self, alerts):
+            raise OSError("sink down")
+
+    failing = AlertDispatcher(sinks=[FailingSink(log_path)], cooldown=3600, digest_window=0, digest_max=100)
+    failing.submit(tampered(1), "test")
+    failing.flush()
+    stats = failing.stats()
+    check(f"failed digest: 0 sent, {stats['undelivered']} undelivered",
+          stats["digests"] == 0 and stats["alerts_sent"] == 0 and stats["undelivered"] == 1)
+    check("undelivered row alerts again on the next detection", failing.submit(tampered(1), "test"))
+finally:
+    controller.stop()
+    webhook.shutdown()
+
+if failures:
+    print(f"\n❌ {failures} check(s) failed")
+    sys.exit(1)
+print("\n✅ Alert dispatcher works against local SMTP, webhook and log sinks")
@@ -22,9 +22,9 @@ print("\n2️⃣ Testing /employees endpoint...")
 try:
     response = requests.get(f"{API_BASE}/employees", timeout=10)
     if response.status_code == 200:
-        employees = response.json()
-        print(f"✅ Found {len(employees)} employees")
-        for emp in employees:
+        page = response.json()
+        print(f"✅ Found {page['total']} employees")
+        for emp in page["items"]:
             print(f"   - {emp['name']} ({emp['role']}): ${emp['salary']}")
     else:
         print(f"❌ Failed: {response.status_code}")
@@ -0,0 +1,161 @@
+"""Exercises the HashAdded indexer against a local eth-tester chain, no RPC node
+
+Deploys AuditLogV2 to EthereumTesterProvider, emits HashAdded events and
+checks that run_once() mirrors them into chain_anchor incrementally. Then
+fakes a reorg by overwriting the stored last_block_hash and checks that the
+indexer rewinds `confirmations` blocks and re-indexes them.
+
+Needs a PostgreSQL reachable through the DB_* env vars; the tables are
+created in a throwaway schema that is dropped afterwards.
+
+    pip install "web3[tester]" py-solc-x
+    python -m Others.test_event_indexer
+"""
+import os
+import sys
+
+from Others.db_connection import connect
+from Others.event_indexer import EventIndexer, fetch_indexed_hashes
+
+try:
+    from web3 import Web3, EthereumTesterProvider
+    from solcx import compile_source, install_solc
+    w3 = Web3(EthereumTesterProvider())
+except Exception as e:
+    sys.exit(f'❌ eth-tester or py-solc-x is not available (pip install "web3[tester]" py-solc-x): {e}')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_DIR = os.path.join(SCRIPT_DIR, "..", "Database")
+SCHEMA = f"indexer_test_{os.getpid()}"
+CONFIRMATIONS = 2
+
+
+def check(label, condition):
+    global failures
+    print(f"{'✅' if condition else '❌'} {label}")
+    failures += 0 if condition else 1
+
+
+def test_connection():
+    """connect(), pointed at the throwaway schema"""
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute(f"SET search_path TO {SCHEMA};")
+    cursor.close()
+    conn.commit()
+    return conn
+
+
+def query(sql, params=None):
+    conn = test_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall() if cursor.description else None
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+
+def record_hash(n):
+    return bytes([n]) * 32
+
+
+def add_hash(employee_id, n):
+    tx_hash = contract.functions.addHash(employee_id, record_hash(n)).transact({'from': w3.eth.accounts[0]})
+    w3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def confirm():
+    """Mine enough empty blocks for everything emitted so far to be indexable"""
+    w3.testing.mine(CONFIRMATIONS)
+
+
+def anchored_count():
+    return query("SELECT COUNT(*) FROM chain_anchor;")[0][0]
+
+
+print("🧪 Testing HashAdded indexer\n")
+failures = 0
+
+install_solc('0.8.0')
+with open(os.path.join(SCRIPT_DIR, 'smart_contract_v2.sol'), 'r') as f:
+    compiled = compile_source(f.read(), output_values=['abi', 'bin'], solc_version='0.8.0')
+_, contract_interface = compiled.popitem()
+deploy_hash = w3.eth.contract(abi=contract_interface['abi'], bytecode=contract_interface['bin']) \
+    .constructor().transact({'from': w3.eth.accounts[0]})
+deploy_receipt = w3.eth.wait_for_transaction_receipt(deploy_hash)
+contract = w3.eth.contract(address=deploy_receipt.contractAddress, abi=contract_interface['abi'])
+
+admin = connect()
+admin.autocommit = True
+admin_cursor = admin.cursor()
+admin_cursor.execute(f"CREATE SCHEMA {SCHEMA};")
+admin_cursor.execute(f"SET search_path TO {SCHEMA};")
+with open(os.path.join(DATABASE_DIR, 'chain_anchor.sql'), 'r') as f:
+    admin_cursor.execute(f.read())
+
+seen = []
+indexer = EventIndexer(w3, contract, test_connection, name="test", confirmations=CONFIRMATIONS,
+                       block_range=2, start_block=deploy_receipt.blockNumber,
+                       on_anchor=lambda employee_id, hash_hex: seen.append(employee_id))
+
+try:
+    # One block per transaction: employee 3 is anchored twice, the last event wins
+    for employee_id, n in [(1, 1), (2, 2), (3, 3), (4, 4), (3, 30)]:
+        add_hash(employee_id, n)
+    # The last CONFIRMATIONS blocks (two of the five events) are not final yet
+    indexed = indexer.run_once()
+    check(f"only events {CONFIRMATIONS}+ blocks deep indexed (got {indexed} of 5)", indexed == 3)
+
+    confirm()
+    indexer.run_once()
+    check(f"all 5 events mirrored across 2-block ranges (got {anchored_count()})", anchored_count() == 5)
+    check(f"on_anchor called per event (got {sorted(seen)})", sorted(seen) == [1, 2, 3, 3, 4])
+    (last_block, last_block_hash), = query("SELECT last_block, last_block_hash FROM indexer_state WHERE name = 'test';")
+    check(f"progress saved at the confirmed head (block {last_block})",
+          last_block == w3.eth.block_number - CONFIRMATIONS
+          and last_block_hash == w3.eth.get_block(last_block)['hash'].hex())
+
+    conn = test_connection()
+    latest = fetch_indexed_hashes(conn.cursor(), [1, 2, 3, 4, 5])
+    conn.close()
+    check("latest hash per employee, overwrite wins, unanchored omitted",
+          latest == {1: record_hash(1).hex(), 2: record_hash(2).hex(), 3: record_hash(30).hex(), 4: record_hash(4).hex()})
+
+    check("second run with no new blocks indexes nothing", indexer.run_once() == 0)
+    add_hash(5, 5)
+    confirm()
+    check("next run picks up only the new event", indexer.run_once() == 1 and anchored_count() == 6)
+
+    # Reorg: the block we stopped at no longer has the hash we saved
+    (last_block,), = query("SELECT last_block FROM indexer_state WHERE name = 'test';")
+    query("UPDATE indexer_state SET last_block_hash = %s WHERE name = 'test';", ("0x" + "00" * 32,))
+    rewound = query("SELECT COUNT(*) FROM chain_anchor WHERE block_number > %s;", (last_block - CONFIRMATIONS,))[0][0]
+
+    conn = test_connection()
+    cursor = conn.cursor()
+    resume_from = indexer._check_reorg(cursor, last_block, "0x" + "00" * 32)
+    conn.commit()
+    conn.close()
+    check(f"reorg rewinds {CONFIRMATIONS} blocks ({last_block} -> {resume_from})",
+          resume_from == last_block - CONFIRMATIONS)
+    check(f"events above the rewind point dropped ({rewound} of 6)",
+          rewound > 0 and anchored_count() == 6 - rewound)
+
+    seen.clear()
+    indexer.run_once()
+    check(f"rewound blocks re-indexed ({anchored_count()} events, {len(seen)} re-announced)",
+          anchored_count() == 6 and len(seen) == rewound)
+    block_hashes = query("SELECT block_number, block_hash FROM chain_anchor;")
+    check("every mirrored event matches the canonical block hash",
+          all(w3.eth.get_block(block)['hash'].hex() == block_hash for block, block_hash in block_hashes))
+finally:
+    admin_cursor.execute(f"DROP SCHEMA {SCHEMA} CASCADE;")
+    admin.close()
+
+if failures:
+    print(f"\n❌ {failures} check(s) failed")
+    sys.exit(1)
+print("\n✅ Event indexer mirrors HashAdded events and recovers from reorgs")
@@ -0,0 +1,79 @@
+"""Proves secure_db_record_hash() (PostgreSQL) matches the Python record hash
+
+Needs Database/in_db_verification.sql and Database/hash_version.sql applied.
+Checks hand-picked edge cases (fractional seconds, unicode, NULL fields)
+under every hash version SQL implements, then every row of secure_db under
+its own hash_version; exits non-zero if any hash disagrees.
+
+    python -m Others.test_hash_parity
+"""
+import sys
+from datetime import datetime
+
+from Others.db_connection import connect
+from Others.db_verification import compute_hashes
+from Others.record_hash import HASH_VERSION_LEGACY, HASH_VERSION_SHA256, hash_rows
+
+EDGE_CASES = [
+    ("Alice", "Engineer", "75000", datetime(2024, 1, 15, 10, 30, 0)),
+    ("Alice", "Engineer", "75000", datetime(2024, 1, 15, 10, 30, 0, 1)),
+    ("Alice", "Engineer", "75000", datetime(2024, 1, 15, 10, 30, 0, 500000)),
+    ("Alice", "Engineer", "75000", datetime(2024, 1, 15, 23, 59, 59, 999999)),
+    ("Zoë 山田 🚀", "Ingénieure", "75000.50", datetime(2024, 2, 29, 0, 0, 0, 123456)),
+    ("Bob", None, "80000", datetime(2024, 6, 1, 9, 5, 7)),
+    ("Carol", "Manager", None, datetime(999, 1, 1, 0, 0, 0)),
+    ("", "", "", datetime(2024, 12, 31, 12, 0, 0, 10)),
+    ("O'Brien; DROP", "Role\twith\ttabs", " 100 ", datetime(2025, 3, 9, 2, 30, 0)),
+    ("Dave", "Ops", "90000", datetime(1969, 12, 31, 23, 59, 59, 999999)),
+]
+
+# Versions with an SQL implementation (BLAKE2b is Python-only)
+SQL_VERSIONS = (HASH_VERSION_LEGACY, HASH_VERSION_SHA256)
+
+PAGE_SIZE = 5000
+
+print("🧪 Testing in-database hash parity\n")
+
+conn = connect()
+cursor = conn.cursor()
+failures = 0
+
+for version in SQL_VERSIONS:
+    version_failures = 0
+    for i, (name, role, salary, created_at) in enumerate(EDGE_CASES):
+        cursor.execute("SELECT secure_db_record_hash(%s, %s, %s, %s::timestamp, %s);",
+                       (name, role, salary, created_at, version))
+        db_hash = cursor.fetchone()[0]
+        python_hash = hash_rows([(i, name, role, salary, None, created_at, version)])[0][1]
+        if db_hash != python_hash:
+            version_failures += 1
+            print(f"❌ v{version} edge case {i} {created_at.isoformat()!r}: db={db_hash} python={python_hash}")
+    failures += version_failures
+    print(f"{'✅' if not version_failures else '❌'} v{version}: "
+          f"{len(EDGE_CASES) - version_failures}/{len(EDGE_CASES)} edge cases match")
+
+checked, last_id = 0, 0
+while True:
+    cursor.execute("""
+        SELECT id, name, role, salary, record_hash, created_at, hash_version FROM secure_db
+        WHERE id > %s AND created_at IS NOT NULL ORDER BY id LIMIT %s;
+    """, (last_id, PAGE_SIZE))
+    rows = cursor.fetchall()
+    if not rows:
+        break
+    db_hashes = compute_hashes(cursor, [row[0] for row in rows])
+    for employee_id, python_hash in hash_rows(row for row in rows if row[6] in SQL_VERSIONS):
+        if db_hashes[employee_id] != python_hash:
+            failures += 1
+            print(f"❌ Row {employee_id}: db={db_hashes[employee_id]} python={python_hash}")
+    checked += len(rows)
+    last_id = rows[-1][0]
+print(f"{'✅' if not failures else '❌'} {checked} secure_db rows checked")
+
+cursor.close()
+conn.close()
+
+if failures:
+    print(f"\n❌ {failures} hash mismatch(es) between PostgreSQL and Python")
+    sys.exit(1)
+print("\n✅ In-database hashes are byte-identical to the Python path")
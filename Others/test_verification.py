@@ -2,7 +2,7 @@ from Others.blockchain_client import fetch_hash
 import psycopg2
 import os
 from dotenv import load_dotenv
-import hashlib
+from Others.record_hash import hash_rows
 
 load_dotenv()
 
@@ -20,19 +20,18 @@ try:
     )
     
     cursor = conn.cursor()
-    cursor.execute("SELECT id, name, role, salary, record_hash, created_at FROM secure_db ORDER BY id;")
+    cursor.execute("SELECT id, name, role, salary, record_hash, created_at, hash_version FROM secure_db ORDER BY id;")
     rows = cursor.fetchall()
     
     for row in rows:
-        emp_id, name, role, salary, stored_hash, created_at = row
+        emp_id, name, role, salary, stored_hash, created_at, hash_version = row
         
         print(f"\n{'='*80}")
         print(f"Employee ID {emp_id}: {name}")
         print(f"{'='*80}")
         
-        # Compute hash
-        combined_data = f"{name}{role}{salary}{created_at.isoformat()}".encode('utf-8')
-        computed_hash = hashlib.sha256(combined_data).hexdigest()
+        # Compute hash (under the row's hash_version)
+        computed_hash = hash_rows([row])[0][1]
         
         # Fetch from blockchain
         blockchain_hash = fetch_hash(emp_id)
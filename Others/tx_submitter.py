@@ -0,0 +1,281 @@
+import os
+import threading
+from concurrent.futures import Future
+from time import time, sleep
+from dotenv import load_dotenv
+from web3.exceptions import TransactionNotFound
+
+load_dotenv()
+
+# How many transactions may be in flight (sent, not yet mined) at once
+TX_MAX_IN_FLIGHT = int(os.getenv("TX_MAX_IN_FLIGHT", 32))
+# One poller checks every pending transaction at this interval
+TX_POLL_INTERVAL = float(os.getenv("TX_POLL_INTERVAL", 2))
+# A transaction with no receipt after this many seconds is replaced with higher fees
+TX_STUCK_AFTER = float(os.getenv("TX_STUCK_AFTER", 90))
+# Replacement fee bump (nodes require at least +10%)
+TX_FEE_BUMP_PERCENT = int(os.getenv("TX_FEE_BUMP_PERCENT", 15))
+# Give up on a transaction after this many replacements
+TX_MAX_REPLACEMENTS = int(os.getenv("TX_MAX_REPLACEMENTS", 5))
+
+
+class _PendingTx:
+    """One nonce slot; may be sent several times with bumped fees"""
+
+    def __init__(self, nonce, txn, future, filler=False):
+        self.nonce = nonce
+        self.txn = txn
+        self.future = future
+        # A 0-value self-transfer sent to close the nonce of an abandoned transaction
+        self.filler = filler
+        self.tx_hashes = []
+        self.sent_at = time()
+        self.replacements = 0
+
+
+class TransactionSubmitter:
+    """Owns the signing account and keeps many transactions in flight
+
+    Nonces are allocated locally (one RPC to seed the counter), so concurrent
+    callers never race on `get_transaction_count`. A single poller thread
+    tracks receipts for every pending transaction and replaces stuck ones
+    with a fee bump; one still stuck after `max_replacements` is failed and
+    its nonce filled with a 0-value self-transfer, so later transactions do
+    not queue behind the gap. `submit()` returns a Future that resolves to
+    the receipt (check its status - a reverted transaction is mined too).
+    """
+
+    def __init__(self, w3, account_address, private_key, chain_id,
+                 gas=200000, max_in_flight=TX_MAX_IN_FLIGHT, poll_interval=TX_POLL_INTERVAL,
+                 stuck_after=TX_STUCK_AFTER, fee_bump_percent=TX_FEE_BUMP_PERCENT,
+                 max_replacements=TX_MAX_REPLACEMENTS, gas_oracle=None):
+        self.w3 = w3
+        self.account_address = account_address
+        self.private_key = private_key
+        self.chain_id = chain_id
+        self.gas = gas
+        self.poll_interval = poll_interval
+        self.stuck_after = stuck_after
+        self.fee_bump_percent = fee_bump_percent
+        self.max_replacements = max_replacements
+        # Optional GasOracle: cached EIP-1559 fees and per-method gas estimates
+        self.gas_oracle = gas_oracle
+
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._nonce_lock = threading.Lock()
+        self._next_nonce = None
+        self._pending_lock = threading.Lock()
+        self._pending = {}
+        self._poller = None
+        self._running = False
+
+        # Updated from submit() callers and the poller thread alike
+        self._stats_lock = threading.Lock()
+        self._counts = {"submitted": 0, "confirmed": 0, "failed": 0, "replaced": 0}
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._counts[key] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self._counts)
+
+    # ---- nonce management ----
+
+    def _allocate_nonce(self) -> int:
+        with self._nonce_lock:
+            if self._next_nonce is None:
+                self._next_nonce = self.w3.eth.get_transaction_count(self.account_address, 'pending')
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def _resync_nonce(self):
+        """Re-seed the local counter from the node after a failed send"""
+        with self._nonce_lock:
+            self._next_nonce = None
+
+    # ---- fees ----
+
+    FEE_KEYS = ('gasPrice', 'maxFeePerGas', 'maxPriorityFeePerGas')
+
+    def _fee_params(self) -> dict:
+        if self.gas_oracle is not None:
+            return self.gas_oracle.fee_params()
+        return {'gasPrice': self.w3.eth.gas_price}
+
+    def _gas_limit(self, contract_function) -> int:
+        if self.gas_oracle is not None:
+            try:
+                return self.gas_oracle.gas_limit(contract_function)
+            except Exception as e:
+                print(f"⚠️ Gas estimate failed, using default {self.gas}: {e}")
+        return self.gas
+
+    def _bumped_fee_params(self, txn) -> dict:
+        bump = 100 + self.fee_bump_percent
+        current = self._fee_params()
+        return {key: max(current[key], txn.get(key, 0) * bump // 100) for key in current}
+
+    def _replace_fees(self, txn) -> dict:
+        bumped = self._bumped_fee_params(txn)
+        return {**{k: v for k, v in txn.items() if k not in self.FEE_KEYS}, **bumped}
+
+    # ---- submission ----
+
+    def submit(self, contract_function, gas=None) -> Future:
+        """Sign and send a contract call without waiting for it to be mined"""
+        self._ensure_poller()
+        self._slots.acquire()
+        future = Future()
+        try:
+            nonce = self._allocate_nonce()
+            txn = contract_function.build_transaction({
+                'chainId': self.chain_id,
+                'gas': gas or self._gas_limit(contract_function),
+                'nonce': nonce,
+                **self._fee_params(),
+            })
+            pending = _PendingTx(nonce, txn, future)
+            self._send(pending)
+            # Lets callers persist the hash before it is mined; set
+            # future.on_replaced to be handed every hash after a fee bump
+            future.tx_hash = pending.tx_hashes[0].hex()
+            future.on_replaced = None
+        except Exception as e:
+            self._slots.release()
+            self._resync_nonce()
+            self._count("failed")
+            future.set_exception(e)
+            return future
+
+        with self._pending_lock:
+            self._pending[nonce] = pending
+        self._count("submitted")
+        return future
+
+    def _send(self, pending):
+        signed_txn = self.w3.eth.account.sign_transaction(pending.txn, private_key=self.private_key)
+        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+        pending.tx_hashes.append(tx_hash)
+        pending.sent_at = time()
+
+    def in_flight(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    # ---- receipt tracking ----
+
+    def _ensure_poller(self):
+        if self._poller and self._poller.is_alive():
+            return
+        self._running = True
+        self._poller = threading.Thread(target=self._poll_loop, name="tx-receipt-poller", daemon=True)
+        self._poller.start()
+
+    def stop(self):
+        self._running = False
+        if self._poller:
+            self._poller.join(timeout=self.poll_interval + 5)
+
+    def _poll_loop(self):
+        while self._running:
+            with self._pending_lock:
+                pending = list(self._pending.values())
+            for tx in pending:
+                try:
+                    self._check(tx)
+                except Exception as e:
+                    print(f"⚠️ Receipt check failed for nonce {tx.nonce}: {e}")
+            sleep(self.poll_interval)
+
+    def _check(self, tx):
+        # Any of the replacement hashes for this nonce may be the one that got mined
+        for tx_hash in reversed(tx.tx_hashes):
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            if receipt is not None:
+                self._finish(tx, receipt=receipt)
+                return
+
+        if time() - tx.sent_at < self.stuck_after:
+            return
+
+        if tx.replacements >= self.max_replacements:
+            self._finish(tx, error=TimeoutError(
+                f"Transaction with nonce {tx.nonce} not mined after {tx.replacements} replacements"
+            ))
+            if tx.filler:
+                # Even the filler is stuck: re-seed from the node and let it sort out the gap
+                self._resync_nonce()
+            else:
+                self._fill_nonce(tx)
+            return
+
+        # Same nonce, higher fees
+        tx.txn = self._replace_fees(tx.txn)
+        tx.replacements += 1
+        try:
+            self._send(tx)
+            self._count("replaced")
+            print(f"⛽ Replaced stuck tx nonce {tx.nonce} (attempt {tx.replacements})")
+            self._notify_replaced(tx)
+        except Exception as e:
+            # "nonce too low" means an earlier attempt was mined; the next poll finds its receipt
+            print(f"⚠️ Replacement for nonce {tx.nonce} rejected: {e}")
+            tx.sent_at = time()
+
+    @staticmethod
+    def _notify_replaced(tx):
+        on_replaced = getattr(tx.future, "on_replaced", None)
+        if on_replaced is None:
+            return
+        try:
+            on_replaced([tx_hash.hex() for tx_hash in tx.tx_hashes])
+        except Exception as e:
+            print(f"⚠️ on_replaced callback failed for nonce {tx.nonce}: {e}")
+
+    def _fill_nonce(self, tx):
+        """Close an abandoned transaction's nonce so later ones are not stuck behind the gap
+
+        Sends a 0-value transfer to our own address with the same nonce and
+        bumped fees, which replaces the abandoned transaction in the mempool.
+        If that cannot be sent, the local counter is re-seeded from the node.
+        """
+        txn = {
+            'chainId': tx.txn['chainId'],
+            'nonce': tx.nonce,
+            'to': self.account_address,
+            'value': 0,
+            'gas': 21000,
+            **self._bumped_fee_params(tx.txn),
+        }
+        filler = _PendingTx(tx.nonce, txn, Future(), filler=True)
+        try:
+            self._send(filler)
+        except Exception as e:
+            # e.g. "nonce too low": the abandoned transaction was mined after all
+            print(f"⚠️ Could not fill nonce {tx.nonce}: {e}")
+            self._resync_nonce()
+            return
+        with self._pending_lock:
+            self._pending[tx.nonce] = filler
+        print(f"🧹 Abandoned tx nonce {tx.nonce}; sent a 0-value self-transfer to free it")
+
+    def _finish(self, tx, receipt=None, error=None):
+        with self._pending_lock:
+            if self._pending.pop(tx.nonce, None) is None:
+                return
+        if tx.filler:
+            # Holds no submit() slot and no caller waits on it
+            return
+        self._slots.release()
+        if error is not None:
+            self._count("failed")
+            tx.future.set_exception(error)
+        else:
+            self._count("confirmed")
+            tx.future.set_result(receipt)
@@ -0,0 +1,403 @@
+"""Pipelined verification: DB fetch -> hash -> chain lookup -> compare
+
+Each stage runs in its own worker(s), connected by bounded queues, so a
+slow chain lookup overlaps with the next page being read and hashed:
+
+    fetch (keyset pages)  ->  hash (process pool)  ->  lookup (N threads)  ->  compare/alert
+
+    python -m Others.verification_engine --hash-workers 4 --lookup-workers 8
+    python -m Others.verification_engine --after-id 5000 --limit 10000 --json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from time import time
+from dotenv import load_dotenv
+
+from Others import record_hash
+
+load_dotenv()
+
+VERIFY_FETCH_BATCH = int(os.getenv("VERIFY_FETCH_BATCH", 1000))
+# 0 hashes inline in the hash stage thread (cheaper than a pool for small runs)
+VERIFY_HASH_WORKERS = int(os.getenv("VERIFY_HASH_WORKERS", 0))
+VERIFY_LOOKUP_WORKERS = int(os.getenv("VERIFY_LOOKUP_WORKERS", 4))
+# Max batches waiting between two stages
+VERIFY_QUEUE_DEPTH = int(os.getenv("VERIFY_QUEUE_DEPTH", 4))
+
+NOT_ANCHORED = "0" * 64
+
+_DONE = object()
+
+
+def hash_rows(rows):
+    """[(id, computed_hash)] for secure_db rows; top level so the process pool can pickle it"""
+    return record_hash.hash_rows(rows)
+
+
+def build_result(row, computed_hash, blockchain_hash) -> dict:
+    """Verification result for a secure_db row (id, name, role, salary, record_hash, created_at[, hash_version])"""
+    emp_id, name, role, salary, stored_hash, created_at = row[:6]
+    return {
+        "id": emp_id,
+        "name": name,
+        "role": role,
+        "salary": salary,
+        "is_tampered": not (stored_hash == computed_hash == blockchain_hash),
+        "stored_hash": stored_hash,
+        "computed_hash": computed_hash,
+        "blockchain_hash": blockchain_hash,
+        "created_at": created_at,
+    }
+
+
+def classify(result) -> str:
+    """Outcome name: tampered (anchored and mismatched), not_anchored or verified"""
+    if result["blockchain_hash"] == NOT_ANCHORED:
+        return "not_anchored"
+    return "tampered" if result["is_tampered"] else "verified"
+
+
+def chain_lookup(conn, employee_ids, source="rpc") -> dict:
+    """Chain hash per ID from confirmed Merkle proofs, then the HashAdded index or RPC"""
+    from Others.merkle_anchor import fetch_merkle_anchored_hashes
+    from Others.event_indexer import fetch_indexed_hashes
+
+    cursor = conn.cursor()
+    try:
+        hashes = fetch_merkle_anchored_hashes(cursor, employee_ids)
+    except Exception:
+        conn.rollback()
+        hashes = {}
+    remaining = [employee_id for employee_id in employee_ids if employee_id not in hashes]
+
+    if remaining and source == "index":
+        indexed = fetch_indexed_hashes(cursor, remaining)
+        for employee_id in remaining:
+            hashes[employee_id] = indexed.get(employee_id, NOT_ANCHORED)
+    elif remaining:
+        from Others.blockchain_client import fetch_hashes
+        hashes.update(fetch_hashes(remaining))
+    cursor.close()
+    conn.rollback()
+    return hashes
+
+
+class StageStats:
+    """Items/batches through one stage and the time its workers spent busy"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.batches = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items, elapsed):
+        with self._lock:
+            self.items += items
+            self.batches += 1
+            self.busy += elapsed
+
+    def as_dict(self, wall) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "items": self.items,
+                "batches": self.batches,
+                "busy_seconds": round(self.busy, 3),
+                # Per-worker rate while busy, and what the stage delivered over the run
+                "items_per_busy_second": round(self.items / self.busy, 1) if self.busy else None,
+                "items_per_second": round(self.items / wall, 1) if wall else None,
+            }
+
+
+class VerificationEngine:
+    """Verifies secure_db in pipelined stages with bounded queues
+
+    `get_connection` returns a psycopg2 connection (the fetcher and every
+    lookup worker hold their own). `lookup(conn, ids)` returns the chain
+    hash per ID; `on_result` is called for every verified record,
+    `on_tampered` for anchored records whose hashes disagree and
+    `on_batch` with each batch's results, all from the single compare thread.
+    """
+
+    def __init__(self, get_connection, lookup=chain_lookup, fetch_batch=VERIFY_FETCH_BATCH,
+                 hash_workers=VERIFY_HASH_WORKERS, lookup_workers=VERIFY_LOOKUP_WORKERS,
+                 queue_depth=VERIFY_QUEUE_DEPTH, on_result=None, on_tampered=None, on_batch=None):
+        self.get_connection = get_connection
+        self.lookup = lookup
+        self.fetch_batch = fetch_batch
+        self.hash_workers = hash_workers
+        self.lookup_workers = max(1, lookup_workers)
+        self.queue_depth = queue_depth
+        self.on_result = on_result
+        self.on_tampered = on_tampered
+        self.on_batch = on_batch
+        self._stop = threading.Event()
+        self._errors = []
+
+    # ---- stages ----
+
+    def _fetch(self, out, after_id, limit, stats, order):
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            last_id, fetched = after_id, 0
+            while not self._stop.is_set():
+                page = self.fetch_batch if limit is None else min(self.fetch_batch, limit - fetched)
+                if page <= 0:
+                    break
+                started = time()
+                cursor.execute("""
+                    SELECT id, name, role, salary, record_hash, created_at, hash_version
+                    FROM secure_db WHERE id > %s ORDER BY id LIMIT %s;
+                """, (last_id, page))
+                rows = cursor.fetchall()
+                conn.rollback()
+                if not rows:
+                    break
+                stats.record(len(rows), time() - started)
+                last_id = rows[-1][0]
+                order.append(last_id)
+                # Batches are keyed by their last ID so the compare stage can track a resume point
+                self._put(out, (last_id, rows))
+                fetched += len(rows)
+                if len(rows) < page:
+                    break
+            cursor.close()
+        finally:
+            conn.close()
+
+    def _hash(self, inbox, out, stats):
+        pool = None
+        if self.hash_workers > 0:
+            pool = ProcessPoolExecutor(self.hash_workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+                batch_id, rows = item
+                started = time()
+                # Rows without a hash or timestamp yet are not verifiable
+                rows = [row for row in rows if row[4] and row[5]]
+                if pool:
+                    # Split the page so every process gets a share
+                    size = max(1, -(-len(rows) // self.hash_workers))
+                    chunks = [rows[i:i + size] for i in range(0, len(rows), size)]
+                    computed = dict(pair for chunk in pool.map(hash_rows, chunks) for pair in chunk)
+                else:
+                    computed = dict(hash_rows(rows))
+                stats.record(len(rows), time() - started)
+                self._put(out, (batch_id, rows, computed))
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    def _lookup(self, inbox, out, stats):
+        conn = self.get_connection()
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+                batch_id, rows, computed = item
+                started = time()
+                chain_hashes = self.lookup(conn, [row[0] for row in rows]) if rows else {}
+                stats.record(len(rows), time() - started)
+                self._put(out, (batch_id, rows, computed, chain_hashes))
+        finally:
+            conn.close()
+
+    def _compare(self, inbox, stats, counts, completed):
+        while True:
+            item = self._get(inbox)
+            if item is _DONE:
+                break
+            batch_id, rows, computed, chain_hashes = item
+            started = time()
+            results = []
+            for row in rows:
+                result = build_result(row, computed[row[0]], chain_hashes.get(row[0], NOT_ANCHORED))
+                outcome = classify(result)
+                counts[outcome] += 1
+                if outcome == "tampered" and self.on_tampered:
+                    self.on_tampered(result)
+                results.append(result)
+                if self.on_result:
+                    self.on_result(result)
+            if self.on_batch and results:
+                self.on_batch(results)
+            completed.add(batch_id)
+            stats.record(len(rows), time() - started)
+
+    # ---- plumbing ----
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q):
+        while True:
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _DONE
+
+    def _run_stage(self, target, downstream, downstream_count, *args):
+        """Run a stage; on exit (or error) pass one _DONE per downstream worker"""
+        try:
+            target(*args)
+        except Exception as e:
+            print(f"❌ Verification stage {target.__name__.lstrip('_')} failed: {e}")
+            self._errors.append(f"{target.__name__.lstrip('_')}: {e}")
+            self._stop.set()
+        finally:
+            if downstream is not None:
+                for _ in range(downstream_count):
+                    self._put(downstream, _DONE)
+
+    def run(self, after_id=0, limit=None) -> dict:
+        """Verify records with id > after_id (at most `limit`); returns counts and stage stats"""
+        self._stop.clear()
+        self._errors = []
+        depth = max(1, self.queue_depth)
+        fetched, hashed, looked_up = queue.Queue(depth), queue.Queue(depth), queue.Queue(depth)
+        stats = {
+            "fetch": StageStats("fetch", 1),
+            "hash": StageStats("hash", max(1, self.hash_workers)),
+            "lookup": StageStats("lookup", self.lookup_workers),
+            "compare": StageStats("compare", 1),
+        }
+        counts = {"verified": 0, "tampered": 0, "not_anchored": 0}
+        order, completed = [], set()
+        started = time()
+
+        lookup_done = threading.Semaphore(0)
+
+        def lookup_worker():
+            try:
+                self._run_stage(self._lookup, None, 0, hashed, looked_up, stats["lookup"])
+            finally:
+                lookup_done.release()
+
+        def lookup_closer():
+            # compare only stops once every lookup worker has drained
+            for _ in range(self.lookup_workers):
+                lookup_done.acquire()
+            self._put(looked_up, _DONE)
+
+        threads = [
+            threading.Thread(target=self._run_stage, name="verify-fetch",
+                             args=(self._fetch, fetched, 1, fetched, after_id, limit, stats["fetch"], order)),
+            threading.Thread(target=self._run_stage, name="verify-hash",
+                             args=(self._hash, hashed, self.lookup_workers, fetched, hashed, stats["hash"])),
+            *(threading.Thread(target=lookup_worker, name=f"verify-lookup-{i}") for i in range(self.lookup_workers)),
+            threading.Thread(target=lookup_closer, name="verify-lookup-closer"),
+            threading.Thread(target=self._run_stage, name="verify-compare",
+                             args=(self._compare, None, 0, looked_up, stats["compare"], counts, completed)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Lookup workers finish out of order: resume after the last batch
+        # with every earlier batch compared, so an aborted run skips nothing
+        last_id = after_id
+        for batch_id in order:
+            if batch_id not in completed:
+                break
+            last_id = batch_id
+
+        wall = time() - started
+        scanned = stats["fetch"].items
+        return {
+            "after_id": after_id,
+            "last_id": last_id,
+            "scanned": scanned,
+            **counts,
+            "skipped": scanned - sum(counts.values()) if not self._errors else None,
+            "complete": not self._errors,
+            "errors": self._errors,
+            "elapsed_seconds": round(wall, 3),
+            "records_per_second": round(stats["compare"].items / wall, 1) if wall else None,
+            "config": {
+                "fetch_batch": self.fetch_batch,
+                "hash_workers": self.hash_workers,
+                "lookup_workers": self.lookup_workers,
+                "queue_depth": self.queue_depth,
+            },
+            "stages": {name: stage.as_dict(wall) for name, stage in stats.items()},
+        }
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    from Others.db_connection import connect
+
+    parser = argparse.ArgumentParser(description="Verify secure_db against the chain with a pipelined engine")
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this employee ID")
+    parser.add_argument("--limit", type=int, default=None, help="max records to verify")
+    parser.add_argument("--fetch-batch", type=int, default=VERIFY_FETCH_BATCH)
+    parser.add_argument("--hash-workers", type=int, default=VERIFY_HASH_WORKERS, help="processes (0 = inline)")
+    parser.add_argument("--lookup-workers", type=int, default=VERIFY_LOOKUP_WORKERS)
+    parser.add_argument("--queue-depth", type=int, default=VERIFY_QUEUE_DEPTH)
+    parser.add_argument("--source", choices=["rpc", "index"], default=os.getenv("CHAIN_HASH_SOURCE", "rpc").lower(),
+                        help="where chain hashes come from when not Merkle-proven")
+    parser.add_argument("--alert", action="store_true", help="send tamper alerts (ALERT_SINKS) as digests")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    dispatcher = None
+    if args.alert:
+        from Others.alert_dispatcher import AlertDispatcher
+        dispatcher = AlertDispatcher()
+        dispatcher.start()
+
+    def on_tampered(result):
+        print(f"🚨 Tampered: ID {result['id']} ({result['name']})")
+        if dispatcher:
+            dispatcher.submit(result, "engine")
+
+    engine = VerificationEngine(
+        connect,
+        lookup=lambda conn, ids: chain_lookup(conn, ids, source=args.source),
+        fetch_batch=args.fetch_batch,
+        hash_workers=args.hash_workers,
+        lookup_workers=args.lookup_workers,
+        queue_depth=args.queue_depth,
+        on_tampered=on_tampered,
+    )
+    report = engine.run(after_id=args.after_id, limit=args.limit)
+    if dispatcher:
+        dispatcher.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"✅ Scanned {report['scanned']} records in {report['elapsed_seconds']}s "
+          f"({report['records_per_second']} records/s): {report['verified']} verified, "
+          f"{report['tampered']} tampered, {report['not_anchored']} not anchored")
+    for name, stage in report["stages"].items():
+        print(f"   {name:<8} workers={stage['workers']:<3} items={stage['items']:<8} "
+              f"busy={stage['busy_seconds']}s rate={stage['items_per_busy_second']}/s")
+    if not report["complete"]:
+        print(f"⚠️ Stopped early ({'; '.join(report['errors'])}); resume with --after-id {report['last_id']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Persisted verification outcomes (Database/verification_result.sql)
+
+Verification paths hand their results to `store_results`; the table's
+triggers maintain verification_summary, which `dashboard_stats` reads.
+"""
+from datetime import datetime
+from time import time
+from psycopg2.extras import execute_values
+
+from Others.verification_engine import classify
+
+
+def _has_chain_index(cursor) -> bool:
+    cursor.execute("SELECT to_regclass('chain_anchor_latest') IS NOT NULL;")
+    return cursor.fetchone()[0]
+
+
+def store_results(cursor, results, source):
+    """Upsert the latest outcome per record (`source` names the verification path)
+
+    Rows deleted from secure_db in the meantime are skipped. The block
+    number comes from the HashAdded index when it is installed and agrees
+    with the chain hash that was compared.
+    """
+    if not results:
+        return
+    now = datetime.now()
+    values = [
+        (result["id"], classify(result), result["stored_hash"], result["computed_hash"],
+         result["blockchain_hash"], source, now)
+        for result in results
+    ]
+    block_join, block_column = "", "NULL::BIGINT"
+    if _has_chain_index(cursor):
+        block_join = """
+            LEFT JOIN chain_anchor_latest a
+              ON a.employee_id = v.employee_id AND a.record_hash = v.blockchain_hash"""
+        block_column = "a.block_number"
+
+    execute_values(cursor, f"""
+        INSERT INTO verification_result
+            (employee_id, status, stored_hash, computed_hash, blockchain_hash, block_number, source, verified_at)
+        SELECT v.employee_id, v.status, v.stored_hash, v.computed_hash, v.blockchain_hash,
+               {block_column}, v.source, v.verified_at
+        FROM (VALUES %s) AS v (employee_id, status, stored_hash, computed_hash, blockchain_hash, source, verified_at)
+        JOIN secure_db s ON s.id = v.employee_id{block_join}
+        ON CONFLICT (employee_id) DO UPDATE
+        SET status = EXCLUDED.status,
+            stored_hash = EXCLUDED.stored_hash,
+            computed_hash = EXCLUDED.computed_hash,
+            blockchain_hash = EXCLUDED.blockchain_hash,
+            block_number = EXCLUDED.block_number,
+            source = EXCLUDED.source,
+            verified_at = EXCLUDED.verified_at;
+    """, values, template="(%s::int, %s, %s, %s, %s, %s, %s::timestamp)", page_size=1000)
+
+
+def record_full_pass(cursor, started_at, records):
+    """Mark a completed whole-table pass; `started_at` is a time() timestamp"""
+    cursor.execute("""
+        UPDATE verification_summary
+        SET last_full_pass_at = %s, last_full_pass_seconds = %s, last_full_pass_records = %s
+        WHERE id = 1;
+    """, (datetime.now(), round(time() - started_at, 3), records))
+
+
+def dashboard_stats(cursor, recent_tampered=20) -> dict:
+    """Aggregates from verification_summary, plus the latest tampered records"""
+    cursor.execute("""
+        SELECT verified, tampered, not_anchored, last_verified_at,
+               last_full_pass_at, last_full_pass_seconds, last_full_pass_records
+        FROM verification_summary WHERE id = 1;
+    """)
+    row = cursor.fetchone() or (0, 0, 0, None, None, None, None)
+    verified, tampered, not_anchored = row[0], row[1], row[2]
+
+    # Planner estimate: exact COUNT(*) would be a full scan on every dashboard load
+    cursor.execute("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = 'secure_db'::regclass;")
+    total_records = max(cursor.fetchone()[0], verified + tampered + not_anchored)
+
+    cursor.execute("""
+        SELECT r.employee_id, s.name, s.role, r.stored_hash, r.computed_hash, r.blockchain_hash, r.verified_at
+        FROM verification_result r
+        JOIN secure_db s ON s.id = r.employee_id
+        WHERE r.status = 'tampered'
+        ORDER BY r.verified_at DESC
+        LIMIT %s;
+    """, (recent_tampered,))
+    tampered_records = [
+        {"id": r[0], "name": r[1], "role": r[2], "stored_hash": r[3], "computed_hash": r[4],
+         "blockchain_hash": r[5], "verified_at": r[6]}
+        for r in cursor.fetchall()
+    ]
+
+    return {
+        "total_records": total_records,
+        "verified": verified,
+        "tampered": tampered,
+        "not_anchored": not_anchored,
+        "unverified": max(total_records - verified - tampered - not_anchored, 0),
+        "last_verified_at": row[3],
+        "last_full_pass_at": row[4],
+        "last_full_pass_seconds": row[5],
+        "last_full_pass_records": row[6],
+        "recent_tampered": tampered_records,
+    }
@@ -1,27 +1,71 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Optional
-import psycopg2
-import hashlib
+from typing import Optional
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 import sys
 import io
-import csv
 from fpdf import FPDF
 import asyncio
+import base64
+import json
+import zlib
 from functools import lru_cache
 from time import time
 
 sys.path.append('..')
-from Others.blockchain_client import push_hash, fetch_hash, w3
-from Others.email_notifier import send_tampering_alert
+from Others.blockchain_client import submit_hash, submit_hashes, SUPPORTS_PACKED_ANCHORS, submitter, gas_oracle, w3, contract, EVENT_ONLY_CONTRACT, fetch_hashes
+from Others.async_blockchain_client import fetch_hashes_async, close_async_client
+from Others.alert_dispatcher import AlertDispatcher
+from Others.db_connection import connect
+from Others.db_pool import ConnectionPool
+from Others import async_db, bulk_ingest
+from Others.merkle_anchor import MerkleBatcher, fetch_merkle_anchored_hashes
+from Others.event_indexer import EventIndexer, fetch_indexed_hashes
+from Others.anchor_worker import outbox_stats, recent_outbox_transactions, OUTBOX_PACK_SIZE
+from Others.hash_cache import HashCache
+from Others.change_verifier import ChangeVerifier
+from Others import db_verification
+from Others.epoch_anchor import EpochAnchorer, verify_epoch, list_epochs, get_epoch
+from Others.verification_store import store_results, record_full_pass, dashboard_stats
+from Others.record_hash import hash_record, hash_rows, RECORD_HASH_VERSION
+from Others.sampling_audit import sample_audit, SAMPLE_CONFIDENCE, SAMPLE_MAX_TAMPER_RATE, METHODS as SAMPLING_METHODS
+from Others.verification_engine import (
+    VerificationEngine, VERIFY_FETCH_BATCH, VERIFY_HASH_WORKERS, VERIFY_LOOKUP_WORKERS,
+)
 
 load_dotenv()
 
+# Anchoring mode: "direct" sends one addHash tx per record,
+# "merkle" batches record hashes and anchors one Merkle root per batch,
+# "outbox" writes to anchor_outbox and leaves sending to Others/anchor_worker.py
+ANCHOR_MODE = os.getenv("ANCHOR_MODE", "direct").lower()
+
+# Where verification reads chain hashes: "rpc" calls the contract,
+# "index" reads the local chain_anchor mirror kept by the HashAdded indexer
+# (always "index" for the event-only contract, which has no getHash)
+CHAIN_HASH_SOURCE = "index" if EVENT_ONLY_CONTRACT else os.getenv("CHAIN_HASH_SOURCE", "rpc").lower()
+RUN_CHAIN_INDEXER = os.getenv("RUN_CHAIN_INDEXER", "false").lower() == "true"
+# Re-verify rows as they change (needs Database/change_journal.sql)
+RUN_CHANGE_VERIFIER = os.getenv("RUN_CHANGE_VERIFIER", "false").lower() == "true"
+# Periodically anchor the secure_db hash-chain head (needs Database/record_chain.sql and a V3 contract)
+RUN_EPOCH_ANCHOR = os.getenv("RUN_EPOCH_ANCHOR", "false").lower() == "true"
+
+# Rows per keyset page for /verify-all/stream (one chain lookup per page)
+VERIFY_STREAM_PAGE_SIZE = int(os.getenv("VERIFY_STREAM_PAGE_SIZE", 500))
+# GET /employees page size (default and cap)
+EMPLOYEES_PAGE_SIZE = int(os.getenv("EMPLOYEES_PAGE_SIZE", 100))
+EMPLOYEES_MAX_PAGE_SIZE = int(os.getenv("EMPLOYEES_MAX_PAGE_SIZE", 1000))
+
+# zlib level for /export/csv?gzip=true (1 = fastest, 9 = smallest)
+CSV_EXPORT_GZIP_LEVEL = int(os.getenv("CSV_EXPORT_GZIP_LEVEL", 6))
+# Last line of an /export/csv body cut short by an error after the 200 was sent
+CSV_EXPORT_ERROR_MARKER = "#EXPORT-INCOMPLETE"
+
 app = FastAPI(title="Blockchain Audit API", version="2.0.0")
 
 app.add_middleware(
@@ -32,39 +76,24 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Process-wide pool: connections (and their TLS sessions to Neon) are reused across requests
+db_pool = ConnectionPool(connect)
+
 def get_db():
-    """Get PostgreSQL connection with timeout - supports Neon cloud DB"""
+    """Borrow a pooled PostgreSQL connection - conn.close() returns it to the pool"""
     try:
-        # Check if we're using Neon (cloud) or local PostgreSQL
-        db_host = os.getenv("DB_HOST", "localhost")
-        is_neon = "neon.tech" in db_host
-        
-        if is_neon:
-            # Neon PostgreSQL requires SSL
-            conn = psycopg2.connect(
-                dbname=os.getenv("DB_NAME", "neondb"),
-                user=os.getenv("DB_USER", "postgres"),
-                password=os.getenv("DB_PASSWORD"),
-                host=db_host,
-                port=os.getenv("DB_PORT", 5432),
-                sslmode='require',
-                connect_timeout=10
-            )
-        else:
-            # Local PostgreSQL
-            conn = psycopg2.connect(
-                dbname=os.getenv("DB_NAME", "audit_logs"),
-                user=os.getenv("DB_USER", "postgres"),
-                password=os.getenv("DB_PASSWORD"),
-                host=db_host,
-                port=os.getenv("DB_PORT", 5432),
-                connect_timeout=5
-            )
-        
-        return conn
+        return db_pool.acquire()
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Database connection failed: {str(e)}")
 
+def db_connection():
+    """FastAPI dependency: a pooled connection for the duration of the request"""
+    conn = get_db()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
 # Models
 class Employee(BaseModel):
     id: int  # User must provide ID
@@ -107,6 +136,97 @@ class TamperRequest(BaseModel):
 # Transaction history
 transaction_history = []
 
+def record_merkle_transaction(batch_id, merkle_root, records, tx_hash):
+    """Add an anchored Merkle batch to the transaction history"""
+    transaction_history.append({
+        "tx_hash": tx_hash,
+        "employee_name": f"Merkle batch #{batch_id} ({len(records)} records)",
+        "employee_id": [employee_id for employee_id, _ in records],
+        "record_hash": merkle_root,
+        "timestamp": datetime.now().isoformat(),
+        "etherscan_link": f"https://sepolia.etherscan.io/tx/{tx_hash}"
+    })
+
+# Tamper alerts: deduplicated per row, sent as digests over one SMTP connection
+alert_dispatcher = AlertDispatcher()
+
+# Bounded cache for chain hash reads (shared across workers with HASH_CACHE_BACKEND=sqlite)
+hash_cache = HashCache()
+
+merkle_batcher = MerkleBatcher(get_db, on_anchored=record_merkle_transaction)
+epoch_anchorer = EpochAnchorer(get_db)
+# Observed HashAdded events invalidate the cached hash for that employee
+chain_indexer = EventIndexer(w3, contract, get_db, on_anchor=lambda employee_id, _: hash_cache.invalidate(employee_id))
+
+@app.on_event("startup")
+def start_anchoring():
+    db_pool.open()
+    gas_oracle.start()
+    alert_dispatcher.start()
+    if ANCHOR_MODE == "merkle":
+        merkle_batcher.start()
+    if RUN_CHAIN_INDEXER:
+        chain_indexer.start()
+    if RUN_CHANGE_VERIFIER:
+        change_verifier.start()
+    if RUN_EPOCH_ANCHOR:
+        epoch_anchorer.start()
+
+@app.on_event("shutdown")
+async def stop_anchoring():
+    if ANCHOR_MODE == "merkle":
+        await run_in_threadpool(merkle_batcher.stop)
+    chain_indexer.stop()
+    change_verifier.stop()
+    epoch_anchorer.stop()
+    await run_in_threadpool(submitter.stop)
+    gas_oracle.stop()
+    await run_in_threadpool(alert_dispatcher.stop)
+    db_pool.close()
+    await async_db.close_pool()
+    await close_async_client()
+
+def persist_verification(conn, results, source):
+    """Write verification outcomes to verification_result on `conn`
+    
+    Best effort: a missing verification_result table must not fail verification.
+    """
+    cursor = conn.cursor()
+    try:
+        store_results(cursor, results, source)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️ Could not persist verification results: {e}")
+    finally:
+        cursor.close()
+
+def save_verification_results(results, source):
+    """persist_verification on a pooled connection (worker threads, async endpoints via the threadpool)"""
+    conn = None
+    try:
+        conn = get_db()
+        persist_verification(conn, results, source)
+    except Exception as e:
+        print(f"⚠️ Could not persist verification results: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+def get_merkle_anchored_hashes(conn, employee_ids) -> dict:
+    """Hashes proven by a confirmed Merkle batch (empty in direct mode)"""
+    if ANCHOR_MODE != "merkle":
+        return {}
+    cursor = conn.cursor()
+    try:
+        return fetch_merkle_anchored_hashes(cursor, employee_ids)
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️ Merkle proof lookup failed: {e}")
+        return {}
+    finally:
+        cursor.close()
+
 @app.get("/")
 def root():
     return {
@@ -115,17 +235,10 @@ def root():
     }
 
 @app.get("/employees/check-duplicate/{name}")
-def check_duplicate_name(name: str):
+async def check_duplicate_name(name: str):
     """Check if employee name already exists"""
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, name, role FROM secure_db WHERE LOWER(name) = LOWER(%s);", (name,))
-        existing = cursor.fetchall()
-        
-        cursor.close()
+        existing = await async_db.find_by_name(name)
         
         if existing:
             return {
@@ -137,58 +250,48 @@ def check_duplicate_name(name: str):
             return {"exists": False, "count": 0, "employees": []}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
 @app.post("/employees", response_model=EmployeeResponse)
 async def create_employee(employee: Employee, background_tasks: BackgroundTasks):
     """Create new employee with manual ID and push hash to blockchain"""
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        # Check if ID already exists
-        cursor.execute("SELECT id FROM secure_db WHERE id = %s;", (employee.id,))
-        if cursor.fetchone():
-            cursor.close()
-            conn.close()
-            raise HTTPException(
-                status_code=409,
-                detail=f"Employee ID {employee.id} already exists. Please choose a different ID."
-            )
-        
-        # Check for duplicate names if not forcing
-        if not employee.force_duplicate:
-            cursor.execute("SELECT id, name FROM secure_db WHERE LOWER(name) = LOWER(%s);", (employee.name,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                cursor.close()
-                conn.close()
+        async with async_db.transaction() as conn:
+            # Check if ID already exists
+            if await async_db.employee_exists(employee.id, conn):
                 raise HTTPException(
                     status_code=409,
-                    detail=f"Employee with name '{employee.name}' already exists (ID: {existing[0]}). Set force_duplicate=true to override."
+                    detail=f"Employee ID {employee.id} already exists. Please choose a different ID."
                 )
+            
+            # Check for duplicate names if not forcing
+            if not employee.force_duplicate:
+                existing = await async_db.find_by_name(employee.name, conn)
+                
+                if existing:
+                    raise HTTPException(
+                        status_code=409,
+                        detail=f"Employee with name '{employee.name}' already exists (ID: {existing[0][0]}). Set force_duplicate=true to override."
+                    )
+            
+            created_at = datetime.now()
+            timestamp = created_at.isoformat()
+            record_hash = hash_record(employee.name, employee.role, employee.salary, created_at, RECORD_HASH_VERSION)
+            
+            result = await async_db.insert_employee(
+                employee.id, employee.name, employee.role, employee.salary, record_hash, created_at,
+                RECORD_HASH_VERSION, conn
+            )
+            employee_id = result[0]
+            
+            # Outbox row commits atomically with the record, so no anchor is lost on a crash
+            if ANCHOR_MODE == "outbox":
+                await async_db.enqueue_anchor(employee_id, record_hash, conn)
         
-        timestamp = datetime.now().isoformat()
-        data_to_hash = f"{employee.name}{employee.role}{employee.salary}{timestamp}".encode('utf-8')
-        record_hash = hashlib.sha256(data_to_hash).hexdigest()
-        
-        cursor.execute("""
-            INSERT INTO secure_db (id, name, role, salary, record_hash, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            RETURNING id, name, role, salary, record_hash, created_at;
-        """, (employee.id, employee.name, employee.role, employee.salary, record_hash, timestamp))
-        
-        result = cursor.fetchone()
-        employee_id = result[0]
-        conn.commit()
-        cursor.close()
-        
-        # Push to blockchain in background
-        background_tasks.add_task(push_hash_to_blockchain, employee_id, employee.name, record_hash, timestamp)
+        # Push to blockchain in background (or queue for the next Merkle batch)
+        if ANCHOR_MODE == "merkle":
+            merkle_batcher.add(employee_id, record_hash)
+        elif ANCHOR_MODE == "direct":
+            background_tasks.add_task(push_hash_to_blockchain, employee_id, employee.name, record_hash, timestamp)
         
         return {
             "id": result[0],
@@ -202,19 +305,62 @@ async def create_employee(employee: Employee, background_tasks: BackgroundTasks)
     except HTTPException:
         raise
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
-def push_hash_to_blockchain(employee_id, employee_name, record_hash, timestamp):
-    """Background task to push hash to blockchain"""
+@app.post("/employees/bulk")
+async def create_employees_bulk(request: Request, background_tasks: BackgroundTasks, force_duplicate: bool = False):
+    """Create many employees from a streamed CSV (text/csv) or NDJSON (application/x-ndjson) body
+
+    Valid rows are inserted in one transaction and anchored as one batch;
+    invalid or conflicting rows are listed in `rejected` by line number.
+    """
+    content_type = request.headers.get("content-type", "text/csv").split(";")[0].strip().lower()
+    fmt = "ndjson" if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl") else "csv"
     try:
-        receipt = push_hash(employee_id, record_hash)
-        tx_hash = receipt['transactionHash'].hex() if receipt else None
+        report = await bulk_ingest.ingest(
+            request.stream(), fmt, force_duplicate=force_duplicate, outbox=ANCHOR_MODE == "outbox",
+            hash_version=RECORD_HASH_VERSION,
+        )
+    except bulk_ingest.BulkTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except bulk_ingest.BulkFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    records = report.pop("records")
+    if records:
+        if ANCHOR_MODE == "merkle":
+            merkle_batcher.add_many((employee_id, record_hash) for employee_id, _, record_hash in records)
+        elif ANCHOR_MODE == "direct":
+            background_tasks.add_task(push_hashes_to_blockchain, records, datetime.now().isoformat())
+    print(f"📥 Bulk insert: {report['inserted']}/{report['received']} rows, {len(report['rejected'])} rejected")
+
+    return {**report, "anchoring": ANCHOR_MODE}
+
+def anchored_tx_hash(future) -> str:
+    """Tx hash of a mined anchoring transaction; raises if it failed or was reverted"""
+    receipt = future.result()
+    tx_hash = receipt['transactionHash'].hex()
+    if receipt['status'] != 1:
+        raise RuntimeError(f"Transaction reverted: {tx_hash}")
+    return tx_hash
+
+def push_hash_to_blockchain(employee_id, employee_name, record_hash, timestamp):
+    """Background task to push hash to blockchain
+    
+    Only sends the transaction; the submitter's receipt poller records the
+    result, so no thread is held while the transaction is mined.
+    """
+    def record_transaction(future):
+        try:
+            tx_hash = anchored_tx_hash(future)
+            print(f"✅ Hash pushed to blockchain for Employee ID {employee_id}. Tx: {tx_hash}")
+        except Exception as e:
+            print(f"Failed to push to blockchain: {e}")
+            tx_hash = None
         
+        hash_cache.invalidate(employee_id)
         transaction_history.append({
             "tx_hash": tx_hash,
             "employee_name": employee_name,
@@ -223,73 +369,121 @@ def push_hash_to_blockchain(employee_id, employee_name, record_hash, timestamp):
             "timestamp": timestamp,
             "etherscan_link": f"https://sepolia.etherscan.io/tx/{tx_hash}" if tx_hash else None
         })
+    
+    try:
+        submit_hash(employee_id, record_hash).add_done_callback(record_transaction)
     except Exception as e:
         print(f"Failed to push to blockchain: {e}")
 
-@app.get("/employees", response_model=List[EmployeeResponse])
-def get_all_employees():
-    """Get all employees - optimized without blockchain calls"""
-    conn = None
+def push_hashes_to_blockchain(records, timestamp):
+    """Background task to anchor a bulk insert: [(employee_id, employee_name, record_hash), ...]
+
+    Packs OUTBOX_PACK_SIZE records per addHashes transaction when the
+    contract supports it, else falls back to one transaction per record.
+    """
+    if not SUPPORTS_PACKED_ANCHORS:
+        for employee_id, employee_name, record_hash in records:
+            push_hash_to_blockchain(employee_id, employee_name, record_hash, timestamp)
+        return
+
+    def record_pack(pack):
+        def record_transaction(future):
+            try:
+                tx_hash = anchored_tx_hash(future)
+                print(f"✅ {len(pack)} hashes pushed to blockchain in one transaction. Tx: {tx_hash}")
+            except Exception as e:
+                print(f"Failed to push to blockchain: {e}")
+                tx_hash = None
+
+            for employee_id, employee_name, record_hash in pack:
+                hash_cache.invalidate(employee_id)
+                transaction_history.append({
+                    "tx_hash": tx_hash,
+                    "employee_name": employee_name,
+                    "employee_id": employee_id,
+                    "record_hash": record_hash,
+                    "timestamp": timestamp,
+                    "etherscan_link": f"https://sepolia.etherscan.io/tx/{tx_hash}" if tx_hash else None
+                })
+        return record_transaction
+
+    for start in range(0, len(records), OUTBOX_PACK_SIZE):
+        pack = records[start:start + OUTBOX_PACK_SIZE]
+        try:
+            submit_hashes([(employee_id, record_hash) for employee_id, _, record_hash in pack]) \
+                .add_done_callback(record_pack(pack))
+        except Exception as e:
+            print(f"Failed to push to blockchain: {e}")
+
+def encode_cursor(sort, row) -> str:
+    """Opaque page cursor: the sort key plus the (sort value, id) of the last row"""
+    column = async_db.LISTING_SORTS[sort][0]
+    value = row[column].isoformat() if column == "created_at" else row[column]
+    return base64.urlsafe_b64encode(json.dumps([sort, value, row["id"]]).encode()).decode()
+
+def decode_cursor(sort, cursor):
+    """(sort value, id) from encode_cursor; 400 if malformed or made for another sort"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, name, role, salary, record_hash, created_at FROM secure_db ORDER BY id;")
-        rows = cursor.fetchall()
-        
-        cursor.close()
-        
-        return [
-            {
-                "id": row[0],
-                "name": row[1],
-                "role": row[2],
-                "salary": row[3],
-                "record_hash": row[4],
-                "created_at": row[5],
-                "tx_hash": None  # Don't fetch tx_hash for list view (performance)
-            }
-            for row in rows
-        ]
+        cursor_sort, value, employee_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort:
+            raise ValueError(f"cursor was issued for sort={cursor_sort}")
+        if async_db.LISTING_SORTS[sort][0] == "created_at":
+            value = datetime.fromisoformat(value)
+        return value, int(employee_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+@app.get("/employees")
+async def get_employees(
+    limit: int = EMPLOYEES_PAGE_SIZE,
+    after_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    fields: Optional[str] = None,
+):
+    """Page through employees in keyset order - cost follows `limit`, not table size
+    
+    Continue with the previous page's `next_cursor` (any sort) or, for the
+    id sort, `after_id`. `fields` is a comma separated projection (id is
+    always included). `total` is read from the maintained row counter.
+    """
+    if sort not in async_db.LISTING_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(async_db.LISTING_SORTS)}")
+    requested = async_db.LISTING_FIELDS
+    if fields:
+        requested = tuple(dict.fromkeys(["id"] + [f.strip() for f in fields.split(",") if f.strip()]))
+        unknown = [f for f in requested if f not in async_db.LISTING_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    by_id = async_db.LISTING_SORTS[sort][0] == "id"
+    if after_id is not None and not by_id:
+        raise HTTPException(status_code=400, detail="after_id only applies to sort=id or -id; pass cursor instead")
+    
+    after = decode_cursor(sort, cursor) if cursor else ((after_id, after_id) if after_id is not None else None)
+    limit = max(1, min(limit, EMPLOYEES_MAX_PAGE_SIZE))
+    try:
+        rows, total = await asyncio.gather(
+            async_db.list_page(sort, after, limit, requested),
+            async_db.total_employees(),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
+    
+    has_more = len(rows) == limit
+    return {
+        "items": [{field: row[field] for field in requested} for row in rows],
+        "total": total,
+        "limit": limit,
+        "sort": sort,
+        "next_cursor": encode_cursor(sort, rows[-1]) if has_more else None,
+        "next_after_id": rows[-1]["id"] if has_more and by_id else None,
+    }
 
 @app.post("/employees/search")
-def search_employees(filters: SearchFilter):
+async def search_employees(filters: SearchFilter):
     """Search and filter employees"""
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        query = "SELECT id, name, role, salary, record_hash, created_at FROM secure_db WHERE 1=1"
-        params = []
-        
-        if filters.name:
-            query += " AND LOWER(name) LIKE LOWER(%s)"
-            params.append(f"%{filters.name}%")
-        
-        if filters.role:
-            query += " AND LOWER(role) LIKE LOWER(%s)"
-            params.append(f"%{filters.role}%")
-        
-        if filters.min_salary:
-            query += " AND CAST(salary AS FLOAT) >= %s"
-            params.append(filters.min_salary)
-        
-        if filters.max_salary:
-            query += " AND CAST(salary AS FLOAT) <= %s"
-            params.append(filters.max_salary)
-        
-        query += " ORDER BY id;"
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
-        cursor.close()
+        rows = await async_db.search_employees(filters.name, filters.role, filters.min_salary, filters.max_salary)
         
         return [
             {
@@ -304,49 +498,25 @@ def search_employees(filters: SearchFilter):
         ]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
 @app.get("/employees/{employee_id}/verify", response_model=VerificationResult)
-async def verify_employee(employee_id: int, background_tasks: BackgroundTasks):
+async def verify_employee(employee_id: int):
     """Verify integrity of a single employee"""
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, name, role, salary, record_hash, created_at 
-            FROM secure_db WHERE id = %s;
-        """, (employee_id,))
-        
-        row = cursor.fetchone()
-        cursor.close()
+        row = await async_db.get_for_verification(employee_id)
         
         if not row:
             raise HTTPException(status_code=404, detail="Employee not found")
         
-        emp_id, name, role, salary, stored_hash, created_at = row
-        combined_data = f"{name}{role}{salary}{created_at.isoformat()}".encode('utf-8')
-        computed_hash = hashlib.sha256(combined_data).hexdigest()
+        emp_id, name, role, salary, stored_hash, created_at = row[:6]
+        computed_hash = hash_rows([row])[0][1]
         
-        # Fetch from blockchain (can be slow, but necessary)
-        try:
-            blockchain_hash = fetch_hash(emp_id)
-        except:
-            blockchain_hash = "0" * 64  # Fallback if blockchain fails
+        # Merkle proof, local chain index or a fresh (uncached) blockchain read
+        blockchain_hash = (await resolve_blockchain_hashes([emp_id], cached=False))[emp_id]
         
         is_tampered = not (stored_hash == computed_hash == blockchain_hash)
         
-        # Send email alert in background
-        if is_tampered:
-            background_tasks.add_task(
-                send_tampering_alert,
-                name, emp_id, stored_hash, computed_hash, blockchain_hash
-            )
-        
-        return {
+        result = {
             "id": emp_id,
             "name": name,
             "role": role,
@@ -357,29 +527,43 @@ async def verify_employee(employee_id: int, background_tasks: BackgroundTasks):
             "blockchain_hash": blockchain_hash,
             "created_at": created_at
         }
+        
+        # Email alert goes through the dispatcher (deduplicated, batched)
+        if is_tampered:
+            alert_dispatcher.submit(result, "single")
+        
+        await run_in_threadpool(save_verification_results, [result], "single")
+        return result
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
-@app.get("/dashboard-quick")
-def get_dashboard_quick():
-    """Fast dashboard - just shows database records without blockchain verification"""
-    conn = None
+@app.get("/dashboard-stats")
+def get_dashboard_stats(conn=Depends(db_connection)):
+    """Integrity counts from persisted verification results - no hashing or chain calls"""
     try:
-        conn = get_db()
         cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM secure_db;")
-        total_records = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT id, name, role, salary, created_at FROM secure_db ORDER BY created_at DESC LIMIT 20;")
-        records = cursor.fetchall()
-        
+        stats = dashboard_stats(cursor)
         cursor.close()
+        return stats
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/db/pool")
+def get_db_pool_stats():
+    """Connection pool metrics: size, in use, waiting, acquire latency, closes by reason
+    
+    `async` is the asyncpg pool behind the request endpoints.
+    """
+    return {**db_pool.stats(), "async": async_db.pool_stats()}
+
+@app.get("/dashboard-quick")
+async def get_dashboard_quick():
+    """Fast dashboard - just shows database records without blockchain verification"""
+    try:
+        total_records = await async_db.count_employees()
+        records = await async_db.recent_employees(20)
         
         return {
             "total_records": total_records,
@@ -396,51 +580,118 @@ def get_dashboard_quick():
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
-# Add cache for blockchain hashes (TTL: 5 minutes)
-blockchain_cache = {}
-CACHE_TTL = 300  # 5 minutes
+async def fetch_hashes_cached(employee_ids) -> dict:
+    """Fetch many hashes, going to the blockchain in bulk only for cache misses"""
+    hashes, missing = hash_cache.get_many(employee_ids)
+    
+    if missing:
+        fetched = await fetch_hashes_async(missing)
+        # Failed lookups are absent from `fetched` and are not cached
+        hash_cache.put_many(fetched)
+        for employee_id in missing:
+            hashes[employee_id] = fetched.get(employee_id, "0" * 64)
+    
+    return hashes
 
-def fetch_hash_cached(employee_id: int) -> str:
-    """Fetch hash from blockchain with caching"""
-    current_time = time()
-    cache_key = f"hash_{employee_id}"
+def resolve_local_hashes(conn, employee_ids):
+    """Chain hashes answerable from Postgres (Merkle proofs, chain index)
     
-    # Check cache
-    if cache_key in blockchain_cache:
-        cached_data, cached_time = blockchain_cache[cache_key]
-        if current_time - cached_time < CACHE_TTL:
-            return cached_data
+    Returns (hashes, remaining_ids) where remaining IDs need an RPC read.
+    """
+    hashes = get_merkle_anchored_hashes(conn, employee_ids)
+    remaining = [employee_id for employee_id in employee_ids if employee_id not in hashes]
     
-    # Fetch from blockchain
-    try:
-        hash_value = fetch_hash(employee_id)
-        blockchain_cache[cache_key] = (hash_value, current_time)
-        return hash_value
-    except Exception as e:
-        print(f"❌ Error fetching hash for ID {employee_id}: {e}")
-        return "0" * 64
+    if remaining and CHAIN_HASH_SOURCE == "index":
+        cursor = conn.cursor()
+        try:
+            indexed = fetch_indexed_hashes(cursor, remaining)
+            for employee_id in remaining:
+                hashes[employee_id] = indexed.get(employee_id, "0" * 64)
+            remaining = []
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️ Chain index lookup failed, falling back to RPC: {e}")
+        finally:
+            cursor.close()
+    
+    return hashes, remaining
+
+def resolve_local_hashes_pooled(employee_ids):
+    """resolve_local_hashes on a pooled connection, borrowed only if a local source is enabled"""
+    if ANCHOR_MODE != "merkle" and CHAIN_HASH_SOURCE != "index":
+        return {}, list(employee_ids)
+    with db_pool.connection() as conn:
+        return resolve_local_hashes(conn, employee_ids)
+
+async def resolve_blockchain_hashes(employee_ids, cached=True) -> dict:
+    """Chain hash for every ID: Merkle proof first, then the local index or async RPC
+    
+    IDs with nothing anchored map to "0" * 64.
+    """
+    hashes, remaining = await run_in_threadpool(resolve_local_hashes_pooled, employee_ids)
+    if not remaining:
+        return hashes
+    
+    if cached:
+        hashes.update(await fetch_hashes_cached(remaining))
+    else:
+        fetched = await fetch_hashes_async(remaining)
+        for employee_id in remaining:
+            hashes[employee_id] = fetched.get(employee_id, "0" * 64)
+    return hashes
+
+def resolve_blockchain_hashes_sync(conn, employee_ids) -> dict:
+    """Blocking resolve_blockchain_hashes for worker threads (verification engine)"""
+    hashes, remaining = resolve_local_hashes(conn, employee_ids)
+    if remaining:
+        cached, missing = hash_cache.get_many(remaining)
+        hashes.update(cached)
+        if missing:
+            # fetch_hashes reports RPC errors as "0" * 64, so its results are not cached
+            hashes.update(fetch_hashes(missing))
+    return hashes
+
+def verify_row(row, blockchain_hash):
+    """Verification result for a secure_db row, or None if it has no hash yet"""
+    emp_id, name, role, salary, stored_hash, created_at = row[:6]
+    if not stored_hash or not created_at:
+        return None
+    
+    # Hashed under the row's own hash_version
+    computed_hash = hash_rows([row])[0][1]
+    
+    return {
+        "id": emp_id,
+        "name": name,
+        "role": role,
+        "salary": salary,
+        "is_tampered": not (stored_hash == computed_hash == blockchain_hash),
+        "stored_hash": stored_hash,
+        "computed_hash": computed_hash,
+        "blockchain_hash": blockchain_hash,
+        "created_at": created_at
+    }
+
+def alert_if_tampered(result, source=None) -> bool:
+    """Queue an alert for a tampered, anchored record; True if it counts as tampered"""
+    if not result["is_tampered"] or result["blockchain_hash"] == "0" * 64:
+        return False
+    alert_dispatcher.submit(result, source)
+    return True
 
 @app.get("/verify-all")
-async def verify_all_employees(background_tasks: BackgroundTasks, limit: int = 10):
-    """Verify employees - limit to prevent timeout"""
-    conn = None
+async def verify_all_employees(limit: int = 10):
+    """Verify employees - limit to prevent timeout (use /verify-all/stream for the full table)"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
         # Get total count first
-        cursor.execute("SELECT COUNT(*) FROM secure_db;")
-        total_in_db = cursor.fetchone()[0]
+        total_in_db = await async_db.count_employees()
         
         # Only verify limited records
-        cursor.execute(f"SELECT id, name, role, salary, record_hash, created_at FROM secure_db ORDER BY id LIMIT {limit};")
-        rows = cursor.fetchall()
+        rows = await async_db.verification_page(0, limit)
         
-        cursor.close()
+        # Resolve all chain hashes up front - no per-record chain call
+        chain_hashes = await resolve_blockchain_hashes([row[0] for row in rows])
         
         results = []
         tampered_count = 0
@@ -448,47 +699,23 @@ async def verify_all_employees(background_tasks: BackgroundTasks, limit: int = 1
         
         for row in rows:
             try:
-                emp_id, name, role, salary, stored_hash, created_at = row
-                
-                if not stored_hash or not created_at:
+                result = verify_row(row, chain_hashes[row[0]])
+                if result is None:
                     continue
                 
-                combined_data = f"{name}{role}{salary}{created_at.isoformat()}".encode('utf-8')
-                computed_hash = hashlib.sha256(combined_data).hexdigest()
-                
-                # Use cached fetch
-                blockchain_hash = fetch_hash_cached(emp_id)
-                
-                is_tampered = not (stored_hash == computed_hash == blockchain_hash)
-                
-                if is_tampered and blockchain_hash != "0" * 64:
+                if alert_if_tampered(result, "verify-all"):
                     tampered_count += 1
-                    try:
-                        background_tasks.add_task(
-                            send_tampering_alert,
-                            name, emp_id, stored_hash, computed_hash, blockchain_hash
-                        )
-                    except:
-                        pass
                 else:
                     verified_count += 1
                 
-                results.append({
-                    "id": emp_id,
-                    "name": name,
-                    "role": role,
-                    "salary": salary,
-                    "is_tampered": is_tampered,
-                    "stored_hash": stored_hash,
-                    "computed_hash": computed_hash,
-                    "blockchain_hash": blockchain_hash,
-                    "created_at": created_at
-                })
+                results.append(result)
                 
             except Exception as row_error:
                 print(f"❌ Error processing row: {row_error}")
                 continue
         
+        await run_in_threadpool(save_verification_results, results, "verify-all")
+        
         return {
             "total_records": total_in_db,
             "verified": verified_count,
@@ -498,21 +725,256 @@ async def verify_all_employees(background_tasks: BackgroundTasks, limit: int = 1
     except Exception as e:
         print(f"❌ Critical error in verify-all: {e}")
         raise HTTPException(status_code=500, detail=f"Verification failed: {str(e)}")
+
+@app.post("/verify-all/engine")
+async def run_verification_engine(
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    fetch_batch: int = VERIFY_FETCH_BATCH,
+    hash_workers: int = VERIFY_HASH_WORKERS,
+    lookup_workers: int = VERIFY_LOOKUP_WORKERS,
+):
+    """Verify with the pipelined engine; returns counts, tampered records and per-stage throughput
+    
+    Only tampered records are returned (capped at 1000). Resume a partial
+    run by passing `last_id` back as `after_id`.
+    """
+    tampered = []
+    
+    def on_tampered(result):
+        alert_if_tampered(result, "engine")
+        if len(tampered) < 1000:
+            tampered.append(result)
+    
+    engine = VerificationEngine(
+        get_db,
+        lookup=resolve_blockchain_hashes_sync,
+        fetch_batch=max(1, min(fetch_batch, 10000)),
+        hash_workers=max(0, min(hash_workers, os.cpu_count() or 1)),
+        # Each lookup worker holds a pooled connection for the run; leave room for requests
+        lookup_workers=max(1, min(lookup_workers, 32, db_pool.max_size // 2)),
+        on_tampered=on_tampered,
+        on_batch=lambda results: save_verification_results(results, "engine"),
+    )
+    started = time()
+    report = await run_in_threadpool(engine.run, after_id, limit)
+    report["tampered_records"] = tampered
+    
+    if after_id == 0 and limit is None and report["complete"]:
+        await run_in_threadpool(mark_full_pass, started, report["scanned"])
+    return report
+
+@app.get("/verify-all/sample")
+def verify_sample(
+    confidence: float = SAMPLE_CONFIDENCE,
+    max_tamper_rate: float = SAMPLE_MAX_TAMPER_RATE,
+    method: str = "uniform",
+    strata: int = 10,
+    seed: Optional[int] = None,
+):
+    """Verify a random sample sized so that, if at least `max_tamper_rate` of rows
+    were tampered, the sample would catch one with probability `confidence`
+    
+    method: uniform (TABLESAMPLE), index (random primary-key draws) or
+    stratified (by created_at). The response states the guarantee achieved.
+    """
+    if method not in SAMPLING_METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of: {', '.join(SAMPLING_METHODS)}")
+    if not 0 < confidence < 1 or not 0 < max_tamper_rate < 1:
+        raise HTTPException(status_code=400, detail="confidence and max_tamper_rate must be between 0 and 1")
+    conn = None
+    try:
+        conn = get_db()
+        report = sample_audit(
+            conn, confidence, max_tamper_rate, method, max(1, min(strata, 100)), seed,
+            lookup=resolve_blockchain_hashes_sync,
+            on_tampered=lambda result: alert_if_tampered(result, "sample"),
+        )
+        persist_verification(conn, report.pop("results"), "sample")
+        return report
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sampling verification failed: {str(e)}")
+    finally:
+        if conn:
+            conn.close()
+
+@app.get("/verify-all/in-db")
+def verify_all_in_database(after_id: int = 0, limit: Optional[int] = None):
+    """Set-based verification in PostgreSQL: one scan, only mismatching IDs come back
+    
+    Needs Database/in_db_verification.sql. Compares against the local anchor
+    mirrors (Merkle proofs, HashAdded index), not live contract reads.
+    """
+    conn = None
+    try:
+        conn = get_db()
+        return db_verification.run(conn, after_id, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"In-database verification failed: {str(e)}")
+    finally:
+        if conn:
+            conn.close()
+
+def mark_full_pass(started_at, records):
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        record_full_pass(cursor, started_at, records)
+        conn.commit()
+        cursor.close()
+    except Exception as e:
+        print(f"⚠️ Could not record full verification pass: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+def ndjson_line(payload) -> str:
+    return json.dumps(payload, default=str) + "\n"
+
+@app.get("/verify-all/stream")
+async def verify_all_employees_stream(
+    after_id: int = 0,
+    page_size: int = VERIFY_STREAM_PAGE_SIZE,
+):
+    """Verify the whole table as NDJSON, walking secure_db in keyset pages on id
+    
+    Emits one "result" line per record, a "progress" line after every page and
+    a final "summary" line. Every progress/summary/error line carries
+    `after_id`; pass it back to resume a dropped stream from that point.
+    Memory stays at one page regardless of table size.
+    """
+    page_size = max(1, min(page_size, 5000))
+    
+    async def generate():
+        last_id = after_id
+        counts = {"scanned": 0, "verified": 0, "tampered": 0, "skipped": 0}
+        started = time()
+        try:
+            remaining = await async_db.count_employees(after_id)
+            yield ndjson_line({"type": "start", "after_id": after_id, "remaining": remaining, "page_size": page_size})
+            
+            while True:
+                # Each page borrows a connection only for its own query, so no snapshot is held open
+                rows = await async_db.verification_page(last_id, page_size)
+                if not rows:
+                    break
+                
+                # One chain lookup per page
+                chain_hashes = await resolve_blockchain_hashes([row[0] for row in rows])
+                
+                lines, page_results = [], []
+                for row in rows:
+                    counts["scanned"] += 1
+                    try:
+                        result = verify_row(row, chain_hashes[row[0]])
+                    except Exception as row_error:
+                        print(f"❌ Error processing row: {row_error}")
+                        result = None
+                    if result is None:
+                        counts["skipped"] += 1
+                        continue
+                    
+                    if alert_if_tampered(result, "stream"):
+                        counts["tampered"] += 1
+                    else:
+                        counts["verified"] += 1
+                    page_results.append(result)
+                    lines.append(ndjson_line({"type": "result", **result}))
+                await run_in_threadpool(save_verification_results, page_results, "stream")
+                
+                last_id = rows[-1][0]
+                lines.append(ndjson_line({"type": "progress", "after_id": last_id, **counts}))
+                yield "".join(lines)
+                
+                if len(rows) < page_size:
+                    break
+            
+            if after_id == 0:
+                await run_in_threadpool(mark_full_pass, started, counts["scanned"])
+            yield ndjson_line({"type": "summary", "after_id": last_id, "complete": True, **counts})
+        except Exception as e:
+            print(f"❌ Critical error in verify-all stream after ID {last_id}: {e}")
+            yield ndjson_line({"type": "error", "after_id": last_id, "detail": str(e), **counts})
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+# Tamper detection within seconds of an UPDATE/DELETE on secure_db
+change_verifier = ChangeVerifier(
+    get_db,
+    lookup=resolve_blockchain_hashes_sync,
+    on_tampered=lambda result: alert_dispatcher.submit(result, "change-journal"),
+    on_batch=lambda results: save_verification_results(results, "change-journal"),
+    # LISTEN holds its connection for good, so it stays out of the pool
+    listen_connection=connect,
+)
+
+@app.get("/alerts/stats")
+def get_alert_stats():
+    """Tamper-alert dispatcher counters: queued, deduplicated, dropped, digests sent, sink errors"""
+    return alert_dispatcher.stats()
+
+@app.get("/verification/changes")
+def get_change_verifier_status():
+    """Incremental (change journal) verifier progress and recent detections"""
+    return {"enabled": RUN_CHANGE_VERIFIER, **change_verifier.stats()}
+
+@app.get("/attestation/epochs")
+def get_attestation_epochs(limit: int = 20):
+    """Anchored hash-chain epochs, newest first"""
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        epochs = list_epochs(cursor, max(1, min(limit, 500)))
+        cursor.close()
+        return {"epochs": epochs}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if conn:
+            conn.close()
+
+@app.get("/attestation/verify")
+def verify_attestation(epoch_id: Optional[int] = None):
+    """Attest the whole table up to an epoch with one on-chain root comparison
+    
+    Also reports rows deleted or re-hashed without a trace in the chain;
+    only records journaled after the epoch still need per-record lookups.
+    """
+    conn = None
+    try:
+        conn = get_db()
+        epoch = None
+        if epoch_id is not None:
+            cursor = conn.cursor()
+            epoch = get_epoch(cursor, epoch_id)
+            cursor.close()
+            if epoch is None:
+                raise HTTPException(status_code=404, detail="Epoch not found")
+        return verify_epoch(conn, epoch)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
     finally:
         if conn:
             conn.close()
 
+@app.get("/cache/stats")
+def get_cache_statistics():
+    """Blockchain hash cache hit/miss/eviction statistics"""
+    return hash_cache.stats()
+
 @app.post("/cache/clear")
 def clear_cache():
     """Clear blockchain hash cache"""
-    global blockchain_cache
-    blockchain_cache = {}
+    hash_cache.clear()
     return {"message": "Cache cleared", "timestamp": time()}
 
 @app.post("/tamper")
-def simulate_tampering(req: TamperRequest):
+async def simulate_tampering(req: TamperRequest):
     """Simulate tampering - update any field"""
-    conn = None
     try:
         # Validate field
         allowed_fields = ['name', 'role', 'salary']
@@ -522,15 +984,7 @@ def simulate_tampering(req: TamperRequest):
                 detail=f"Invalid field. Allowed: {', '.join(allowed_fields)}"
             )
         
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        sql = f'UPDATE secure_db SET "{req.field}" = %s WHERE id = %s RETURNING id, name, role, salary;'
-        cursor.execute(sql, (req.new_value, req.employee_id))
-        result = cursor.fetchone()
-        conn.commit()
-        
-        cursor.close()
+        result = await async_db.update_field(req.employee_id, req.field, req.new_value)
         
         if not result:
             raise HTTPException(status_code=404, detail="Employee not found")
@@ -547,26 +1001,13 @@ def simulate_tampering(req: TamperRequest):
     except HTTPException:
         raise
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
 @app.delete("/employees/{employee_id}")
-def delete_employee(employee_id: int):
+async def delete_employee(employee_id: int):
     """Delete an employee"""
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM secure_db WHERE id = %s RETURNING id, name;", (employee_id,))
-        result = cursor.fetchone()
-        conn.commit()
-        
-        cursor.close()
+        result = await async_db.delete_employee(employee_id)
         
         if not result:
             raise HTTPException(status_code=404, detail="Employee not found")
@@ -575,108 +1016,157 @@ def delete_employee(employee_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
 @app.delete("/employees/all/truncate")
-def delete_all_employees():
+async def delete_all_employees():
     """Delete all employees (truncate table)"""
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM secure_db;")
-        count = cursor.fetchone()[0]
-        
-        cursor.execute("TRUNCATE TABLE secure_db RESTART IDENTITY CASCADE;")
-        conn.commit()
-        
-        cursor.close()
+        count = await async_db.truncate_employees()
         
         return {"message": f"All {count} employee records deleted successfully", "deleted_count": count}
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
 @app.get("/transactions")
 def get_transaction_history():
     """Get blockchain transaction history"""
+    if ANCHOR_MODE == "outbox":
+        # Durable history from the outbox instead of this process's memory
+        conn = None
+        try:
+            conn = get_db()
+            cursor = conn.cursor()
+            transactions = recent_outbox_transactions(cursor, 20)
+            stats = outbox_stats(cursor)
+            cursor.close()
+            return {
+                "total_transactions": stats["counts"]["confirmed"],
+                "backlog": stats["backlog"],
+                "transactions": transactions
+            }
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            if conn:
+                conn.close()
+    
     return {
         "total_transactions": len(transaction_history),
+        "in_flight": submitter.in_flight(),
+        "submitter": submitter.stats(),
         "transactions": transaction_history[-20:]
     }
 
+@app.get("/anchoring/outbox")
+def get_outbox_statistics():
+    """Anchoring outbox backlog and throughput"""
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        stats = outbox_stats(cursor)
+        cursor.close()
+        return stats
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if conn:
+            conn.close()
+
 @app.get("/gas-stats")
 def get_gas_statistics():
-    """Get gas fee statistics"""
+    """Get gas fee statistics (served from the gas oracle cache - no RPC calls)"""
     try:
-        gas_price = w3.eth.gas_price
+        snapshot = gas_oracle.snapshot(refresh=False)
+        if snapshot is None:
+            raise HTTPException(status_code=503, detail="Gas oracle is warming up, try again shortly")
+        
+        gas_price = gas_oracle.effective_gas_price()
         gas_price_gwei = w3.from_wei(gas_price, 'gwei')
+        gas_used = gas_oracle.cached_gas_limit('addHash') or 200000
         
-        return {
+        stats = {
             "current_gas_price_wei": gas_price,
             "current_gas_price_gwei": float(gas_price_gwei),
             "estimated_cost_per_transaction": {
-                "gas_used": 200000,
-                "cost_wei": gas_price * 200000,
-                "cost_eth": float(w3.from_wei(gas_price * 200000, 'ether'))
-            }
+                "gas_used": gas_used,
+                "cost_wei": gas_price * gas_used,
+                "cost_eth": float(w3.from_wei(gas_price * gas_used, 'ether'))
+            },
+            "urgency": gas_oracle.urgency,
+            "eip1559": snapshot["eip1559"],
+            "sampled_seconds_ago": round(time() - snapshot["sampled_at"], 1)
         }
+        if snapshot["eip1559"]:
+            stats["base_fee_gwei"] = float(w3.from_wei(snapshot["base_fee"], 'gwei'))
+            stats["priority_fee_gwei"] = {
+                f"p{percentile}": float(w3.from_wei(fee, 'gwei'))
+                for percentile, fee in snapshot["priority_fees"].items()
+            }
+            stats["gas_used_ratio"] = snapshot["gas_used_ratio"]
+        return stats
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/export/csv")
-def export_csv():
-    """Export all employees to CSV"""
-    conn = None
+async def export_csv(filters: SearchFilter = Depends(), gzip: bool = False):
+    """Export employees to CSV, streamed from COPY TO STDOUT
+
+    Takes the same filters as POST /employees/search (as query parameters);
+    gzip=true compresses on the fly into a .csv.gz download. A failure
+    before the first chunk is a 500; one after it ends the body with a
+    CSV_EXPORT_ERROR_MARKER line, since the status is already sent.
+    """
+    rows = async_db.export_csv(filters.name, filters.role, filters.min_salary, filters.max_salary)
+    # Read the first chunk up front so a bad connection or query fails the request
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, name, role, salary, record_hash, created_at FROM secure_db ORDER BY id;")
-        rows = cursor.fetchall()
-        
-        cursor.close()
-        
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['ID', 'Name', 'Role', 'Salary', 'Record Hash', 'Created At'])
-        writer.writerows(rows)
-        
-        output.seek(0)
-        
+        first = await rows.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+    async def stream():
+        yield first
+        try:
+            async for chunk in rows:
+                yield chunk
+        except Exception as e:
+            print(f"❌ CSV export failed mid-stream: {e}")
+            # Leading newline: the failure may land in the middle of a row
+            yield f"\n{CSV_EXPORT_ERROR_MARKER},{json.dumps(str(e))}\n".encode('utf-8')
+
+    filename = f"employees_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    if not gzip:
         return StreamingResponse(
-            iter([output.getvalue()]),
+            stream(),
             media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename=employees_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
+
+    async def compressed():
+        # wbits=31: gzip container, so the download opens with gunzip/any archive tool
+        compressor = zlib.compressobj(CSV_EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+        async for chunk in stream():
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    return StreamingResponse(
+        compressed(),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f"attachment; filename={filename}.gz"}
+    )
 
 @app.get("/export/pdf")
-def export_pdf():
+async def export_pdf():
     """Export verification report as PDF"""
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, name, role, salary FROM secure_db ORDER BY id LIMIT 50;")
-        rows = cursor.fetchall()
-        
-        cursor.close()
+        rows = await async_db.report_rows(50)
         
         pdf = FPDF()
         pdf.add_page()
@@ -710,6 +1200,3 @@ def export_pdf():
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
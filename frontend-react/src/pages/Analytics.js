@@ -16,8 +16,16 @@ const Analytics = () => {
     try {
       setLoading(true);
       setError(null);
-      const response = await apiService.verifyAll({ limit: 20 }); // Limit to 20 records
-      setData(response.data);
+      // Aggregates are precomputed server-side; the table shows the 20 latest records
+      const [summary, quick] = await Promise.all([
+        apiService.getDashboardStats(),
+        apiService.getDashboardQuick(),
+      ]);
+      const tamperedIds = new Set(summary.data.recent_tampered.map(r => r.id));
+      setData({
+        ...summary.data,
+        results: quick.data.records.map(r => ({ ...r, is_tampered: tamperedIds.has(r.id) })),
+      });
     } catch (error) {
       console.error('Failed to fetch analytics:', error);
       setError(error.message || 'Failed to load analytics data');
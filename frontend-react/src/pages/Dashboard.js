@@ -16,13 +16,18 @@ const Dashboard = () => {
   const loadQuickData = async () => {
     try {
       setLoading(true);
-      const response = await apiService.getDashboardQuick();
+      // Counts come from persisted verification results - no live verification on load
+      const [response, summary] = await Promise.all([
+        apiService.getDashboardQuick(),
+        apiService.getDashboardStats().catch(() => null),
+      ]);
+      const tamperedIds = new Set(summary ? summary.data.recent_tampered.map(r => r.id) : []);
       setRecords(response.data.records);
       setStats({
-        total_records: response.data.total_records,
-        verified: response.data.total_records,
-        tampered: 0,
-        results: response.data.records.map(r => ({ ...r, is_tampered: false }))
+        total_records: summary ? summary.data.total_records : response.data.total_records,
+        verified: summary ? summary.data.verified : response.data.total_records,
+        tampered: summary ? summary.data.tampered : 0,
+        results: response.data.records.map(r => ({ ...r, is_tampered: tamperedIds.has(r.id) }))
       });
     } catch (error) {
       console.error('Dashboard load error:', error);
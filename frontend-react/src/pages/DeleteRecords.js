@@ -5,6 +5,7 @@ import { toast } from 'react-toastify';
 const DeleteRecords = () => {
   const [activeTab, setActiveTab] = useState('single');
   const [employees, setEmployees] = useState([]);
+  const [total, setTotal] = useState(0);
   const [deleteId, setDeleteId] = useState('');
   const [confirmText, setConfirmText] = useState('');
   const [loading, setLoading] = useState(false);
@@ -15,8 +16,10 @@ const DeleteRecords = () => {
 
   const fetchEmployees = async () => {
     try {
-      const response = await apiService.getAllEmployees();
-      setEmployees(response.data);
+      // First page only, projected to the columns shown
+      const response = await apiService.getEmployees({ limit: 100, fields: 'id,name,role,salary' });
+      setEmployees(response.data.items);
+      setTotal(response.data.total);
     } catch (error) {
       console.error('Failed to fetch employees');
     }
@@ -89,7 +92,9 @@ const DeleteRecords = () => {
         <div className="space-y-6">
           {employees.length > 0 && (
             <div className="bg-white p-6 rounded-xl shadow-lg">
-              <h3 className="font-bold mb-4">Current Employees</h3>
+              <h3 className="font-bold mb-4">
+                Current Employees {employees.length < total && `(first ${employees.length} of ${total})`}
+              </h3>
               <div className="overflow-x-auto">
                 <table className="min-w-full divide-y divide-gray-200">
                   <thead className="bg-gray-50">
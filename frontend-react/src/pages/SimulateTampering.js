@@ -4,6 +4,7 @@ import { toast } from 'react-toastify';
 
 const SimulateTampering = () => {
   const [employees, setEmployees] = useState([]);
+  const [total, setTotal] = useState(0);
   const [formData, setFormData] = useState({
     employee_id: '',
     field: 'salary',
@@ -18,8 +19,10 @@ const SimulateTampering = () => {
 
   const fetchEmployees = async () => {
     try {
-      const response = await apiService.getAllEmployees();
-      setEmployees(response.data);
+      // First page only, projected to the columns shown
+      const response = await apiService.getEmployees({ limit: 100, fields: 'id,name,role,salary' });
+      setEmployees(response.data.items);
+      setTotal(response.data.total);
     } catch (error) {
       console.error('Failed to fetch employees');
     }
@@ -68,7 +71,9 @@ const SimulateTampering = () => {
       {/* Employee List */}
       {employees.length > 0 && (
         <div className="bg-white p-6 rounded-xl shadow-lg">
-          <h3 className="font-bold mb-4">Current Employees ({employees.length})</h3>
+          <h3 className="font-bold mb-4">
+            Current Employees ({employees.length < total ? `first ${employees.length} of ${total}` : total})
+          </h3>
           <div className="overflow-x-auto">
             <table className="min-w-full divide-y divide-gray-200">
               <thead className="bg-gray-50">
@@ -3,9 +3,14 @@ import { apiService } from '../services/api';
 import { toast } from 'react-toastify';
 import { FaDownload } from 'react-icons/fa';
 
+const PAGE_SIZE = 100;
+
 const ViewRecords = () => {
   const [employees, setEmployees] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchEmployees();
@@ -14,8 +19,10 @@ const ViewRecords = () => {
   const fetchEmployees = async () => {
     try {
       setLoading(true);
-      const response = await apiService.getAllEmployees();
-      setEmployees(response.data);
+      const response = await apiService.getEmployees({ limit: PAGE_SIZE });
+      setEmployees(response.data.items);
+      setTotal(response.data.total);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       toast.error('Failed to fetch employees');
     } finally {
@@ -23,6 +30,20 @@ const ViewRecords = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await apiService.getEmployees({ limit: PAGE_SIZE, cursor: nextCursor });
+      setEmployees((current) => [...current, ...response.data.items]);
+      setTotal(response.data.total);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      toast.error('Failed to fetch employees');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleExportCSV = async () => {
     try {
       const response = await apiService.exportCSV();
@@ -75,7 +96,10 @@ const ViewRecords = () => {
 
       {employees.length > 0 ? (
         <div className="bg-white p-6 rounded-xl shadow-lg">
-          <p className="text-sm text-gray-600 mb-4">Total Records: <strong>{employees.length}</strong></p>
+          <p className="text-sm text-gray-600 mb-4">
+            Total Records: <strong>{total}</strong>
+            {employees.length < total && <span> (showing {employees.length})</span>}
+          </p>
           <div className="overflow-x-auto">
             <table className="min-w-full divide-y divide-gray-200">
               <thead className="bg-gray-50">
@@ -106,6 +130,17 @@ const ViewRecords = () => {
               </tbody>
             </table>
           </div>
+          {nextCursor && (
+            <div className="flex justify-center mt-4">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="bg-indigo-600 text-white px-6 py-2 rounded-lg hover:bg-indigo-700 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : `Load ${PAGE_SIZE} more`}
+              </button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="bg-white p-12 rounded-xl shadow-lg text-center">
@@ -16,7 +16,8 @@ export const apiService = {
   checkHealth: () => api.get('/'),
 
   // Employees
-  getAllEmployees: () => api.get('/employees'),
+  // Keyset-paginated: { limit, cursor, sort, fields } -> { items, total, next_cursor }
+  getEmployees: (params) => api.get('/employees', { params }),
   checkDuplicateName: (name) => api.get(`/employees/check-duplicate/${name}`),
   createEmployee: (data) => api.post('/employees', data),
   searchEmployees: (filters) => api.post('/employees/search', filters),